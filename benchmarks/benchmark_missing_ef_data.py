@@ -0,0 +1,101 @@
+"""
+Benchmark for EmissionFactorDataLoader.determine_missing_ef_data
+
+Times the detection of vehicle name and pollutant combinations without emission factors for synthetic fleets of
+growing size. Each vehicle has ef_rows_per_pollutant rows of emission factor data (like the rows for different
+modes, loads and slopes in the COPERT emission factor data) for all but one of the pollutants.
+
+Run it from the root folder of the repository with:
+
+    python -m benchmarks.benchmark_missing_ef_data
+
+With --compare, the filter-based implementation that was used before is timed as well. Its duration grows with
+the square of the fleet size (about 15 seconds for 200 vehicles), so combine it with small --fleet_sizes:
+
+    python -m benchmarks.benchmark_missing_ef_data --fleet_sizes 50 100 200 --compare
+"""
+import argparse
+import time
+from itertools import product
+from typing import List
+
+import pandas as pd
+
+from code.constants.column_names import FLEET_COMP_VEH_NAME
+from code.constants.enumerations import PollutantType
+from code.data_loading.EmissionFactorDataLoader import EmissionFactorDataLoader
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fleet_sizes",
+                        help="The numbers of vehicles to time the detection for. Default is 100 300 1000 3000.",
+                        nargs="+",
+                        type=int,
+                        default=[100, 300, 1000, 3000])
+    parser.add_argument("--ef_rows_per_pollutant",
+                        help="The number of emission factor data rows per vehicle and pollutant. Default is 20.",
+                        type=int,
+                        default=20)
+    parser.add_argument("--compare",
+                        help="Set this flag to also time the filter-based implementation.",
+                        action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'vehicles':>10} {'ef rows':>10} {'missing':>8} {'time [s]':>10}"
+          + (f" {'filter-based [s]':>17}" if args.compare else ""))
+
+    for fleet_size in args.fleet_sizes:
+        fleet_comp_data, ef_data = generate_data(fleet_size, args.ef_rows_per_pollutant)
+        loader = EmissionFactorDataLoader(use_nh3_tier2_ef=False, fleet_comp_data=fleet_comp_data,
+                                          vehicle_mapping_data=None, ef_data=ef_data)
+
+        start = time.perf_counter()
+        missing_ef_data = loader.determine_missing_ef_data(ef_data)
+        duration = time.perf_counter() - start
+        line = f"{fleet_size:>10} {len(ef_data):>10} {len(missing_ef_data):>8} {duration:>10.3f}"
+
+        if args.compare:
+            start = time.perf_counter()
+            missing_ef_data_filter_based = determine_missing_ef_data_filter_based(fleet_comp_data, ef_data)
+            duration_filter_based = time.perf_counter() - start
+            assert missing_ef_data.equals(missing_ef_data_filter_based)
+            line += f" {duration_filter_based:>17.3f}"
+
+        print(line)
+
+
+def generate_data(fleet_size: int, ef_rows_per_pollutant: int):
+
+    vehicle_names = [f"vehicle_{i}" for i in range(fleet_size)]
+    pollutants = list(PollutantType)
+
+    vehicle_names_and_pollutants = [
+        (veh_name, poll) for i, veh_name in enumerate(vehicle_names) for j, poll in enumerate(pollutants)
+        if j != i % len(pollutants)  # leave out one pollutant per vehicle
+    ]
+    ef_data = pd.DataFrame(
+        [pair for pair in vehicle_names_and_pollutants for _ in range(ef_rows_per_pollutant)],
+        columns=["VehicleName", "Pollutant"]
+    )
+    ef_data["Alpha"] = 1.0
+
+    return pd.DataFrame({FLEET_COMP_VEH_NAME: vehicle_names}), ef_data
+
+
+def determine_missing_ef_data_filter_based(fleet_comp_data: pd.DataFrame, ef_data: pd.DataFrame) -> pd.DataFrame:
+    """ The implementation of EmissionFactorDataLoader.determine_missing_ef_data that filters ef_data for each
+    combination of vehicle name and pollutant. """
+
+    missing_ef_data: List = []
+    for veh_name, poll in product(fleet_comp_data[FLEET_COMP_VEH_NAME], list(PollutantType)):
+        ef_data_reduce = ef_data[(ef_data["VehicleName"] == veh_name) & (ef_data["Pollutant"] == poll)]
+        if ef_data_reduce.empty:
+            missing_ef_data.append({"VehicleName": veh_name, "Pollutant": poll})
+
+    return pd.DataFrame(missing_ef_data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Benchmark suite
+
+Times each built-in Strategy and its data loading functions end to end on synthetic data (see synthetic_data.py).
+
+For each Strategy, a model run in the mode berlin_format is started in a separate process with 'run_yeti.py'.
+The wall time, CPU time and peak memory (RSS) of its steps are taken from the 'run_metrics.json' of the run:
+- validation: the validation_function of the Strategy (if it has one),
+- conversion: the load_berlin_format_data_function of the Strategy,
+- loading: the load_yeti_format_data_function of the Strategy,
+- emission_calculation: the Strategy, called by the StrategyInvoker.
+Each run has its own process, so that the peak memory of one run doesn't hide the peak memory of the next one.
+The peak memory of a step is the peak RSS of the run until the end of the step. It is only available on systems with
+the Python module 'resource' (Linux and macOS). The throughput in rows per second is given for the rows of the
+traffic data (or cold starts data).
+
+The results are saved as json file. Pass the results of an earlier run (e.g. for another commit) with --baseline to
+compare them with the current results. The benchmarks with a lower throughput or a higher peak memory than in the
+baseline (by more than --tolerance) are listed and the exit code is 1.
+
+Run it from the root folder of the repository with:
+
+    python -m benchmarks.benchmark_suite --output benchmark_results.json
+
+and later, for example after checking out another commit:
+
+    python -m benchmarks.benchmark_suite --baseline benchmark_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.synthetic_data import STRATEGIES, add_size_arguments, generate_berlin_format_data, get_config
+from code.strategy_helpers.helpers import get_timestamp
+
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ["validation", "conversion", "loading", "emission_calculation"]
+FILE_FORMATS = ["csv", "parquet", "feather", "memmap"]
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    add_size_arguments(parser)
+    parser.add_argument("--strategies",
+                        help="The Strategies to benchmark. Default is all built-in Strategies.",
+                        nargs="+",
+                        choices=list(STRATEGIES),
+                        default=list(STRATEGIES))
+    parser.add_argument("--yeti_format_file_format",
+                        help="The file format of the yeti_format data. Default is csv.",
+                        choices=FILE_FORMATS,
+                        default="csv")
+    parser.add_argument("--repeat",
+                        help="The number of runs per Strategy. The fastest run is reported. Default is 1.",
+                        type=int,
+                        default=1)
+    parser.add_argument("--output",
+                        help="The json file to save the results in. Default is 'benchmark_results.json'.",
+                        default="benchmark_results.json")
+    parser.add_argument("--baseline",
+                        help="A json file with earlier results to compare the results with.")
+    parser.add_argument("--tolerance",
+                        help="The relative change in throughput or peak memory that is reported as a regression. "
+                             "Default is 0.1.",
+                        type=float,
+                        default=0.1)
+    parser.add_argument("--work_folder",
+                        help="The folder for the synthetic data and the model output. A temporary folder is used "
+                             "and removed in the end if this is not given.")
+    args = parser.parse_args()
+
+    work_folder = args.work_folder or tempfile.mkdtemp(prefix="yeti_benchmarks_")
+    try:
+        results = run_benchmarks(args, work_folder)
+    finally:
+        if args.work_folder is None:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    with open(args.output, "w") as fp:
+        json.dump(results, fp, indent=2)
+    print(get_results_text(results["results"]))
+    print(f"\nSaved the results in {args.output}.")
+
+    if args.baseline is not None:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        if baseline["parameters"]["size"] != results["parameters"]["size"]:
+            print(f"\nWarning: The baseline was run with other sizes: {baseline['parameters']['size']}.")
+        comparison_text, regressions = compare_results(baseline["results"], results["results"], args.tolerance)
+        print(f"\nComparison with {args.baseline} (commit: {baseline.get('commit')}):\n{comparison_text}")
+        if len(regressions) > 0:
+            print(f"\nRegressions (more than {args.tolerance:.0%}): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+def run_benchmarks(args: argparse.Namespace, work_folder: str) -> Dict[str, Any]:
+
+    size = {"links": args.links, "hours": args.hours, "fleet_size": args.fleet_size, "pollutants": args.pollutants}
+    print(f"Generating synthetic berlin_format data in {work_folder} ({size}).")
+    berlin_format_folder = os.path.abspath(f"{work_folder}/berlin_format")  # the model runs in the root folder
+    berlin_format_files = generate_berlin_format_data(
+        berlin_format_folder, args.links, args.hours, args.fleet_size, args.pollutants, args.seed)
+    rows = args.links * 2 * 4 * args.hours  # see synthetic_data.get_traffic_data_keys
+
+    results = OrderedDict()
+    for strategy_name in args.strategies:
+        config = get_config(strategy_name, berlin_format_files, args.pollutants)
+        if config is None:
+            print(f"Skipped the {strategy_name}. It supports none of the pollutants {args.pollutants}.")
+            continue
+        config["yeti_format_file_format"] = args.yeti_format_file_format
+
+        print(f"Running the {strategy_name}.")
+        runs = [run_model(config, f"{work_folder}/{strategy_name}/run_{i}") for i in range(args.repeat)]
+        fastest_run = min(runs, key=lambda run_metrics: run_metrics["duration_s"])
+        results[strategy_name] = get_benchmark_results(fastest_run, config, rows)
+
+    return {
+        "time_of_run": get_timestamp(),
+        "commit": get_commit(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"size": size, "seed": args.seed, "yeti_format_file_format": args.yeti_format_file_format,
+                       "repeat": args.repeat},
+        "results": results
+    }
+
+
+def run_model(config: Dict[str, Any], run_folder: str) -> Dict[str, Any]:
+    """ Run the model with config in a separate process. Returns the content of its 'run_metrics.json'. """
+
+    os.makedirs(run_folder, exist_ok=True)
+    run_folder = os.path.abspath(run_folder)
+    config = {**config,
+              "output_folder": f"{run_folder}/output",
+              "output_folder_for_yeti_format_data": f"{run_folder}/yeti_format_data"}
+    config_file = f"{run_folder}/config.yaml"
+    with open(config_file, "w") as fp:
+        yaml.safe_dump(config, fp)
+
+    log_file = f"{run_folder}/log.txt"
+    with open(log_file, "w") as fp:
+        completed_process = subprocess.run([sys.executable, "-m", "run_yeti", "-c", config_file, "-q"],
+                                           cwd=ROOT_FOLDER, stdout=fp, stderr=subprocess.STDOUT)
+    if completed_process.returncode != 0:
+        raise RuntimeError(f"The model run with the config {config_file} failed. See {log_file}.")
+
+    with open(f"{config['output_folder']}/run_metrics.json") as fp:
+        return json.load(fp)
+
+
+def get_benchmark_results(run_metrics: Dict[str, Any], config: Dict[str, Any], rows: int) -> Dict[str, Any]:
+
+    functions = {
+        "validation": config.get("validation_function"),
+        "conversion": config["load_berlin_format_data_function"],
+        "loading": config["load_yeti_format_data_function"],
+        "emission_calculation": config["strategy"]
+    }
+    steps = run_metrics["steps"]
+
+    results = OrderedDict()
+    for step in STEPS:
+        if functions[step] is None:
+            continue
+        wall_time = steps[step]["wall_time_s"]
+        results[step] = {
+            "function": functions[step].split(".")[-1],
+            "wall_time_s": wall_time,
+            "cpu_time_s": steps[step]["cpu_time_s"],
+            "rows": rows,
+            "rows_per_s": rows / wall_time if wall_time > 0 else None,
+            "peak_rss_mb": steps[step]["peak_rss_mb"]
+        }
+    peak_rss = [metrics["peak_rss_mb"] for metrics in steps.values() if metrics["peak_rss_mb"] is not None]
+    results["total"] = {
+        "function": "run_yeti",
+        "wall_time_s": run_metrics["duration_s"],
+        "cpu_time_s": sum(metrics["cpu_time_s"] for metrics in steps.values()),
+        "rows": rows,
+        "rows_per_s": rows / run_metrics["duration_s"],
+        "peak_rss_mb": max(peak_rss) if len(peak_rss) > 0 else None
+    }
+    return results
+
+
+def get_results_text(results: Dict[str, Dict[str, Any]]) -> str:
+
+    lines = [f"{'benchmark':<50}{'function':<50}{'wall time [s]':>15}{'rows/s':>12}{'peak rss [MB]':>15}"]
+    for strategy_name, steps in results.items():
+        for step, metrics in steps.items():
+            name = f"{strategy_name}.{step}"
+            lines.append(f"{name:<50}{metrics['function']:<50}{metrics['wall_time_s']:>15.3f}"
+                         f"{format_value(metrics['rows_per_s']):>12}{format_value(metrics['peak_rss_mb']):>15}")
+    return "\n".join(lines)
+
+
+def compare_results(baseline: Dict[str, Dict[str, Any]],
+                    results: Dict[str, Dict[str, Any]],
+                    tolerance: float):
+    """ Compare the throughput and peak memory of the benchmarks in results with the ones in baseline.
+    Returns a table with the changes and the names of the benchmarks that got worse by more than tolerance. """
+
+    lines = [f"{'benchmark':<50}{'rows/s':>12}{'baseline':>12}{'change':>10}"
+             f"{'peak rss [MB]':>15}{'baseline':>12}{'change':>10}"]
+    regressions: List[str] = []
+    for strategy_name, steps in results.items():
+        for step, metrics in steps.items():
+            baseline_metrics = baseline.get(strategy_name, {}).get(step)
+            if baseline_metrics is None:
+                continue
+            name = f"{strategy_name}.{step}"
+            rows_per_s_change = get_relative_change(baseline_metrics["rows_per_s"], metrics["rows_per_s"])
+            peak_rss_change = get_relative_change(baseline_metrics["peak_rss_mb"], metrics["peak_rss_mb"])
+            lines.append(f"{name:<50}{format_value(metrics['rows_per_s']):>12}"
+                         f"{format_value(baseline_metrics['rows_per_s']):>12}{format_change(rows_per_s_change):>10}"
+                         f"{format_value(metrics['peak_rss_mb']):>15}"
+                         f"{format_value(baseline_metrics['peak_rss_mb']):>12}{format_change(peak_rss_change):>10}")
+            if (rows_per_s_change is not None and rows_per_s_change < -tolerance) \
+                    or (peak_rss_change is not None and peak_rss_change > tolerance):
+                regressions.append(name)
+    return "\n".join(lines), regressions
+
+
+def get_relative_change(baseline_value, value):
+
+    if baseline_value is None or value is None or baseline_value == 0:
+        return None
+    return value / baseline_value - 1
+
+
+def format_value(value) -> str:
+
+    return "-" if value is None else f"{value:.1f}"
+
+
+def format_change(change) -> str:
+
+    return "-" if change is None else f"{change:+.1%}"
+
+
+def get_commit():
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_FOLDER, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    main()
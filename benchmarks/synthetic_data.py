@@ -0,0 +1,527 @@
+"""
+Synthetic data for benchmarks
+
+Generates berlin_format datasets of configurable size and the config arguments to run each built-in Strategy on
+them. The files have the columns and categories defined in 'code/constants/column_names.py', so that they can be
+converted to yeti_format data with the load_berlin_format_data functions of the Strategies.
+
+The size of a dataset is given by
+- links: the number of links,
+- hours: the number of hours per day type and direction (at most 24),
+- fleet_size: the number of vehicles in the fleet composition,
+- pollutants: the pollutants to generate emission factors for (names of PollutantType members).
+
+The traffic data (and the cold starts data) has links * 2 directions * 4 day types * hours rows.
+
+The links have one of a few combinations of area type, road type and max speed (see LINK_TYPES). The vehicles are
+spread over all vehicle categories. Passenger cars and light commercial vehicles have different fuels, segments and
+euro standards, with one petrol Euro 1 vehicle for each segment, as required by the CopertColdStrategy.
+
+Generate a dataset from the root folder of the repository with:
+
+    python -m benchmarks.synthetic_data <folder> --links 1000 --hours 24 --fleet_size 100
+
+With --yeti_format, the berlin_format data is also converted to yeti_format data for each Strategy. The yeti_format
+data for a Strategy is saved in '<folder>/yeti_format/<Strategy>'.
+"""
+import argparse
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from code.constants.column_names import *
+from code.constants.enumerations import PollutantType
+from code.constants.mappings import HEBEFA_ROAD_CAT_TO_LOS_SPEEDS_DATA_ROAD_CAT_MAPPING
+from code.script_helpers.dynamic_import_from import dynamic_import_from
+
+
+# (AreaCat, RoadCat, MaxSpeed_kmh) of the links
+LINK_TYPES = [("1", "5", 80), ("1", "8", 60), ("1", "1", 50), ("1", "3", 30),
+              ("0", "6", 120), ("0", "9", 100), ("0", "1", 80), ("0", "0", 50)]
+
+# The share of the fleet in each vehicle category
+FLEET_SHARES = {"P": 0.5, "L": 0.2, "S": 0.1, "R": 0.05, "B": 0.05, "M": 0.05, "Moped": 0.05}
+
+# VehCat, fuels and segments in the vehicle mapping for each vehicle category of the fleet composition
+VEHICLE_TYPES = {
+    "P": ("Passenger Cars", ["Petrol", "Diesel"], ["Mini", "Small", "Medium", "Large-SUV-Executive"]),
+    "L": ("Light Commercial Vehicles", ["Petrol", "Diesel"], ["N1-I", "N1-II", "N1-III"]),
+    "S": ("Heavy Duty Trucks", ["Diesel"], ["Rigid 12 - 14 t", "Rigid 20 - 26 t", "Articulated 34 - 40 t"]),
+    "R": ("Buses", ["Diesel"], ["Coaches Standard <=18 t", "Coaches Articulated >18 t"]),
+    "B": ("Buses", ["Diesel", "CNG"], ["Urban Buses Standard 15 - 18 t"]),
+    "M": ("L-Category", ["Petrol"], ["Motorcycles 4-stroke 250 - 750 cm³", "Motorcycles 4-stroke >750 cm³"]),
+    "Moped": ("L-Category", ["Petrol"], ["Mopeds 4-stroke <50 cm³"])
+}
+EURO_STANDARDS = ["Euro 1", "Euro 2", "Euro 3", "Euro 4", "Euro 5", "Euro 6"]
+
+# The share of the max speed of a link that is driven in each level of service
+LOS_SPEED_FACTORS = {"Freeflow": 1.0, "Heavy": 0.75, "Satur.": 0.5, "St+Go": 0.2}
+
+# The pollutants covered by the cold emission factor table for the CopertColdStrategy
+COLD_EF_POLLUTANTS = ["CO", "NOx", "VOC"]
+
+BERLIN_FORMAT_FILES = ["link_data", "link_data_with_speed", "fleet_composition", "traffic_data", "cold_starts",
+                       "los_speeds", "vehicle_mapping", "copert_emission_factors", "cold_emission_factors",
+                       "hbefa_emission_factors", "hbefa_cold_start_emission_factors"]
+
+# The config arguments to run each built-in Strategy on the synthetic data. The values in "files" are the names of
+# the berlin_format files in BERLIN_FORMAT_FILES. "pollutants" restricts the pollutants for Strategies that
+# only support some of them. "fixed_pollutants" replaces the pollutants.
+# The CopertColdStrategy needs the hot emissions of the CopertHotStrategy. It is run by the CopertStrategy.
+STRATEGIES = {
+    "CopertHotStrategy": {
+        "config": {
+            "strategy": "code.copert_hot_strategy.CopertHotStrategy.CopertHotStrategy",
+            "load_berlin_format_data_function":
+                "code.copert_hot_strategy.load_berlin_format_data.load_copert_hot_berlin_format_data",
+            "load_yeti_format_data_function":
+                "code.copert_hot_strategy.load_yeti_format_data.load_copert_hot_yeti_format_data",
+            "validation_function": "code.copert_hot_strategy.validate.validate_copert_berlin_format_files",
+            "use_nh3_tier2_ef": False
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_emission_factors": "copert_emission_factors",
+            "berlin_format_los_speeds": "los_speeds",
+            "berlin_format_traffic_data": "traffic_data",
+            "berlin_format_vehicle_mapping": "vehicle_mapping"
+        }
+    },
+    "CopertHotFixedSpeedStrategy": {
+        "config": {
+            "strategy": "code.copert_hot_fixed_speed_strategy.CopertHotFixedSpeedStrategy.CopertHotFixedSpeedStrategy",
+            "load_berlin_format_data_function": ("code.copert_hot_fixed_speed_strategy.load_berlin_format_data."
+                                                 "load_copert_fixed_speed_berlin_format_data"),
+            "load_yeti_format_data_function":
+                "code.copert_hot_fixed_speed_strategy.load_yeti_format_data.load_copert_fixed_speed_yeti_format_data",
+            "validation_function":
+                "code.copert_hot_fixed_speed_strategy.validate.validate_copert_fixed_speed_berlin_format_files",
+            "use_nh3_tier2_ef": False
+        },
+        "files": {
+            "berlin_format_link_data": "link_data_with_speed",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_emission_factors": "copert_emission_factors",
+            "berlin_format_los_speeds": "los_speeds",
+            "berlin_format_traffic_data": "traffic_data",
+            "berlin_format_vehicle_mapping": "vehicle_mapping"
+        }
+    },
+    "CopertStrategy": {
+        "config": {
+            "strategy": "code.copert_strategy.CopertStrategy.CopertStrategy",
+            "load_berlin_format_data_function":
+                "code.copert_strategy.load_berlin_format_data.load_copert_berlin_format_data",
+            "load_yeti_format_data_function": "code.copert_strategy.load_yeti_format_data.load_copert_yeti_format_data",
+            "validation_function": "code.copert_cold_strategy.validate.validate_copert_cold_berlin_format_files",
+            "use_nh3_tier2_ef": False,
+            "ltrip": 12,
+            "temperature": 15
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_emission_factors": "copert_emission_factors",
+            "berlin_format_los_speeds": "los_speeds",
+            "berlin_format_traffic_data": "traffic_data",
+            "berlin_format_vehicle_mapping": "vehicle_mapping",
+            "berlin_format_cold_ef_table": "cold_emission_factors"
+        },
+        "pollutants": COLD_EF_POLLUTANTS
+    },
+    "HbefaHotStrategy": {
+        "config": {
+            "strategy": "code.hbefa_hot_strategy.HbefaHotStrategy.HbefaHotStrategy",
+            "load_berlin_format_data_function":
+                "code.hbefa_hot_strategy.load_berlin_format_data.load_hbefa_hot_berlin_format_data",
+            "load_yeti_format_data_function":
+                "code.hbefa_hot_strategy.load_yeti_format_data.load_hbefa_hot_yeti_format_data",
+            "validation_function": "code.hbefa_hot_strategy.validate.validate_hbefa_berlin_format_files"
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_emission_factors": "hbefa_emission_factors",
+            "berlin_format_traffic_data": "traffic_data"
+        }
+    },
+    "HbefaColdStrategy": {
+        "config": {
+            "strategy": "code.hbefa_cold_strategy.HbefaColdStrategy.HbefaColdStrategy",
+            "load_berlin_format_data_function":
+                "code.hbefa_cold_strategy.load_berlin_format_data.load_hbefa_cold_berlin_format_data",
+            "load_yeti_format_data_function":
+                "code.hbefa_cold_strategy.load_yeti_format_data.load_hbefa_cold_yeti_format_data"
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_emission_factors": "hbefa_cold_start_emission_factors",
+            "berlin_format_cold_starts_data": "cold_starts"
+        }
+    },
+    "HbefaStrategy": {
+        "config": {
+            "strategy": "code.hbefa_strategy.HbefaStrategy.HbefaStrategy",
+            "load_berlin_format_data_function":
+                "code.hbefa_strategy.load_berlin_format_data.load_hbefa_berlin_format_data",
+            "load_yeti_format_data_function": "code.hbefa_strategy.load_yeti_format_data.load_hbefa_yeti_format_data"
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "hot_berlin_format_emission_factors": "hbefa_emission_factors",
+            "berlin_format_traffic_data": "traffic_data",
+            "cold_berlin_format_emission_factors": "hbefa_cold_start_emission_factors",
+            "berlin_format_cold_starts_data": "cold_starts"
+        }
+    },
+    "PMNonExhaustStrategy": {
+        "config": {
+            "strategy": "code.pm_non_exhaust_strategy.PMNonExhaustStrategy.PMNonExhaustStrategy",
+            "load_berlin_format_data_function":
+                "code.pm_non_exhaust_strategy.load_berlin_format_data.load_pm_non_exhaust_berlin_format_data",
+            "load_yeti_format_data_function":
+                "code.pm_non_exhaust_strategy.load_yeti_format_data.load_pm_non_exhaust_yeti_format_data",
+            "validation_function": "code.pm_non_exhaust_strategy.validate.validate_pm_non_exhaust_berlin_format_files",
+            "load_factor": 0.3
+        },
+        "files": {
+            "berlin_format_link_data": "link_data",
+            "berlin_format_fleet_composition": "fleet_composition",
+            "berlin_format_los_speeds": "los_speeds",
+            "berlin_format_traffic_data": "traffic_data"
+        },
+        "fixed_pollutants": ["PM_Non_Exhaust"]
+    }
+}
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", help="The folder to save the data in.")
+    add_size_arguments(parser)
+    parser.add_argument("--yeti_format",
+                        help="Set this flag to also convert the data to yeti_format data for each Strategy.",
+                        action="store_true")
+    args = parser.parse_args()
+
+    berlin_format_files = generate_berlin_format_data(
+        f"{args.folder}/berlin_format", args.links, args.hours, args.fleet_size, args.pollutants, args.seed)
+    print(f"Saved the berlin_format data in {args.folder}/berlin_format.")
+
+    if args.yeti_format:
+        for strategy_name in STRATEGIES:
+            config = get_config(strategy_name, berlin_format_files, args.pollutants)
+            if config is None:
+                print(f"Skipped the {strategy_name}. It supports none of the pollutants.")
+                continue
+            yeti_format_folder = f"{args.folder}/yeti_format/{strategy_name}"
+            generate_yeti_format_data(yeti_format_folder, config)
+            print(f"Saved the yeti_format data for the {strategy_name} in {yeti_format_folder}.")
+
+
+def add_size_arguments(parser: argparse.ArgumentParser):
+
+    parser.add_argument("--links", help="The number of links. Default is 200.", type=int, default=200)
+    parser.add_argument("--hours", help="The number of hours per day type and direction. Default is 24.",
+                        type=int, default=24)
+    parser.add_argument("--fleet_size", help="The number of vehicles. Default is 50.", type=int, default=50)
+    parser.add_argument("--pollutants",
+                        help="The pollutants (names of PollutantType members). Default is NOx CO.",
+                        nargs="+",
+                        choices=[pollutant.name for pollutant in PollutantType],
+                        default=["NOx", "CO"])
+    parser.add_argument("--seed", help="The seed for the random values. Default is 0.", type=int, default=0)
+
+
+def generate_berlin_format_data(folder: str,
+                                links: int,
+                                hours: int,
+                                fleet_size: int,
+                                pollutants: List[str],
+                                seed: int = 0) -> Dict[str, str]:
+    """ Generate a berlin_format dataset in folder and return the locations of its files (see BERLIN_FORMAT_FILES).
+    pollutants are names of PollutantType members (e.g. 'NOx'). """
+
+    if not 1 <= hours <= 24:
+        raise RuntimeError(f"hours needs to be between 1 and 24. You passed {hours}.")
+
+    rng = np.random.default_rng(seed)
+    pollutant_values = [PollutantType[pollutant].value for pollutant in pollutants]
+
+    link_data = generate_link_data(rng, links)
+    vehicle_mapping = generate_vehicle_mapping(fleet_size)
+    data = {
+        "link_data": link_data.drop(columns=SHAPE_SPEED_OPTIONAL),
+        "link_data_with_speed": link_data,
+        "fleet_composition": generate_fleet_composition(rng, vehicle_mapping),
+        "traffic_data": generate_traffic_data(rng, link_data, hours),
+        "cold_starts": generate_cold_starts_data(rng, link_data, hours),
+        "los_speeds": generate_los_speeds_data(),
+        "vehicle_mapping": vehicle_mapping,
+        "copert_emission_factors": generate_copert_emission_factor_data(rng, vehicle_mapping, pollutant_values),
+        "cold_emission_factors": generate_cold_emission_factor_data(),
+        "hbefa_emission_factors": generate_hbefa_emission_factor_data(rng, vehicle_mapping, pollutant_values),
+        "hbefa_cold_start_emission_factors":
+            generate_hbefa_cold_start_emission_factor_data(rng, vehicle_mapping, pollutant_values)
+    }
+
+    os.makedirs(folder, exist_ok=True)
+    files = {}
+    for name in BERLIN_FORMAT_FILES:
+        files[name] = f"{folder}/{name}.csv"
+        data[name].to_csv(files[name], index=False)
+    return files
+
+
+def generate_link_data(rng: np.random.Generator, links: int) -> pd.DataFrame:
+
+    area_cats, road_cats, max_speeds = zip(*[LINK_TYPES[i % len(LINK_TYPES)] for i in range(links)])
+    max_speeds = np.array(max_speeds)
+    vehicle_shares = rng.dirichlet([10, 3, 2, 1, 1, 1], size=links)
+
+    return pd.DataFrame({
+        SHAPE_LINK_ID: [f"link_{i}" for i in range(links)],
+        SHAPE_LENGTH: rng.integers(20, 2000, size=links),
+        SHAPE_MAX_SPEED: max_speeds,
+        SHAPE_PC_PERC: vehicle_shares[:, 0],
+        SHAPE_LCV_PERC: vehicle_shares[:, 1],
+        SHAPE_HDV_PERC: vehicle_shares[:, 2],
+        SHAPE_UBUS_PERC: vehicle_shares[:, 3],
+        SHAPE_COACH_PERC: vehicle_shares[:, 4],
+        SHAPE_MC_PERC: vehicle_shares[:, 5],
+        SHAPE_AREA_CAT: area_cats,
+        SHAPE_ROAD_CAT: road_cats,
+        SHAPE_SPEED_OPTIONAL: np.round(max_speeds * rng.uniform(0.3, 1.0, size=links)).astype(int)
+    })
+
+
+def generate_vehicle_mapping(fleet_size: int) -> pd.DataFrame:
+
+    n_vehicles_per_category = get_number_of_vehicles_per_category(fleet_size)
+
+    rows = []
+    for fleet_comp_cat, n_vehicles in n_vehicles_per_category.items():
+        veh_cat, fuels, segments = VEHICLE_TYPES[fleet_comp_cat]
+        for i in range(n_vehicles):
+            rows.append((f"{fleet_comp_cat} vehicle {i}", veh_cat, *get_vehicle_type(i, fuels, segments)))
+
+    return pd.DataFrame(rows, columns=[MAP_VEH_NAME, MAP_VEH_CAT, MAP_FUEL, MAP_VEH_SEG, MAP_EURO, MAP_TECHNOLOGY])
+
+
+def get_number_of_vehicles_per_category(fleet_size: int) -> Dict[str, int]:
+    """ Spread the fleet over the vehicle categories according to FLEET_SHARES, with at least one vehicle per
+    category if the fleet is big enough. """
+
+    categories = list(FLEET_SHARES)
+    n_vehicles = {cat: 1 if fleet_size >= len(categories) else 0 for cat in categories}
+    for i in range(fleet_size - sum(n_vehicles.values())):
+        # give the next vehicle to the category that is furthest below its share
+        cat = max(categories, key=lambda cat: FLEET_SHARES[cat] * (i + 1) - n_vehicles[cat])
+        n_vehicles[cat] += 1
+    return n_vehicles
+
+
+def get_vehicle_type(i: int, fuels: List[str], segments: List[str]):
+    """ The fuel, segment, euro standard and technology of the i-th vehicle in a vehicle category.
+
+    The first vehicles are petrol Euro 1 vehicles (one per segment) if the category has petrol vehicles. The other
+    vehicles cycle through the combinations of fuel, segment and later euro standards. The technology makes the
+    combinations unique if there are more vehicles than combinations.
+    """
+
+    if "Petrol" in fuels and i < len(segments):
+        return "Petrol", segments[i], EURO_STANDARDS[0], "Tech 0"
+
+    i = i - len(segments) if "Petrol" in fuels else i
+    euro_standards = EURO_STANDARDS[1:] if "Petrol" in fuels else EURO_STANDARDS
+    n_combinations = len(fuels) * len(segments) * len(euro_standards)
+    fuel = fuels[i % len(fuels)]
+    segment = segments[i // len(fuels) % len(segments)]
+    euro_standard = euro_standards[i // (len(fuels) * len(segments)) % len(euro_standards)]
+    return fuel, segment, euro_standard, f"Tech {i // n_combinations}"
+
+
+def generate_fleet_composition(rng: np.random.Generator, vehicle_mapping: pd.DataFrame) -> pd.DataFrame:
+
+    fleet_comp_cats = vehicle_mapping[MAP_VEH_NAME].str.split(" ").str[0]
+    weights = pd.Series(rng.uniform(0.1, 1.0, size=len(vehicle_mapping)))
+    heavy_vehicles = fleet_comp_cats.isin(["S", "R", "B"])
+
+    return pd.DataFrame({
+        FLEET_COMP_VEH_NAME: vehicle_mapping[MAP_VEH_NAME],
+        FLEET_COMP_VEH_CAT: fleet_comp_cats,
+        FLEET_COMP_VEH_PERC: weights / weights.groupby(fleet_comp_cats).transform("sum"),
+        FLEET_COMP_NUM_AXLES: pd.Series(rng.integers(2, 6, size=len(vehicle_mapping))).where(heavy_vehicles)
+    })
+
+
+def generate_traffic_data(rng: np.random.Generator, link_data: pd.DataFrame, hours: int) -> pd.DataFrame:
+
+    traffic_data = get_traffic_data_keys(link_data, hours)
+    los_shares = rng.dirichlet([4, 2, 1, 1], size=len(traffic_data))
+
+    traffic_data[TRAFFIC_COUNT_VEH_COUNT] = rng.integers(0, 2000, size=len(traffic_data))
+    traffic_data[TRAFFIC_COUNT_LOS_1_PERC] = los_shares[:, 0]
+    traffic_data[TRAFFIC_COUNT_LOS_2_PERC] = los_shares[:, 1]
+    traffic_data[TRAFFIC_COUNT_LOS_3_PERC] = los_shares[:, 2]
+    traffic_data[TRAFFIC_COUNT_LOS_4_PERC] = los_shares[:, 3]
+    return traffic_data
+
+
+def generate_cold_starts_data(rng: np.random.Generator, link_data: pd.DataFrame, hours: int) -> pd.DataFrame:
+
+    cold_starts_data = get_traffic_data_keys(link_data, hours)
+    cold_starts_data["NumberOfStarts"] = rng.integers(0, 200, size=len(cold_starts_data))
+    return cold_starts_data
+
+
+def get_traffic_data_keys(link_data: pd.DataFrame, hours: int) -> pd.DataFrame:
+
+    keys = pd.MultiIndex.from_product(
+        [link_data[SHAPE_LINK_ID], TRAFFIC_COUNT_DIR_LEVELS, TRAFFIC_COUNT_DAY_TYPE_LEVELS, range(hours)],
+        names=[TRAFFIC_COUNT_LINK_ID, TRAFFIC_COUNT_DIR, TRAFFIC_COUNT_DAY_TYPE, TRAFFIC_COUNT_HOUR])
+    return keys.to_frame(index=False)
+
+
+def generate_los_speeds_data() -> pd.DataFrame:
+
+    rows = [
+        (veh_cat, f"{traffic_situation}/{los_type}", max(5, round(max_speed * speed_factor)))
+        for traffic_situation, max_speed in get_traffic_situations()
+        for veh_cat in LOS_SPEED_VEH_CAT_LEVELS
+        for los_type, speed_factor in LOS_SPEED_FACTORS.items()
+    ]
+    return pd.DataFrame(rows, columns=[LOS_SPEED_VEH_CAT, LOS_SPEED_TRAFFIC_SITUATION, LOS_SPEED_SPEED])
+
+
+def get_traffic_situations():
+    """ The traffic situations of the LINK_TYPES (e.g. 'URB/MW-City/80') with their max speeds. """
+
+    return [
+        (f"{'URB' if area_cat == '1' else 'RUR'}/{HEBEFA_ROAD_CAT_TO_LOS_SPEEDS_DATA_ROAD_CAT_MAPPING[road_cat]}/"
+         f"{max_speed}", max_speed)
+        for area_cat, road_cat, max_speed in LINK_TYPES
+    ]
+
+
+def generate_copert_emission_factor_data(rng: np.random.Generator,
+                                         vehicle_mapping: pd.DataFrame,
+                                         pollutants: List[str]) -> pd.DataFrame:
+
+    ef_data = pd.merge(vehicle_mapping.drop(columns=MAP_VEH_NAME).drop_duplicates(),
+                       pd.DataFrame({EF_POLL: pollutants}), how="cross")
+    ef_data = ef_data.rename(columns={MAP_VEH_CAT: EF_VEH_CAT, MAP_FUEL: EF_FUEL, MAP_VEH_SEG: EF_VEH_SEG,
+                                      MAP_EURO: EF_EURO, MAP_TECHNOLOGY: EF_TECHNOLOGY})
+    n_rows = len(ef_data)
+
+    # The coefficients give positive emission factors between MinSpeed and MaxSpeed.
+    ef_data[EF_MIN_SPEED] = 5
+    ef_data[EF_MAX_SPEED] = 130
+    ef_data[EF_ALPHA] = rng.uniform(1e-5, 1e-4, size=n_rows)
+    ef_data[EF_BETA] = rng.uniform(-2e-3, 0, size=n_rows)
+    ef_data[EF_GAMMA] = rng.uniform(0.5, 2, size=n_rows)
+    ef_data[EF_DELTA] = rng.uniform(0, 5, size=n_rows)
+    ef_data[EF_EPSILON] = rng.uniform(1e-6, 1e-5, size=n_rows)
+    ef_data[EF_ZITA] = rng.uniform(1e-3, 1e-2, size=n_rows)
+    ef_data[EF_HTA] = rng.uniform(0.5, 1.5, size=n_rows)
+    ef_data[EF_THITA] = 0
+    ef_data[EF_REDUC_FAC] = rng.choice([0, 0.1, 0.5], size=n_rows)
+    ef_data[EF_SLOPE] = np.nan
+    ef_data[EF_LOAD] = np.nan
+    ef_data[EF_MODE] = np.nan
+    return ef_data
+
+
+def generate_cold_emission_factor_data() -> pd.DataFrame:
+
+    rows = []
+    for pollutant in COLD_EF_POLLUTANTS:
+        for i, segment in enumerate(VEHICLE_TYPES["P"][2]):
+            if pollutant == "NOx":
+                rows += [(pollutant, segment, 5, 25, -20, np.nan, 0.02 * i, 0.1, 1.5),
+                         (pollutant, segment, 26, 45, -20, np.nan, 0.01 * i, 0.05, 1.2)]
+            else:
+                rows += [(pollutant, segment, 5, 25, -20, 15, 0.05 * i, -0.1, 4.0),
+                         (pollutant, segment, 26, 45, -20, 15, 0.04 * i, -0.08, 3.0),
+                         (pollutant, segment, 5, 45, 15, np.nan, 0.02 * i, -0.02, 2.0)]
+    return pd.DataFrame(rows, columns=["Pollutant", "VehSegment", "MinSpeed", "MaxSpeed", "MinTemp", "MaxTemp",
+                                       "A", "B", "C"])
+
+
+def generate_hbefa_emission_factor_data(rng: np.random.Generator,
+                                        vehicle_mapping: pd.DataFrame,
+                                        pollutants: List[str]) -> pd.DataFrame:
+
+    keys = pd.MultiIndex.from_product(
+        [pollutants,
+         [f"{traffic_situation}/{los_type}" for traffic_situation, _ in get_traffic_situations()
+          for los_type in LOS_SPEED_FACTORS],
+         vehicle_mapping[MAP_VEH_NAME]],
+        names=[HBEFA_EF_POLL, HBEFA_EF_TRAFFIC_SIT, HBEFA_EF_VEH_NAME])
+    ef_data = keys.to_frame(index=False)
+    ef_data[HBEFA_EF_EF] = rng.uniform(0.01, 2, size=len(ef_data))
+    return ef_data
+
+
+def generate_hbefa_cold_start_emission_factor_data(rng: np.random.Generator,
+                                                   vehicle_mapping: pd.DataFrame,
+                                                   pollutants: List[str]) -> pd.DataFrame:
+
+    keys = pd.MultiIndex.from_product([vehicle_mapping[MAP_VEH_NAME], pollutants],
+                                      names=["VehName", "Pollutant"])
+    ef_data = keys.to_frame(index=False)
+    ef_data["EmissionsPerStart"] = rng.uniform(0.01, 5, size=len(ef_data))
+    return ef_data
+
+
+def get_config(strategy_name: str,
+               berlin_format_files: Dict[str, str],
+               pollutants: List[str] = None) -> Dict[str, Any]:
+    """ The config arguments to run the Strategy with the given name on the berlin_format data in
+    berlin_format_files (see STRATEGIES). Returns None if the Strategy supports none of the pollutants. """
+
+    if pollutants is None:
+        pollutants = [pollutant.name for pollutant in PollutantType]
+    pollutants = get_pollutants_for_strategy(strategy_name, pollutants)
+    if len(pollutants) == 0:
+        return None
+
+    return {
+        "mode": "berlin_format",
+        "pollutants": [f"PollutantType.{pollutant}" for pollutant in pollutants],
+        **STRATEGIES[strategy_name]["config"],
+        **{key: berlin_format_files[name] for key, name in STRATEGIES[strategy_name]["files"].items()}
+    }
+
+
+def get_pollutants_for_strategy(strategy_name: str, pollutants: List[str]) -> List[str]:
+
+    strategy = STRATEGIES[strategy_name]
+    if "fixed_pollutants" in strategy:
+        return strategy["fixed_pollutants"]
+    if "pollutants" in strategy:
+        return [pollutant for pollutant in pollutants if pollutant in strategy["pollutants"]]
+    return pollutants
+
+
+def generate_yeti_format_data(folder: str, config: Dict[str, Any]) -> Dict[str, str]:
+    """ Convert the berlin_format data in config to yeti_format data in folder with the
+    load_berlin_format_data_function in config. Returns the locations of the yeti_format files. """
+
+    os.makedirs(folder, exist_ok=True)
+    load_berlin_format_data_function = dynamic_import_from(config["load_berlin_format_data_function"])
+    return load_berlin_format_data_function(**{
+        **config,
+        "output_folder": folder,
+        "output_folder_for_yeti_format_data": folder
+    })
+
+
+if __name__ == "__main__":
+    main()
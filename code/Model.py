@@ -1,10 +1,19 @@
 import logging
 import os
+from contextlib import contextmanager
 from time import time
 
+import pandas as pd
+
+from code.ParallelStrategyInvoker import ParallelStrategyInvoker
 from code.StrategyInvoker import StrategyInvoker
+from code.output_writing.Checkpoint import remove_checkpoint
+from code.script_helpers.ConversionCache import ConversionCache
+from code.script_helpers.RunMetrics import RunMetrics, write_metrics_file
 from code.script_helpers.create_info_file import create_info_file
 from code.script_helpers.dynamic_import_from import dynamic_import_from
+from code.strategy_helpers.ScenarioSweepStrategy import ScenarioSweepStrategy, get_scenarios
+from code.script_helpers.profiling import PROFILE_FILE, REPORT_FILE, combine_stats_files, profile, write_profile_report
 from code.strategy_helpers.helpers import get_timestamp
 
 
@@ -16,6 +25,16 @@ class Model:
     It relies on user defined functions for data loading and validation. It also relies on the
     StrategyInvoker in combination with the user defined Strategy to calculate emissions.
 
+    The wall time, CPU time, peak RSS and number of rows of each step and of the phases of the
+    emission calculation are saved in 'run_info.txt' and 'run_metrics.json' in the output folder.
+
+    Attributes
+    ----------
+    metrics : RunMetrics
+        The metrics of the steps of the run.
+    emission_calculation_metrics : RunMetrics
+        The metrics of the phases of the emission calculation, taken from the StrategyInvoker.
+
     Methods
     -------
     run
@@ -41,28 +60,32 @@ class Model:
         self.n_steps = 6
         self.current_step = 1
 
+        self.metrics = RunMetrics()
+        self.emission_calculation_metrics = RunMetrics()
+
     def run(self, config_dict, config_file):
 
         self.initialize(config_dict, config_file)
         self.log_run_information()
 
-        self.log_step("Initializing output directories.")
-        self.create_output_folders_if_necessary()
+        with self.step("output_folders", "Initializing output directories."):
+            self.create_output_folders_if_necessary()
 
-        self.log_step("Validating the dataset.")
-        self.validate_dataset()
+        with self.step("validation", "Validating the dataset."):
+            self.validate_dataset()
 
-        self.log_step("Converting data in berlin_format to data in yeti_format.")
-        yeti_format_file_locations = self.load_berlin_format_data()
+        with self.step("conversion", "Converting data in berlin_format to data in yeti_format."):
+            yeti_format_file_locations = self.load_berlin_format_data()
 
-        self.log_step("Loading yeti_format data.")
-        yeti_format_data_dataframes = self.load_yeti_format_data(yeti_format_file_locations)
+        with self.step("loading", "Loading yeti_format data."):
+            yeti_format_data_dataframes = self.load_yeti_format_data(yeti_format_file_locations)
 
-        self.log_step("Calculating emissions.")
-        self.calculate_emissions_with_user_defined_strategy(yeti_format_data_dataframes)
+        with self.step("emission_calculation", "Calculating emissions."):
+            self.calculate_emissions_with_user_defined_strategy(yeti_format_data_dataframes)
 
-        self.log_step("Creating 'run_info.txt'.")
-        self.create_run_info_file(yeti_format_file_locations)
+        with self.step("run_info", "Creating 'run_info.txt' and 'run_metrics.json'."):
+            self.create_run_info_file(yeti_format_file_locations)
+        self.create_run_metrics_file()  # after the last step, so that its metrics are included
 
         self.log_is_done_message()
 
@@ -124,6 +147,19 @@ class Model:
             f"\n"
         )
 
+    @contextmanager
+    def step(self, name, message):
+        """ Log the step and record its metrics under the given name while the body of the with statement runs. """
+
+        step_number = self.current_step
+        self.log_step(message)
+        with self.metrics.measure(name):
+            yield
+
+        metrics = self.metrics.stages[name]
+        logging.debug(f"Step {step_number} of {self.n_steps} took {metrics['wall_time_s']:.2f} s "
+                      f"(CPU time: {metrics['cpu_time_s']:.2f} s).")
+
     def log_step(self, message):
 
         logging.info(f"Step {self.current_step} of {self.n_steps}: {message}")
@@ -155,7 +191,10 @@ class Model:
 
     def load_berlin_format_data(self):
 
-        if self.mode == 'berlin_format':
+        if self.mode == 'berlin_format' and self.config_dict.get("conversion_cache_folder") is not None:
+            conversion_cache = ConversionCache(self.config_dict["conversion_cache_folder"], self.config_dict)
+            yeti_format_file_locations = conversion_cache.load_or_convert(self.berlin_format_data_load_function)
+        elif self.mode == 'berlin_format':
             yeti_format_file_locations = self.berlin_format_data_load_function(**self.config_dict)
         else:
             logging.debug("Call load yeti_format data function skipped because mode is 'yeti_format'.")
@@ -169,6 +208,8 @@ class Model:
             **yeti_format_file_locations
         }
         yeti_format_data_dataframes = self.yeti_format_data_load_function(**kwargs)
+        if isinstance(yeti_format_data_dataframes.get("traffic_data"), pd.DataFrame):  # unknown if read in chunks
+            self.metrics.add_rows("loading", len(yeti_format_data_dataframes["traffic_data"]))
         return yeti_format_data_dataframes
 
     def calculate_emissions_with_user_defined_strategy(self, yeti_format_data_dataframes):
@@ -176,9 +217,45 @@ class Model:
         emission_calc_config = {
             **self.config_dict,
             **yeti_format_data_dataframes,
-            "Strategy": self.strategy_class
+            "Strategy": self.get_strategy_class_for_emission_calculation()
         }
-        StrategyInvoker().calculate_and_save_emissions(self.emissions_output_folder, **emission_calc_config)
+        strategy_invoker = self.get_strategy_invoker()
+        profile_file = f"{self.emissions_output_folder}/{PROFILE_FILE}"
+        try:
+            with profile(profile_file, enabled=self.config_dict.get("profile") is True):
+                strategy_invoker.calculate_and_save_emissions(self.emissions_output_folder, **emission_calc_config)
+        finally:
+            self.emission_calculation_metrics = strategy_invoker.metrics
+            self.metrics.add_rows("emission_calculation", self.emission_calculation_metrics.get_rows("compute"))
+        remove_checkpoint(self.emissions_output_folder)  # the run is only resumed if the emission calculation fails
+
+        if self.config_dict.get("profile") is True:
+            self.write_profile(profile_file, getattr(strategy_invoker, "profile_files", []))
+
+    def write_profile(self, profile_file, profile_files_of_worker_processes):
+
+        combine_stats_files([profile_file, *profile_files_of_worker_processes], profile_file)
+        write_profile_report(profile_file, f"{self.emissions_output_folder}/{REPORT_FILE}", self.strategy_class)
+        logging.info(f"Saved the profile of the emission calculation in {self.emissions_output_folder}/{REPORT_FILE} "
+                     f"and {profile_file}.")
+
+    def get_strategy_class_for_emission_calculation(self):
+
+        if self.config_dict.get("scenarios") is None:
+            return self.strategy_class
+
+        scenarios = get_scenarios(self.config_dict["scenarios"])
+        logging.debug(f"Calculating emissions for {len(scenarios)} scenarios: {', '.join(scenarios)}.")
+        return ScenarioSweepStrategy
+
+    def get_strategy_invoker(self):
+
+        workers = self.config_dict.get("workers", 1)
+        if workers > 1:
+            partition_by = self.config_dict.get("partition_by", "LinkID")
+            logging.debug(f"Using {workers} worker processes. Traffic data is partitioned by {partition_by}.")
+            return ParallelStrategyInvoker(workers=workers, partition_by=partition_by)
+        return StrategyInvoker()
 
     def create_run_info_file(self, yeti_format_file_locations):
 
@@ -188,9 +265,27 @@ class Model:
             duration=time()-self.start_time,
             config_dict=self.config_dict,
             config_file=self.config_file,
-            yeti_format_file_locations=yeti_format_file_locations
+            yeti_format_file_locations=yeti_format_file_locations,
+            metrics_text=self.get_metrics_text()
         )
 
+    def get_metrics_text(self):
+
+        return (f"Steps:\n"
+                f"{self.metrics.get_text()}\n"
+                f"\n"
+                f"Phases of the emission calculation:\n"
+                f"{self.emission_calculation_metrics.get_text()}\n")
+
+    def create_run_metrics_file(self):
+
+        write_metrics_file(f"{self.emissions_output_folder}/run_metrics.json", {
+            "time_of_run": get_timestamp(),
+            "duration_s": time() - self.start_time,
+            "steps": self.metrics.to_dict(),
+            "emission_calculation_phases": self.emission_calculation_metrics.to_dict()
+        })
+
     def log_is_done_message(self):
 
         end_time = time()
@@ -0,0 +1,193 @@
+"""
+ParallelStrategyInvoker
+
+This module facilitates the invocation of the Strategy in multiple processes. It
+- splits the link data and the traffic data into shards with disjoint sets of links
+- runs a StrategyInvoker with its own Strategy instance for each shard in a process pool
+- merges the emission files written for the shards into the usual output files
+
+The traffic data is either a pd.DataFrame or - if it is read in chunks from a file in the memmap format - a
+TrafficMatrixChunks instance. In the second case, the shards only hold the positions of their rows. The worker
+processes read their rows from the memory-mapped files and share the pages instead of receiving copies of the data.
+
+The metrics of the phases 'merge', 'compute' and 'write' are summed over the worker processes. Splitting the data into
+shards and merging the emission files of the shards are recorded as the phases 'split' and 'merge_shard_outputs'.
+If the config argument 'profile' is True, each worker process profiles the emission calculation for its shards.
+Each shard has its own checkpoint in its shard folder. If the config argument 'resume' is True, the StrategyInvoker of
+each shard continues after the last checkpoint of the shard. The shard folders are only removed after merging.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from code.StrategyInvoker import StrategyInvoker
+from code.data_loading.TrafficMatrix import TrafficMatrixChunks
+from code.output_writing.Checkpoint import CHECKPOINT_FILE
+from code.output_writing.EmissionsWriter import get_emissions_writer
+from code.script_helpers.RunMetrics import RunMetrics
+from code.script_helpers.profiling import profile
+
+
+class ParallelStrategyInvoker:
+    """
+    Calculates emissions with multiple StrategyInvokers running in parallel and saves the results to disc.
+    Instances of this class are used by the Model class if the config argument 'workers' is greater than 1.
+
+    Attributes
+    ----------
+    metrics : RunMetrics
+        The metrics of the phases of the emission calculation (see the module docstring).
+    profile_files : List[str]
+        The files with the profiles of the shards if the config argument 'profile' is True.
+
+    Methods
+    -------
+    calculate_and_save_emissions
+        The main interface for this class. Has the same effect as StrategyInvoker.calculate_and_save_emissions,
+        but distributes the work over multiple processes.
+    """
+
+    def __init__(self, workers: int, partition_by: str = "LinkID"):
+
+        self.workers = workers
+        self.partition_by = partition_by
+        self.metrics = RunMetrics()
+        self.profile_files = []
+
+    def calculate_and_save_emissions(self, emissions_output_folder, **kwargs):
+        """
+        :param: kwargs:
+            The same keyword arguments as for StrategyInvoker.calculate_and_save_emissions.
+        """
+
+        self.raise_error_if_traffic_data_can_not_be_split(kwargs["traffic_data"])
+
+        os.makedirs(emissions_output_folder, exist_ok=True)
+        with self.metrics.measure("split"):
+            shards = self.split_into_shards(kwargs["link_data"], kwargs["traffic_data"])
+        shard_folders = [f"{emissions_output_folder}/shard_{i}" for i in range(len(shards))]
+        logging.debug(f"Calculating emissions for {len(shards)} shards in {self.workers} processes.")
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(
+                    calculate_and_save_emissions_for_shard,
+                    shard_folder, {**kwargs, "link_data": link_data, "traffic_data": traffic_data})
+                for shard_folder, (link_data, traffic_data) in zip(shard_folders, shards)
+            ]
+            for future in futures:
+                self.metrics.add_metrics(future.result())  # re-raises errors from the worker processes
+
+        if kwargs.get("profile") is True:
+            self.profile_files = [get_profile_file(shard_folder) for shard_folder in shard_folders]
+
+        logging.debug("Merging the emission files of the shards.")
+        with self.metrics.measure("merge_shard_outputs"):
+            self.merge_shard_outputs(shard_folders, emissions_output_folder, kwargs.get("output_format", "csv"))
+            self.remove_shard_folders(shard_folders)
+
+    def raise_error_if_traffic_data_can_not_be_split(self, traffic_data):
+
+        if not isinstance(traffic_data, (pd.DataFrame, TrafficMatrixChunks)):
+            raise RuntimeError("The traffic data can't be split into shards because it is read in chunks. "
+                               "The config arguments 'workers' and 'traffic_data_chunk_size' can only be combined "
+                               "if the yeti_format traffic data is in the memmap format.")
+
+    def split_into_shards(self, link_data: pd.DataFrame,
+                          traffic_data: pd.DataFrame) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """ Split link data and traffic data into shards with disjoint sets of links.
+
+        The values of the column `partition_by` in the link data are split into contiguous groups
+        (in order of their first appearance in the link data) with roughly the same number of traffic rows.
+        Links with a missing value in the column `partition_by` are put in the same shard.
+        If `partition_by` is 'LinkID', the merged outputs have the same row order as the output of a
+        single StrategyInvoker.
+        """
+
+        partition_values = link_data[self.partition_by].drop_duplicates()
+        shard_for_partition_value = self.assign_partition_values_to_shards(link_data, traffic_data, partition_values)
+        shard_for_link = link_data[self.partition_by].map(shard_for_partition_value)
+
+        shards = []
+        for shard in sorted(shard_for_partition_value.unique()):
+            link_data_for_shard = link_data[(shard_for_link == shard).to_numpy()]
+            traffic_data_for_shard = select_traffic_data_rows(
+                traffic_data, get_link_ids(traffic_data).isin(link_data_for_shard["LinkID"]).to_numpy())
+            shards.append((link_data_for_shard, traffic_data_for_shard))
+        return shards
+
+    def assign_partition_values_to_shards(self, link_data: pd.DataFrame, traffic_data: pd.DataFrame,
+                                          partition_values: pd.Series) -> pd.Series:
+
+        traffic_rows_per_link = get_link_ids(traffic_data).value_counts()
+        traffic_rows_per_partition_value = (
+            link_data["LinkID"].map(traffic_rows_per_link).fillna(0)
+            .groupby(link_data[self.partition_by].to_numpy(), sort=False, dropna=False).sum()
+            .reindex(partition_values.to_numpy())
+            .to_numpy()
+        )
+
+        n_shards = min(self.workers, len(partition_values))
+        rows_before_value = np.cumsum(traffic_rows_per_partition_value) - traffic_rows_per_partition_value
+        rows_per_shard = max(traffic_rows_per_partition_value.sum() / n_shards, 1)
+        shards = np.minimum((rows_before_value // rows_per_shard).astype(int), n_shards - 1)
+
+        return pd.Series(shards, index=partition_values.to_numpy())
+
+    def merge_shard_outputs(self, shard_folders: List[str], emissions_output_folder: str, output_format: str = "csv"):
+        """ Concatenate the emission files of all shards in shard order. """
+
+        emissions_writer = get_emissions_writer(output_format)
+
+        file_names = sorted({
+            file_name
+            for shard_folder in shard_folders if os.path.isdir(shard_folder)
+            for file_name in os.listdir(shard_folder) if file_name != CHECKPOINT_FILE
+        })
+
+        for file_name in file_names:
+            shard_files = [f"{folder}/{file_name}" for folder in shard_folders if os.path.isfile(f"{folder}/{file_name}")]
+            emissions_writer.concatenate_files(shard_files, f"{emissions_output_folder}/{file_name}")
+
+    def remove_shard_folders(self, shard_folders: List[str]):
+
+        for shard_folder in shard_folders:
+            if os.path.isdir(shard_folder):
+                shutil.rmtree(shard_folder)
+
+
+def get_link_ids(traffic_data) -> pd.Series:
+
+    if isinstance(traffic_data, TrafficMatrixChunks):
+        return traffic_data.get_link_ids()  # reads only the LinkID column from disc
+    return traffic_data["LinkID"]
+
+
+def select_traffic_data_rows(traffic_data, rows: np.ndarray):
+
+    if isinstance(traffic_data, TrafficMatrixChunks):
+        return traffic_data.select_rows(rows)
+    return traffic_data[rows]
+
+
+def calculate_and_save_emissions_for_shard(shard_output_folder: str, kwargs: Dict) -> Dict:
+    """ Run a StrategyInvoker for a single shard. This function is executed in the worker processes.
+
+    :return: the metrics of the StrategyInvoker as a dict (see RunMetrics.to_dict)
+    """
+
+    strategy_invoker = StrategyInvoker()
+    with profile(get_profile_file(shard_output_folder), enabled=kwargs.get("profile") is True):
+        strategy_invoker.calculate_and_save_emissions(shard_output_folder, **kwargs)
+    return strategy_invoker.metrics.to_dict()
+
+
+def get_profile_file(shard_output_folder: str) -> str:
+
+    return f"{shard_output_folder}.pstats"  # next to the shard folder, which is removed after merging the outputs
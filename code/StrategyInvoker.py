@@ -4,8 +4,24 @@ StrategyInvoker
 This module is facilitates the invocation of the Strategy. It
 - instantiates the Strategy
 - calls the Strategy's function `calculate_emissions` with the right parameters
-  once for each row in the traffic dataset
+  once for each row in the traffic dataset, or - if the Strategy implements it -
+  the function `calculate_emissions_batch` once for each block of rows
 - saves the emissions returned from the Strategy to disc
+
+The traffic data is either a pd.DataFrame or an iterator over chunks of the traffic data (e.g. the reader returned by
+`pd.read_csv` with a `chunksize`). In the second case, each chunk is joined to the link data and processed before the
+next chunk is read. This keeps the memory usage proportional to the chunk size.
+
+The time spent in the phases of the emission calculation is recorded in a RunMetrics instance:
+- merge: joining the traffic data and the link data (including reading the chunks of the traffic data)
+- compute: calculating the emissions with the Strategy
+- write: saving the emissions to disc (including the checkpoints)
+
+If the output format supports it, a checkpoint with the number of rows whose emissions are saved and the sizes of the
+output files is saved regularly (see Checkpoint.py). If the config argument `resume` is True, the emission calculation
+continues after the rows of the last checkpoint. The output files are truncated to their sizes at the checkpoint, so
+that no rows are duplicated. The rows of the traffic and link data are always processed in the same order, so skipping
+the first rows is enough to continue the calculation.
 """
 from collections import OrderedDict
 
@@ -13,12 +29,27 @@ import logging
 import os
 import pandas as pd
 
+from code.output_writing.BackgroundEmissionsWriter import BackgroundEmissionsWriter
+from code.output_writing.Checkpoint import Checkpoint
+from code.output_writing.EmissionsWriter import get_emissions_writer
+from code.script_helpers.RunMetrics import RunMetrics
+
 
 class StrategyInvoker:
     """
     Invokes the Strategy's function `calculate_emissions` and saves the results to disc.
     Instances of this class are used by the Model class.
 
+    Attributes
+    ----------
+    metrics : RunMetrics
+        The wall time, CPU time, peak RSS and number of rows of the phases 'merge', 'compute' and 'write'.
+    checkpoint : Checkpoint
+        Saves the progress of the emission calculation. None if the output format doesn't support checkpoints.
+    n_saved_rows : int
+        The number of rows of the traffic and link data whose emissions are saved (including the rows skipped when
+        resuming a run).
+
     Methods
     -------
     calculate_and_save_emissions
@@ -31,25 +62,42 @@ class StrategyInvoker:
         self.link_data = None
         self.vehicle_data = None
         self.traffic_data = None
+        self.traffic_data_chunks = None
         self.link_list = None
+        self.link_data_by_link_id = None
 
         self.output_file = None
-        self.use_header = True
+        self.emissions_writer = None
 
         self.vehicle_dict = None
         self.traffic_and_link_data = None
+        self.n_processed_rows = 0
+
+        self.checkpoint = None
+        self.n_done_rows = 0
+        self.n_saved_rows = 0
+        self.n_rows_to_skip = 0
 
         self.strategy = None
+        self.use_batch_calculation = False
         self.emissions_store = []
 
+        self.metrics = RunMetrics()
+
     def calculate_and_save_emissions(self, emissions_output_folder, save_interval_in_rows: int = 10000, **kwargs):
         """
         :param: kwargs:
             - Strategy (required)
             - link_data (required)
             - vehicle_data (required)
-            - traffic_data (required)
+            - traffic_data (required) - a pd.DataFrame or an iterator over pd.DataFrames with chunks of the
+              traffic data
             - links_to_use (optional)
+            - output_format (optional) - 'csv' (default), 'parquet' or 'feather'
+            - write_in_background (optional) - save emissions in a separate thread. Default is False.
+            - write_queue_size (optional) - number of blocks that may wait to be saved in the background. Default is 4.
+            - checkpoint_interval_in_seconds (optional) - minimum time between two checkpoints. Default is 60.
+            - resume (optional) - continue the emission calculation after the last checkpoint. Default is False.
             - all the keyword arguments required by the Strategy that is given
         """
 
@@ -57,7 +105,25 @@ class StrategyInvoker:
         self.initialize(emissions_output_folder, **kwargs)
 
         logging.debug("Calculating emissions.")
-        for i, row in self.traffic_and_link_data_rows():
+        try:
+            for data in self.traffic_and_link_data_chunks():
+
+                with self.metrics.measure("compute", rows=len(data)):  # the time for saving is counted as 'write'
+                    if self.use_batch_calculation:
+                        self.calculate_and_save_emissions_in_batches(data, save_interval_in_rows, **kwargs)
+                    else:
+                        self.calculate_and_save_emissions_row_by_row(data, save_interval_in_rows, **kwargs)
+
+                    self.save_emissions()
+
+            self.save_checkpoint(finished=True)
+        finally:
+            with self.metrics.measure("write"):
+                self.emissions_writer.close()  # finalize the output files even if the calculation fails
+
+    def calculate_and_save_emissions_row_by_row(self, data: pd.DataFrame, save_interval_in_rows: int, **kwargs):
+
+        for i, row in self.traffic_and_link_data_rows(data):
 
             self.display_progress(i)
 
@@ -69,21 +135,57 @@ class StrategyInvoker:
             except Exception as e:
                 self.handle_error_in_emission_calculation(e, row)
 
+            self.n_done_rows += 1
+
             if self.it_is_time_to_save_emissions(i, save_interval_in_rows):
                 self.save_emissions()
 
-        self.save_emissions()
+    def calculate_and_save_emissions_in_batches(self, data: pd.DataFrame, batch_size_in_rows: int, **kwargs):
+        """ Call the Strategy's function `calculate_emissions_batch` once per block of rows.
+
+        If the Strategy raises a NotImplementedError (e.g. because a composed Strategy only supports batch
+        calculation for some configurations), the remaining rows are processed row by row. If any other
+        error occurs, the rows in the failing block are processed row by row, so that errors are reported
+        for the individual rows in the same way as without batch calculation.
+        """
+
+        for start, block in self.traffic_and_link_data_blocks(data, batch_size_in_rows):
+
+            self.display_progress(start)
+
+            try:
+                emissions = self.strategy.calculate_emissions_batch(block, self.vehicle_dict, **kwargs)
+
+            except NotImplementedError:
+                logging.debug("The Strategy does not support batch calculation for this run. "
+                              "Falling back to row by row calculation.")
+                self.use_batch_calculation = False
+                self.calculate_and_save_emissions_row_by_row(data.iloc[start:], batch_size_in_rows, **kwargs)
+                return
+
+            except Exception as e:
+                self.handle_error_in_batch_emission_calculation(e, block)
+                self.calculate_and_save_emissions_row_by_row(block, batch_size_in_rows, **kwargs)
+                self.save_emissions()
+                continue
+
+            self.save_emissions_for_block(emissions, block)
+            self.n_done_rows += len(block)
+            self.mark_done_rows_as_saved()
 
     def initialize(self, emissions_output_folder, **kwargs):
 
         self.initialize_strategy(**kwargs)
         self.initialize_attributes(emissions_output_folder, **kwargs)
-        self.initialize_traffic_and_link_data()
+        self.initialize_checkpoint(emissions_output_folder, **kwargs)
+        with self.metrics.measure("merge"):
+            self.initialize_traffic_and_link_data()
         self.initialize_vehicle_dict()
 
     def initialize_strategy(self, **kwargs):
 
         self.strategy = kwargs["Strategy"]()
+        self.use_batch_calculation = self.strategy_supports_batch_calculation()
 
     def initialize_attributes(self, emissions_output_folder, **kwargs):
 
@@ -92,20 +194,65 @@ class StrategyInvoker:
         self.traffic_data = kwargs["traffic_data"]
         self.link_list = kwargs.get("links_to_use")
 
+        self.emissions_writer = self.initialize_emissions_writer(**kwargs)
         self.output_file = self.get_output_file_name(emissions_output_folder)
 
         self.vehicle_dict = None
         self.traffic_and_link_data = None
+        self.n_processed_rows = 0
+
+    def initialize_checkpoint(self, emissions_output_folder, **kwargs):
+
+        self.n_done_rows = self.n_saved_rows = self.n_rows_to_skip = 0
+
+        if not self.emissions_writer.supports_checkpoints:
+            if kwargs.get("resume") is True:
+                raise RuntimeError(f"Runs with the output_format {kwargs.get('output_format')} can't be resumed. "
+                                   f"Please use the output_format 'csv'.")
+            logging.debug("No checkpoints are saved, because the output format doesn't support them.")
+            self.checkpoint = None
+            return
+
+        self.checkpoint = Checkpoint(emissions_output_folder, kwargs, kwargs.get("checkpoint_interval_in_seconds", 60))
+        if kwargs.get("resume") is True:
+            self.resume_from_checkpoint()
+
+    def resume_from_checkpoint(self):
+
+        checkpoint = self.checkpoint.load()
+        if checkpoint is None:
+            logging.info("There is no checkpoint to resume from. The emission calculation starts with the first row.")
+            return
+
+        self.emissions_writer.resume(checkpoint["file_sizes"])
+        self.n_done_rows = self.n_saved_rows = self.n_rows_to_skip = checkpoint["rows_done"]
+        logging.info(f"Resuming the emission calculation after {self.n_rows_to_skip} rows.")
 
     def initialize_traffic_and_link_data(self):
 
+        if not isinstance(self.traffic_data, pd.DataFrame):
+            self.initialize_traffic_data_chunks()
+            return
+
         data = pd.merge(self.link_data, self.traffic_data, on="LinkID")
         if self.link_list is not None and len(self.link_list) > 0:
             data = data[data["LinkID"].isin(self.link_list)]
         self.traffic_and_link_data = data
+        self.metrics.add_rows("merge", len(data))
 
         self.traffic_data = None  # save memory by garbage collecting traffic_data early
 
+    def initialize_traffic_data_chunks(self):
+        """ Prepare the link data for joining it to the chunks of the traffic data one after the other. """
+
+        link_data = self.link_data
+        if self.link_list is not None and len(self.link_list) > 0:
+            link_data = link_data[link_data["LinkID"].isin(self.link_list)]
+        self.link_data_by_link_id = link_data.set_index("LinkID")
+
+        self.traffic_data_chunks = self.traffic_data
+        self.traffic_data = None
+
     def initialize_vehicle_dict(self):
 
         self.vehicle_dict = {
@@ -113,21 +260,74 @@ class StrategyInvoker:
             for t in self.vehicle_data.itertuples()
         }
 
+    def initialize_emissions_writer(self, **kwargs):
+
+        emissions_writer = get_emissions_writer(kwargs.get("output_format", "csv"))
+        if kwargs.get("write_in_background", False):
+            emissions_writer = BackgroundEmissionsWriter(emissions_writer, kwargs.get("write_queue_size", 4))
+        return emissions_writer
+
     def get_output_file_name(self, output_folder):
 
-        output_file = f"{output_folder}/emissions.csv"
+        output_file = f"{output_folder}/emissions.{self.emissions_writer.file_extension}"
         if not os.path.isdir(output_folder):
             os.mkdir(output_folder)
         return output_file
 
-    def traffic_and_link_data_rows(self):
+    def traffic_and_link_data_chunks(self):
+        """ Yield the traffic and link data in one piece or - if the traffic data is read in chunks - chunk by chunk.
+
+        The rows of a chunk keep the order of the traffic data. The link columns come first, like in the merged
+        data used if the traffic data is a single pd.DataFrame.
+        """
+
+        if self.traffic_data_chunks is None:
+            yield self.traffic_and_link_data.iloc[self.n_rows_to_skip:]
+            return
+
+        traffic_data_chunks = iter(self.traffic_data_chunks)
+        while True:
+            with self.metrics.measure("merge"):
+                traffic_data_chunk = next(traffic_data_chunks, None)
+                if traffic_data_chunk is None:
+                    return
+                self.traffic_and_link_data = self.join_traffic_data_chunk_and_link_data(traffic_data_chunk)
+                self.metrics.add_rows("merge", len(self.traffic_and_link_data))
+
+            rows_to_skip = max(self.n_rows_to_skip - self.n_processed_rows, 0)  # rows processed before resuming
+            if rows_to_skip < len(self.traffic_and_link_data):
+                yield self.traffic_and_link_data.iloc[rows_to_skip:]
+
+            self.n_processed_rows += len(self.traffic_and_link_data)
+
+    def join_traffic_data_chunk_and_link_data(self, traffic_data_chunk: pd.DataFrame) -> pd.DataFrame:
 
-        for i, row in self.traffic_and_link_data.iterrows():
+        data = traffic_data_chunk.join(self.link_data_by_link_id, on="LinkID", how="inner")
+        link_columns = ["LinkID", *self.link_data_by_link_id.columns]
+        data = data[link_columns + [col for col in traffic_data_chunk.columns if col != "LinkID"]]
+        return data.reset_index(drop=True)
+
+    def strategy_supports_batch_calculation(self) -> bool:
+
+        return callable(getattr(self.strategy, "calculate_emissions_batch", None))
+
+    def traffic_and_link_data_rows(self, data: pd.DataFrame):
+
+        for i, row in data.iterrows():
             row = row.to_dict()
             yield i, row
 
+    def traffic_and_link_data_blocks(self, data: pd.DataFrame, block_size: int):
+
+        for start in range(0, len(data), block_size):
+            yield start, data.iloc[start:start + block_size]
+
     def display_progress(self, current_row):
 
+        if self.traffic_data_chunks is not None:  # the total number of rows is unknown
+            print(f"{self.n_processed_rows + current_row} rows done", end='\r')
+            return
+
         perc_done = current_row / len(self.traffic_and_link_data) * 100
         print("%.1f percent done" % perc_done, end='\r')
 
@@ -150,6 +350,14 @@ class StrategyInvoker:
         )
         logging.exception(e)
 
+    def handle_error_in_batch_emission_calculation(self, e, block):
+
+        logging.warning(
+            f"An Error occured when processing a block of {len(block)} traffic data rows in batch mode. "
+            f"The rows in this block are processed row by row instead.\n"
+        )
+        logging.debug(e, exc_info=True)
+
     def it_is_time_to_save_emissions(self, row_index, save_interval_in_rows):
 
         return row_index % save_interval_in_rows == 0
@@ -158,15 +366,55 @@ class StrategyInvoker:
 
         if self.there_are_emissions_to_save():
 
-            if self.should_save_multiple_files():
-                self.save_emission_dicts_to_files()
+            with self.metrics.measure("write", rows=len(self.emissions_store)):
+                if self.should_save_multiple_files():
+                    self.save_emission_dicts_to_files()
 
-            else:
-                emission_data = pd.DataFrame(self.emissions_store)
-                self.save_dataframe_to_file(emission_data, self.output_file)
+                else:
+                    emission_data = pd.DataFrame(self.emissions_store)
+                    self.save_dataframe_to_file(emission_data, self.output_file)
 
             self.emissions_store = []
-            self.use_header = False  # only output the header once
+
+        self.mark_done_rows_as_saved()
+
+    def mark_done_rows_as_saved(self):
+
+        self.n_saved_rows = self.n_done_rows
+        if self.checkpoint is not None and self.checkpoint.is_due():
+            self.save_checkpoint()
+
+    def save_checkpoint(self, finished: bool = False):
+        """ Save a checkpoint after all emissions given to the emissions writer are on disc. """
+
+        if self.checkpoint is None:
+            return
+
+        with self.metrics.measure("write"):
+            self.emissions_writer.flush()
+            self.checkpoint.save(self.n_saved_rows, self.emissions_writer.get_file_sizes(), finished)
+
+    def save_emissions_for_block(self, emissions, block: pd.DataFrame):
+        """ Save the return value of the Strategy's function `calculate_emissions_batch`.
+
+        `emissions` is either a single pd.DataFrame or a Dict mapping names to pd.DataFrames. The DataFrames
+        contain one column per vehicle and share their index with `block`. The output files are the same as the
+        ones written for the equivalent return value of `calculate_emissions`.
+        """
+
+        if len(block) == 0:
+            return
+
+        with self.metrics.measure("write", rows=len(block)):
+            if isinstance(emissions, dict):
+                for name, emissions_for_name in emissions.items():
+                    emission_data = pd.concat(
+                        [block[["LinkID", "DayType", "Dir", "Hour"]], emissions_for_name], axis=1)
+                    output_file = self.get_output_file_for_emissions_for_name(name)
+                    self.save_dataframe_to_file(emission_data, output_file)
+            else:
+                emission_data = pd.concat([block[["LinkID", "DayType", "Hour", "Dir"]], emissions], axis=1)
+                self.save_dataframe_to_file(emission_data, self.output_file)
 
     def there_are_emissions_to_save(self):
 
@@ -214,8 +462,4 @@ class StrategyInvoker:
 
     def save_dataframe_to_file(self, data, file):
 
-        # the first save should override an existing file
-        mode = "w" if self.use_header is True else "a"
-
-        with open(file, mode) as fp:
-            data.to_csv(fp, header=self.use_header, index_label=False, index=False)
+        self.emissions_writer.write(data, file)
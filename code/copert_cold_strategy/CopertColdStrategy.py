@@ -4,8 +4,10 @@ CopertColdStrategy
 This module implements emission calculation with the COPERT methodology for cold start emissions.
 """
 import collections
+import copy
 from typing import Any, Dict, Iterable, Tuple, Union, List
 
+import numpy as np
 import pandas as pd
 
 from code.copert_hot_strategy.CopertHotStrategy import CopertHotStrategy
@@ -26,6 +28,10 @@ class CopertColdStrategy:
         a model run. Its job is to take a single traffic row (and some other parameters) and output
         a single row of the cold emissions data, the hot emissions data, and the total emissions data
         for each pollutant.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once.
+    copy_for_scenario
+        Returns a copy for another ltrip and temperature that shares the lookup tables which don't depend on them.
 
     """
 
@@ -62,6 +68,13 @@ class CopertColdStrategy:
 
         self.row = None
         self.hot_ef_dict = {}
+        self.emissions_context = None
+
+        self.vehicle_groups = None
+        self.cold_ef_parameters = {}
+        self.los_speeds_for_vehicle_categories = None
+        self.block = None
+        self.los_speeds_for_block = {}
 
         self.emissions = collections.defaultdict(dict)
 
@@ -79,7 +92,11 @@ class CopertColdStrategy:
         - temperature
         - exclude_road_types
         - exclude_area_types
-        - hot_emissions
+        - emissions_from_hot_strategy
+
+        optional kwargs:
+        - emissions_context_from_hot_strategy (HotEmissionsContext with the hot emission factors and los speeds
+          for the row. If it is not given, the hot emission factors are calculated from the hot emissions.)
 
         Returns a Dict with:
             - "hot" : hot emissions data frame
@@ -88,7 +105,8 @@ class CopertColdStrategy:
         """
 
         self.initialize_if_necessary(vehicle_dict, **kwargs)
-        self.store_row_data_in_attribute(traffic_and_link_data_row)
+        self.store_row_data_in_attribute(
+            traffic_and_link_data_row, kwargs.get("emissions_context_from_hot_strategy"))
         self.delete_emissions_from_last_call_to_this_function()
 
         hot_emissions = kwargs["emissions_from_hot_strategy"]
@@ -96,7 +114,7 @@ class CopertColdStrategy:
         for pollutant in pollutants:
 
             hot_emissions_for_pollutant = hot_emissions[pollutant]
-            hot_ef_dict = self.get_hot_ef_from_hot_emissions(hot_emissions_for_pollutant)
+            hot_ef_dict = self.get_hot_ef(pollutant, hot_emissions_for_pollutant)
 
             if self.should_exclude_link_from_cold_emission_calculation(**kwargs) or self.temperature_is_very_high():
                 cold_emissions = self.zero_emissions_for_all_vehicles()
@@ -108,6 +126,27 @@ class CopertColdStrategy:
 
         return self.emissions
 
+    def copy_for_scenario(self, **kwargs) -> "CopertColdStrategy":
+        """ Returns a copy of this Strategy for the ltrip and temperature in kwargs. Used for scenario sweeps
+        (see ScenarioSweepStrategy).
+
+        The copy shares the cold ef table, the vehicle groups and the other lookup tables that don't depend on ltrip
+        and temperature. The ABC_dict and the cold ef parameters depend on the temperature. They are determined
+        for the copy. If this Strategy is not initialized yet, a new instance is returned.
+        """
+
+        if self.is_not_initialized():
+            return CopertColdStrategy()
+
+        strategy = copy.copy(self)
+        strategy.ltrip = kwargs["ltrip"]
+        strategy.temperature = kwargs["temperature"]
+        strategy.ABC_dict = None
+        strategy.cold_ef_parameters = {}
+        strategy.emissions = collections.defaultdict(dict)
+        strategy.initialize_ABC_dict_if_necessary(kwargs["yeti_format_cold_ef_table"])
+        return strategy
+
     def initialize_if_necessary(self, vehicle_dict, **kwargs):
 
         if self.is_not_initialized():
@@ -117,8 +156,7 @@ class CopertColdStrategy:
 
     def is_not_initialized(self) -> bool:
 
-        data_attributes = [self.cold_ef_table, self.veh_mapping, self.los_speeds_dict,
-                           self.los_speeds_data, self.ltrip, self.temperature]
+        data_attributes = [self.cold_ef_table, self.veh_mapping, self.los_speeds_data, self.ltrip, self.temperature]
         return any(att is None for att in data_attributes)
 
     def initialize_hot_strategy(self, **kwargs):
@@ -137,7 +175,6 @@ class CopertColdStrategy:
         self.initialize_cold_ef_table(kwargs["yeti_format_cold_ef_table"])
         self.veh_mapping = kwargs["yeti_format_vehicle_mapping"].set_index("VehName")
         self.los_speeds_data = kwargs["yeti_format_los_speeds"]
-        self.los_speeds_dict = self.los_speeds_data.set_index(["LinkID", "VehicleCategory"]).to_dict(orient="index")
 
         self.ltrip = kwargs["ltrip"]
         self.temperature = kwargs["temperature"]
@@ -221,14 +258,33 @@ class CopertColdStrategy:
         except:
             return None
 
-    def store_row_data_in_attribute(self, row: Dict[str, Any]):
+    def store_row_data_in_attribute(self, row: Dict[str, Any], emissions_context=None):
 
         self.row = row
+        self.emissions_context = emissions_context
 
     def delete_emissions_from_last_call_to_this_function(self):
 
         self.emissions = collections.defaultdict(dict)
 
+    def get_hot_ef(self, pollutant: str, hot_emissions: Dict[str, float]) -> Dict[str, float]:
+        """ Return the hot efs from the context of the hot Strategy if available. Calculate them otherwise. """
+
+        if self.emissions_context is not None and pollutant in self.emissions_context.hot_efs:
+            return self.emissions_context.hot_efs[pollutant]
+        return self.get_hot_ef_from_hot_emissions(hot_emissions)
+
+    def get_los_speeds_for_row(self, vehicle_category: str) -> Dict[str, float]:
+        """ Return the los speeds for the row's link from the context of the hot Strategy if available.
+        Look them up in los_speeds_dict otherwise. """
+
+        if self.emissions_context is not None and vehicle_category in self.emissions_context.los_speeds:
+            return self.emissions_context.los_speeds[vehicle_category]
+
+        if self.los_speeds_dict is None:
+            self.los_speeds_dict = self.los_speeds_data.set_index(["LinkID", "VehicleCategory"]).to_dict(orient="index")
+        return self.los_speeds_dict[self.row["LinkID"], vehicle_category]
+
     def get_hot_ef_from_hot_emissions(self, hot_emissions: Dict[str, float]) -> Dict[str, float]:
         """Calculate the hot ef using the formula 'hot ef = hot emissions / link length / vehicle count' """
 
@@ -453,7 +509,7 @@ class CopertColdStrategy:
     def calculate_cold_emissions_petrol_pc_euro(self, pollutant: str, vehicle_name: str) -> float:
 
         vehicle_category = self.vehicle_dict[vehicle_name]
-        los_speeds_for_link_and_vehicle_category = self.los_speeds_dict[self.row["LinkID"], vehicle_category]
+        los_speeds_for_link_and_vehicle_category = self.get_los_speeds_for_row(vehicle_category)
 
         cold_emissions = 0
 
@@ -518,7 +574,7 @@ class CopertColdStrategy:
     def calculate_cold_emissions_lpg_pc_euro(self, pollutant: str, vehicle_name: str):
 
         vehicle_category = self.vehicle_dict[vehicle_name]
-        los_speeds_for_link_and_vehicle_category = self.los_speeds_dict[self.row["LinkID"], vehicle_category]
+        los_speeds_for_link_and_vehicle_category = self.get_los_speeds_for_row(vehicle_category)
 
         cold_emissions = 0
 
@@ -555,7 +611,7 @@ class CopertColdStrategy:
     def calculate_cold_emissions_cng_pc(self, pollutant: str, vehicle_name: str) -> float:
 
         vehicle_category = self.vehicle_dict[vehicle_name]
-        los_speeds_for_link_and_vehicle_category = self.los_speeds_dict[self.row["LinkID"], vehicle_category]
+        los_speeds_for_link_and_vehicle_category = self.get_los_speeds_for_row(vehicle_category)
 
         cold_emissions = 0
 
@@ -615,7 +671,7 @@ class CopertColdStrategy:
     def calculate_cold_emissions_petrol_lcv_euro(self, pollutant: str, vehicle_name: str) -> float:
 
         vehicle_category = self.vehicle_dict[vehicle_name]
-        los_speeds_for_link_and_vehicle_category = self.los_speeds_dict[self.row["LinkID"], vehicle_category]
+        los_speeds_for_link_and_vehicle_category = self.get_los_speeds_for_row(vehicle_category)
 
         cold_emissions = 0
 
@@ -665,6 +721,12 @@ class CopertColdStrategy:
 
     def get_hot_ef_lpg_and_cng_pc(self, vehicle_name: str) -> float:
 
+        veh_name_for_hot_ef = self.get_vehicle_for_hot_ef_lpg_and_cng_pc(vehicle_name)
+        ef_hot = self.hot_ef_dict[veh_name_for_hot_ef]
+        return ef_hot
+
+    def get_vehicle_for_hot_ef_lpg_and_cng_pc(self, vehicle_name: str) -> str:
+
         own_mapping_row = self.veh_mapping.loc[vehicle_name]
 
         if vehicle_name in self.vehicles_pc_lpg_pre_euro:
@@ -679,8 +741,7 @@ class CopertColdStrategy:
             (self.veh_mapping.index != vehicle_name)
         ].index.item()
 
-        ef_hot = self.hot_ef_dict[veh_name_for_hot_ef]
-        return ef_hot
+        return veh_name_for_hot_ef
 
     def get_cold_hot_quotient_for_diesel_vehicle(self, pollutant: str) -> float:
 
@@ -745,15 +806,7 @@ class CopertColdStrategy:
     def get_ABC_for_quotient_calculation(
             self, veh_segment: str, pollutant: str, speed: float) -> Tuple[float, float, float]:
 
-        self.initialize_ABC_dict_if_necessary(self.cold_ef_table)
-
-        pollutant_long_form = f"PollutantType.{pollutant}"
-        pollutant_short_form = pollutant.split(".")[-1]
-
-        cold_ef_data = self.ABC_dict.get((veh_segment, pollutant)) \
-                       or self.ABC_dict.get((veh_segment, pollutant_short_form)) \
-                       or self.ABC_dict.get((veh_segment, pollutant_long_form)) \
-                       or []
+        cold_ef_data = self.get_cold_ef_data_for_segment_and_pollutant(veh_segment, pollutant)
 
         for item in cold_ef_data:
             if item.MinSpeed <= speed <= item.MaxSpeed:
@@ -762,6 +815,18 @@ class CopertColdStrategy:
         raise RuntimeError(f"No ABC values could be found for vehicle segment: {veh_segment}, "
                            f"pollutant: {pollutant} and speed: {speed}")
 
+    def get_cold_ef_data_for_segment_and_pollutant(self, veh_segment: str, pollutant: str) -> List[Any]:
+
+        self.initialize_ABC_dict_if_necessary(self.cold_ef_table)
+
+        pollutant_long_form = f"PollutantType.{pollutant}"
+        pollutant_short_form = pollutant.split(".")[-1]
+
+        return self.ABC_dict.get((veh_segment, pollutant)) \
+            or self.ABC_dict.get((veh_segment, pollutant_short_form)) \
+            or self.ABC_dict.get((veh_segment, pollutant_long_form)) \
+            or []
+
     def cold_hot_quotient_A_B_C_formula(self, speed: float, temp: float, A: float, B: float, C: float) -> float:
 
         return A * speed + B * temp + C
@@ -836,4 +901,311 @@ class CopertColdStrategy:
 
     def vehicles(self) -> Iterable[str]:
 
-        return self.vehicle_dict.keys()
\ No newline at end of file
+        return self.vehicle_dict.keys()
+    #
+    # *** batch calculation ***
+    #
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once.
+
+        kwargs["emissions_from_hot_strategy"] holds the hot emissions for the block in the format returned by
+        the calculate_emissions_batch function of the hot Strategy (pollutant -> DataFrame with one column per
+        vehicle). If kwargs["emissions_context_from_hot_strategy"] is given, the hot emission factors and los speeds
+        are taken from it. Everything that does not depend on the traffic row (the vehicle group, beta correction factor,
+        vehicle to take the hot emission factor from, cold/hot quotient or A, B and C values) is determined once
+        per vehicle and pollutant. The cold emissions are then calculated for all rows of the block at once.
+        """
+
+        self.initialize_if_necessary(vehicle_dict, **kwargs)
+        self.initialize_vehicle_groups_if_necessary()
+
+        hot_emissions = kwargs["emissions_from_hot_strategy"]
+        is_excluded = self.get_rows_to_exclude_from_cold_emission_calculation(traffic_and_link_data, **kwargs)
+        emissions_context = kwargs.get("emissions_context_from_hot_strategy")
+        self.store_block_data_in_attribute(
+            traffic_and_link_data[~is_excluded],
+            emissions_context.select_rows(~is_excluded) if emissions_context is not None else None)
+
+        emissions = {}
+        for pollutant in pollutants:
+
+            hot_emissions_for_pollutant = hot_emissions[pollutant]
+
+            if is_excluded.all() or self.temperature_is_very_high():
+                cold_emissions = self.zero_emissions_for_all_vehicles_batch(traffic_and_link_data.index)
+            else:
+                hot_ef = self.get_hot_ef_batch(pollutant, hot_emissions_for_pollutant[~is_excluded])
+                cold_emissions = self.calculate_cold_emissions_batch(
+                    pollutant, hot_ef, is_excluded, traffic_and_link_data.index)
+
+            emissions[f"{pollutant}_cold"] = cold_emissions
+            emissions[f"{pollutant}_total"] = pd.DataFrame({
+                vehicle: hot_emissions_for_pollutant[vehicle] + cold_emissions[vehicle]
+                for vehicle in self.vehicles()
+            }, index=traffic_and_link_data.index)
+
+        return emissions
+
+    def initialize_vehicle_groups_if_necessary(self):
+        """ Map each vehicle to its vehicle group. The vehicles are ordered like the keys of the cold emissions
+        returned by calculate_cold_emissions. """
+
+        if self.vehicle_groups is None:
+            groups = [
+                ("pc_petrol_pre_euro", self.vehicles_pc_petrol_pre_euro),
+                ("pc_petrol_euro", self.vehicles_pc_petrol_euro),
+                ("pc_diesel", self.vehicles_pc_diesel),
+                ("pc_lpg_pre_euro", self.vehicles_pc_lpg_pre_euro),
+                ("pc_lpg_euro", self.vehicles_pc_lpg_euro),
+                ("pc_cng", self.vehicles_pc_cng),
+                ("lcv_petrol_pre_euro", self.vehicles_lcv_petrol_pre_euro),
+                ("lcv_petrol_euro", self.vehicles_lcv_petrol_euro),
+                ("lcv_diesel", self.vehicles_lcv_diesel),
+                ("other", self.vehicles_other)
+            ]
+            self.vehicle_groups = {veh_name: group for group, vehicles in groups for veh_name in vehicles}
+
+    def get_rows_to_exclude_from_cold_emission_calculation(self, data: pd.DataFrame, **kwargs) -> np.ndarray:
+
+        road_types_to_exclude = kwargs.get("exclude_road_types", [])
+        area_types_to_exclude = kwargs.get("exclude_area_types", [])
+
+        return (data["AreaType"].isin(area_types_to_exclude) | data["RoadType"].isin(road_types_to_exclude)).to_numpy()
+
+    def store_block_data_in_attribute(self, block: pd.DataFrame, emissions_context=None):
+
+        self.block = block
+        self.emissions_context = emissions_context
+        self.los_speeds_for_block = dict(emissions_context.los_speeds) if emissions_context is not None else {}
+
+    def zero_emissions_for_all_vehicles_batch(self, index: pd.Index) -> pd.DataFrame:
+
+        return pd.DataFrame({veh_name: np.zeros(len(index), dtype=int) for veh_name in self.vehicle_groups}, index=index)
+
+    def get_hot_ef_batch(self, pollutant: str, hot_emissions: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """ Batch version of get_hot_ef. Returns a Dict mapping vehicle names to arrays. """
+
+        if self.emissions_context is not None and pollutant in self.emissions_context.hot_efs:
+            hot_efs = self.emissions_context.hot_efs[pollutant]
+            return {veh_name: hot_efs[veh_name].to_numpy(dtype=float) for veh_name in hot_efs.columns}
+        return self.get_hot_ef_from_hot_emissions_batch(hot_emissions)
+
+    def get_hot_ef_from_hot_emissions_batch(self, hot_emissions: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """ Batch version of get_hot_ef_from_hot_emissions. Returns a Dict mapping vehicle names to arrays. """
+
+        link_length = self.block["Length"].to_numpy(dtype=float)
+
+        hot_ef = {}
+        for veh_name in hot_emissions.columns:
+            num_cars = self.block[veh_name].to_numpy(dtype=float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ef = hot_emissions[veh_name].to_numpy(dtype=float) / link_length / num_cars
+            # If length or vehicle count is 0, the hot ef value does not matter (see get_hot_ef_from_hot_emissions).
+            hot_ef[veh_name] = np.where((link_length == 0) | (num_cars == 0), 1, ef)
+
+        return hot_ef
+
+    def calculate_cold_emissions_batch(
+            self, pollutant: str, hot_ef: Dict[str, np.ndarray], is_excluded: np.ndarray, index: pd.Index
+    ) -> pd.DataFrame:
+
+        cold_emissions = {}
+        for veh_name, group in self.vehicle_groups.items():
+
+            if group == "other":
+                cold_emissions[veh_name] = np.zeros(len(index), dtype=int)
+                continue
+
+            cold_emissions[veh_name] = np.zeros(len(index))
+            if group in {"pc_petrol_euro", "pc_lpg_euro", "pc_cng", "lcv_petrol_euro"}:
+                cold_emissions[veh_name][~is_excluded] = self.calculate_cold_emissions_for_los_speeds_batch(
+                    pollutant, veh_name, hot_ef)
+            else:
+                cold_emissions[veh_name][~is_excluded] = self.calculate_cold_emissions_for_vehicle_batch(
+                    pollutant, veh_name, hot_ef)
+
+        return pd.DataFrame(cold_emissions, index=index)
+
+    def calculate_cold_emissions_for_vehicle_batch(
+            self, pollutant: str, veh_name: str, hot_ef: Dict[str, np.ndarray]) -> np.ndarray:
+        """ Batch version of the cold emission calculation for the vehicle groups without LOS speeds. """
+
+        parameters = self.get_cold_ef_parameters(veh_name, pollutant)
+
+        return self.cold_emissions_formula_batch(
+            ltrip=self.ltrip, temp=self.temperature, beta_correction_factor=parameters["beta_correction_factor"],
+            num_cars=self.block[veh_name].to_numpy(dtype=float), link_length=self.block["Length"].to_numpy(dtype=float),
+            ef_hot=hot_ef[parameters["hot_ef_vehicle"]], cold_hot_quotient=parameters["cold_hot_quotient"])
+
+    def calculate_cold_emissions_for_los_speeds_batch(
+            self, pollutant: str, veh_name: str, hot_ef: Dict[str, np.ndarray]) -> np.ndarray:
+        """ Batch version of e.g. calculate_cold_emissions_petrol_pc_euro. The cold emissions are calculated for
+        each LOS speed and weighted with the LOS percentages. """
+
+        los_speeds = self.get_los_speeds_for_block(self.vehicle_dict[veh_name])
+        los_percentages = self.block[
+            ["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]].to_numpy(dtype=float)
+
+        # Cold emissions are 0 for speeds above 45 km/h. Everything else is only needed for the other speeds.
+        is_calculated = ~(los_speeds > 45)
+        emissions_for_speeds = np.zeros(los_speeds.shape)
+
+        if is_calculated.any():
+            parameters = self.get_cold_ef_parameters(veh_name, pollutant)
+            cold_hot_quotient = self.get_cold_hot_quotient_for_los_speeds_batch(
+                pollutant, parameters, los_speeds, is_calculated)
+            emissions = self.cold_emissions_formula_batch(
+                ltrip=self.ltrip, temp=self.temperature, beta_correction_factor=parameters["beta_correction_factor"],
+                num_cars=self.block[veh_name].to_numpy(dtype=float)[:, np.newaxis],
+                link_length=self.block["Length"].to_numpy(dtype=float)[:, np.newaxis],
+                ef_hot=hot_ef[parameters["hot_ef_vehicle"]][:, np.newaxis], cold_hot_quotient=cold_hot_quotient)
+            emissions_for_speeds = np.where(is_calculated, emissions, 0)
+
+        # add up one LOS after the other to get the same results as the row by row calculation
+        cold_emissions = np.zeros(len(los_speeds))
+        for los_index in range(4):
+            cold_emissions += emissions_for_speeds[:, los_index] * los_percentages[:, los_index]
+
+        return cold_emissions
+
+    def get_cold_ef_parameters(self, veh_name: str, pollutant: str) -> Dict[str, Any]:
+        """ Returns the parameters for the cold emission calculation that don't depend on the traffic row. """
+
+        if (veh_name, pollutant) not in self.cold_ef_parameters:
+            self.cold_ef_parameters[(veh_name, pollutant)] = self.determine_cold_ef_parameters(veh_name, pollutant)
+        return self.cold_ef_parameters[(veh_name, pollutant)]
+
+    def determine_cold_ef_parameters(self, veh_name: str, pollutant: str) -> Dict[str, Any]:
+
+        group = self.vehicle_groups[veh_name]
+
+        if group == "pc_petrol_pre_euro":
+            return {"hot_ef_vehicle": veh_name, "beta_correction_factor": 1,
+                    "cold_hot_quotient": self.get_cold_hot_quotient_petrol_pc_pre_euro(pollutant)}
+        elif group in {"pc_diesel", "lcv_diesel"}:
+            return {"hot_ef_vehicle": veh_name, "beta_correction_factor": 1,
+                    "cold_hot_quotient": self.get_cold_hot_quotient_for_diesel_vehicle(pollutant)}
+        elif group == "pc_lpg_pre_euro":
+            return {"hot_ef_vehicle": self.get_vehicle_for_hot_ef_lpg_and_cng_pc(veh_name), "beta_correction_factor": 1,
+                    "cold_hot_quotient": self.get_cold_hot_quotient_lpg_pc_pre_euro(pollutant)}
+        elif group == "lcv_petrol_pre_euro":
+            return {"hot_ef_vehicle": veh_name, "beta_correction_factor": 1,
+                    "cold_hot_quotient": self.get_hot_cold_quotient_petrol_lcv_pre_euro(pollutant)}
+        elif group in {"pc_petrol_euro", "lcv_petrol_euro"}:
+            return {"hot_ef_vehicle": self.corresponding_euro1_vehicles[veh_name],
+                    "beta_correction_factor": self.get_beta_correction_factor(veh_name, pollutant),
+                    **self.get_ABC_data_for_vehicle(veh_name, pollutant)}
+        elif group == "pc_lpg_euro":
+            return {"hot_ef_vehicle": self.get_vehicle_for_hot_ef_lpg_and_cng_pc(veh_name),
+                    "beta_correction_factor": self.get_beta_correction_factor(veh_name, pollutant),
+                    **self.get_ABC_data_for_vehicle(veh_name, pollutant)}
+        elif group == "pc_cng":
+            ABC_data = {"ABC_data": None} if "voc" in pollutant.lower() \
+                else self.get_ABC_data_for_vehicle(veh_name, pollutant)
+            return {"hot_ef_vehicle": self.get_vehicle_for_hot_ef_lpg_and_cng_pc(veh_name),
+                    "beta_correction_factor": 1, **ABC_data}
+
+        raise RuntimeError(f"No cold emission parameters for vehicle {veh_name} in vehicle group {group}.")
+
+    def get_ABC_data_for_vehicle(self, veh_name: str, pollutant: str) -> Dict[str, Any]:
+        """ Returns the A, B and C values for the vehicle and pollutant as an array with the columns
+        MinSpeed, MaxSpeed, A, B and C. """
+
+        veh_segment = self.get_veh_segment(veh_name)
+        cold_ef_data = self.get_cold_ef_data_for_segment_and_pollutant(veh_segment, pollutant)
+        ABC_data = np.array(
+            [[item.MinSpeed, item.MaxSpeed, item.A, item.B, item.C] for item in cold_ef_data], dtype=float
+        ).reshape(-1, 5)
+        return {"veh_segment": veh_segment, "ABC_data": ABC_data}
+
+    def get_cold_hot_quotient_for_los_speeds_batch(
+            self, pollutant: str, parameters: Dict[str, Any], speeds: np.ndarray, is_calculated: np.ndarray
+    ) -> np.ndarray:
+
+        if parameters["ABC_data"] is None:
+            return self.get_cold_hot_quotient_ABC_method_for_cng_pollutant_voc_batch(speeds)
+
+        self.check_speeds_and_temp_in_valid_range_batch(speeds[is_calculated], self.temperature)
+
+        # Go through the ABC data backwards, so that the first matching entry wins
+        # like in get_ABC_for_quotient_calculation.
+        A, B, C = np.full(speeds.shape, np.nan), np.full(speeds.shape, np.nan), np.full(speeds.shape, np.nan)
+        found = np.zeros(speeds.shape, dtype=bool)
+        for min_speed, max_speed, a, b, c in parameters["ABC_data"][::-1]:
+            matches = (min_speed <= speeds) & (speeds <= max_speed)
+            A, B, C = np.where(matches, a, A), np.where(matches, b, B), np.where(matches, c, C)
+            found |= matches
+
+        if not found[is_calculated].all():
+            missing_speeds = np.unique(speeds[is_calculated & ~found])
+            raise RuntimeError(f"No ABC values could be found for vehicle segment: {parameters['veh_segment']}, "
+                               f"pollutant: {pollutant} and speeds: {list(missing_speeds[:10])}")
+
+        return self.cold_hot_quotient_A_B_C_formula(speeds, self.temperature, A, B, C)
+
+    def get_cold_hot_quotient_ABC_method_for_cng_pollutant_voc_batch(self, speeds: np.ndarray) -> np.ndarray:
+
+        if -20 <= self.temperature <= 15:
+            is_slow = speeds <= 25
+            A = np.where(is_slow, 0.118568, 0.212969)
+            B = np.where(is_slow, -0.15633, -0.25526)
+            C = np.where(is_slow, 5.538047, 3.339635)
+        elif self.temperature > 15:
+            A, B, C = 0.035948, -0.36023, 10.39479
+        else:
+            raise RuntimeError(f"No ABC values for CNG vehicles and pollutant VOC at temperature {self.temperature}")
+
+        return self.cold_hot_quotient_A_B_C_formula(speeds, self.temperature, A, B, C)
+
+    def check_speeds_and_temp_in_valid_range_batch(self, speeds: np.ndarray, temp: float):
+
+        self.initialize_max_min_cold_ef_stats_if_necessary()
+
+        if (speeds > self.max_speed_in_cold_ef).any() \
+                or (speeds < self.min_speed_in_cold_ef).any() \
+                or temp < self.min_temp_in_cold_ef:
+            raise RuntimeError(f"No ABC data for Temp = {temp} and Speeds between {speeds.min()} and {speeds.max()}")
+
+    def get_los_speeds_for_block(self, vehicle_category: str) -> np.ndarray:
+        """ Returns the los speeds for the links of the current block as an array of shape (rows, 4).
+        Raises a KeyError if there are no los speeds for a link and the vehicle category. """
+
+        if vehicle_category not in self.los_speeds_for_block:
+
+            los_speeds = self.get_los_speeds_for_vehicle_category(vehicle_category)
+            indices = los_speeds.index.get_indexer(self.block["LinkID"])
+            if (indices < 0).any():
+                unknown_links = pd.unique(self.block["LinkID"].to_numpy()[indices < 0])
+                raise KeyError(f"No los speeds for vehicle category {vehicle_category} and links {list(unknown_links[:10])}")
+
+            self.los_speeds_for_block[vehicle_category] = los_speeds.to_numpy(dtype=float)[indices]
+
+        return self.los_speeds_for_block[vehicle_category]
+
+    def get_los_speeds_for_vehicle_category(self, vehicle_category: str) -> pd.DataFrame:
+
+        los_speed_columns = ["LOS1Speed", "LOS2Speed", "LOS3Speed", "LOS4Speed"]
+
+        if self.los_speeds_for_vehicle_categories is None:
+            self.los_speeds_for_vehicle_categories = {
+                category: los_speeds.set_index("LinkID")[los_speed_columns]
+                for category, los_speeds in self.los_speeds_data.groupby("VehicleCategory")
+            }
+
+        return self.los_speeds_for_vehicle_categories.get(vehicle_category, pd.DataFrame(columns=los_speed_columns))
+
+    def cold_emissions_formula_batch(
+            self, ltrip: float, temp: float, beta_correction_factor: float, num_cars: np.ndarray,
+            link_length: np.ndarray, ef_hot: np.ndarray, cold_hot_quotient: Union[float, np.ndarray]) -> np.ndarray:
+        """ Batch version of cold_emissions_formula. The factors are multiplied in the same order. """
+
+        beta = self.calculate_beta(ltrip, temp)
+        cold_hot_quotient = np.where(cold_hot_quotient < 1, 1, cold_hot_quotient)
+        with np.errstate(over="ignore", invalid="ignore"):
+            return beta_correction_factor * beta * num_cars * link_length * ef_hot * (cold_hot_quotient - 1)
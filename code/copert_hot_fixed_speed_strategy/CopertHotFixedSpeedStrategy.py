@@ -9,7 +9,12 @@ It uses speed-dependent emission factors based on eather
 from typing import Any, Dict, List
 import collections
 
+import numpy as np
+import pandas as pd
+
 from code.copert_hot_strategy.CopertHotStrategy import CopertHotStrategy
+from code.strategy_helpers.EfCache import EfCache
+from code.strategy_helpers.HotEmissionsContext import HotEmissionsContext
 
 
 class CopertHotFixedSpeedStrategy(CopertHotStrategy):
@@ -21,6 +26,12 @@ class CopertHotFixedSpeedStrategy(CopertHotStrategy):
         ef_dict : Dict
             Holds emission factor data in the format ``(VehicleName, Pollutant, Slope, Load) ->
                 {'Alpha': .., 'Beta': .., ...}``
+        ef_cache : EfCache
+            Caches the emission factors by ``(VehicleName, Pollutant, speed)``.
+            The cache size can be set with the config argument ``ef_cache_size``.
+        emissions_context : HotEmissionsContext
+            Holds the emission factors used in the last call to ``calculate_emissions`` or
+            ``calculate_emissions_batch``. Composed Strategies pass it on to the cold Strategy.
         emissions : Dict
             Contains emission values and is used to assemble the output of ``calculate_emissions``.
 
@@ -30,15 +41,20 @@ class CopertHotFixedSpeedStrategy(CopertHotStrategy):
             The main interface for this Strategy. calculate_emissions is called over and over during
             a model run. Its job is to take a single traffic row (and some other parameters) and output
             a single emissions row for each pollutant.
+        calculate_emissions_batch
+            Does the same as calculate_emissions, but for a whole block of traffic rows at once.
 
         """
 
     def __init__(self, **kwargs):
 
-        ef_data = kwargs.get("emission_factor_data")
-        if ef_data is not None:
-            self.ef_dict = self.get_ef_dict(ef_data)
+        self.ef_dict = None
+        self.ef_cache = None
+
+        self.ef_arrays = None
+        self.ef_arrays_key = None
 
+        self.emissions_context = None
         self.emissions = collections.defaultdict(dict)
 
     def calculate_emissions(self,
@@ -59,8 +75,13 @@ class CopertHotFixedSpeedStrategy(CopertHotStrategy):
 
     def initialize_if_necessary(self, kwargs):
 
-        if hasattr(self, "ef_dict") is False:
-            self.__init__(**kwargs)
+        if self.ef_dict is None:
+            self.initialize(**kwargs)
+
+    def initialize(self, **kwargs):
+
+        self.ef_dict = self.get_ef_dict(kwargs["emission_factor_data"])
+        self.ef_cache = EfCache(kwargs.get("ef_cache_size", 100000))
 
     def calculate_emissions_for_vehicle(
             self, traffic_and_link_data_row, vehicle_name, vehicle_category, pollutant, **kwargs):
@@ -81,8 +102,47 @@ class CopertHotFixedSpeedStrategy(CopertHotStrategy):
         elif speed < min_speed:
             speed = min_speed
 
-        ef = self.calculate_ef_copert(speed, ef_dict_for_vehicle)
+        ef = self.get_ef_copert_for_speed(speed, vehicle_name, pollutant, ef_dict_for_vehicle)
 
         emissions = ef * float(traffic_and_link_data_row["Length"]) * float(traffic_and_link_data_row[vehicle_name])
 
         self.emissions[pollutant][vehicle_name] = emissions
+        self.emissions_context.hot_efs[pollutant][vehicle_name] = ef
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_if_necessary(kwargs)
+        self.initialize_ef_arrays_if_necessary(vehicle_dict, pollutants)
+
+        vehicle_names = list(vehicle_dict.keys())
+        speeds = self.get_fixed_speeds_for_block(traffic_and_link_data, len(vehicle_names), **kwargs)
+        link_length = traffic_and_link_data["Length"].to_numpy(dtype=float)
+        vehicle_counts = traffic_and_link_data[vehicle_names].to_numpy(dtype=float)
+
+        self.emissions_context = HotEmissionsContext(hot_efs={})
+
+        emissions = {}
+        for pollutant_index, pollutant in enumerate(pollutants):
+            ef = self.calculate_ef_copert_batch(speeds, pollutant_index)
+            emissions[pollutant] = pd.DataFrame(
+                ef * link_length[:, np.newaxis] * vehicle_counts,
+                index=traffic_and_link_data.index, columns=vehicle_names)
+            self.emissions_context.hot_efs[pollutant] = pd.DataFrame(
+                ef, index=traffic_and_link_data.index, columns=vehicle_names)
+
+        return emissions
+
+    def get_fixed_speeds_for_block(self, traffic_and_link_data: pd.DataFrame, n_vehicles: int, **kwargs) -> np.ndarray:
+        """ Returns the speeds for all rows and vehicles as an array of shape (rows, vehicles). """
+
+        # if "v" is given in config, use "v". If not, use the "Speed" from the given rows.
+        if "v" in kwargs:
+            speeds = np.full(len(traffic_and_link_data), float(kwargs["v"]))
+        else:
+            speeds = traffic_and_link_data["Speed"].to_numpy(dtype=float)
+
+        return np.repeat(speeds[:, np.newaxis], n_vehicles, axis=1)
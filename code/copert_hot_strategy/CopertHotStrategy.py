@@ -7,11 +7,16 @@ It uses speed-dependent emission factors based on
 - the los percentages and
 - the los speeds attributed to the links.
 """
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 import collections
 
+import numpy as np
 import pandas as pd
 
+from code.strategy_helpers.EfCache import EfCache
+from code.strategy_helpers.HotEmissionsContext import HotEmissionsContext
+from code.strategy_helpers.LosEfTable import LosEfTable, get_fingerprint, load_or_build_los_ef_table
+
 
 class CopertHotStrategy:
     """
@@ -25,6 +30,20 @@ class CopertHotStrategy:
     ef_dict : Dict
         Holds emission factor data in the format ``(VehicleName, Pollutant, Slope, Load) ->
             {'Alpha': .., 'Beta': .., ...}``
+    ef_cache : EfCache
+        Caches the emission factors calculated by ``calculate_ef_copert`` by ``(VehicleName, Pollutant, speed)``,
+        where speed is the speed after clipping it to the valid speed range of the emission factor.
+        The cache size can be set with the config argument ``ef_cache_size``.
+    ef_arrays : Dict
+        Holds the emission factor coefficients from ef_dict as arrays of shape (vehicles, pollutants)
+        in the format ``'Alpha' -> np.ndarray``. Used by ``calculate_emissions_batch``.
+    los_ef_table : LosEfTable
+        Holds the emission factors for each link, vehicle, pollutant and LOS. Used by ``calculate_emissions_batch``.
+    los_speeds_for_table_keys : np.ndarray
+        Holds the los speeds for the links in los_ef_table as an array of shape (links, vehicles, 4).
+    emissions_context : HotEmissionsContext
+        Holds the emission factors and los speeds used in the last call to ``calculate_emissions`` or
+        ``calculate_emissions_batch``. Composed Strategies pass it on to the cold Strategy.
     emissions : Dict
         Contains emission values and is used to assemble the output of ``calculate_emissions``.
 
@@ -34,6 +53,8 @@ class CopertHotStrategy:
         The main interface for this Strategy. calculate_emissions is called over and over during
         a model run. Its job is to take a single traffic row (and some other parameters) and output
         a single emissions row for each pollutant.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once.
 
     """
 
@@ -41,7 +62,14 @@ class CopertHotStrategy:
 
         self.los_speeds_dict = None
         self.ef_dict = None
+        self.ef_cache = None
+
+        self.ef_arrays = None
+        self.ef_arrays_key = None
+        self.los_ef_table = None
+        self.los_speeds_for_table_keys = None
 
+        self.emissions_context = None
         self.emissions = collections.defaultdict(dict)
 
     def calculate_emissions(self,
@@ -76,6 +104,7 @@ class CopertHotStrategy:
 
         self.los_speeds_dict = self.get_los_speeds_dict(los_speeds_data)
         self.ef_dict = self.get_ef_dict(ef_data)
+        self.ef_cache = EfCache(kwargs.get("ef_cache_size", 100000))
 
     def get_los_speeds_dict(self, los_speeds_data):
 
@@ -92,6 +121,7 @@ class CopertHotStrategy:
     def delete_emissions_from_last_call_to_this_function(self):
 
         self.emissions = collections.defaultdict(dict)
+        self.emissions_context = HotEmissionsContext()
 
     def calculate_emissions_for_vehicle(
             self, traffic_and_link_data_row, vehicle_name, vehicle_category, pollutant, **kwargs):
@@ -109,6 +139,8 @@ class CopertHotStrategy:
         emissions = ef * link_length * vehicle_count
 
         self.emissions[pollutant][vehicle_name] = emissions
+        self.emissions_context.hot_efs[pollutant][vehicle_name] = ef
+        self.emissions_context.los_speeds[vehicle_category] = los_speeds
 
     def get_ef(self, row: Dict[str, Any], vehicle_name: str, pollutant: str, los_speeds: Dict[str, float]) -> float:
 
@@ -131,7 +163,7 @@ class CopertHotStrategy:
             elif speed < min_speed:
                 speed = min_speed
 
-            ef_for_speed = self.calculate_ef_copert(speed, ef_dict_for_vehicle)
+            ef_for_speed = self.get_ef_copert_for_speed(speed, vehicle_name, pollutant, ef_dict_for_vehicle)
             efs_for_los.append(ef_for_speed)
 
         los_weighted_speed_dependant_ef = 0
@@ -151,6 +183,17 @@ class CopertHotStrategy:
         
         return self.ef_dict[(vehicle_name, pollutant, 0.0, 0.0)]
 
+    def get_ef_copert_for_speed(self, speed: float, vehicle_name: str, pollutant: str,
+                                concrete_ef_dict: Dict[str, float]) -> float:
+        """ Return the result of calculate_ef_copert from the ef_cache or calculate and cache it. """
+
+        key = (vehicle_name, pollutant, speed)
+        ef = self.ef_cache.get(key)
+        if ef is None:
+            ef = self.calculate_ef_copert(speed, concrete_ef_dict)
+            self.ef_cache.put(key, ef)
+        return ef
+
     def calculate_ef_copert(self, speed: float, concrete_ef_dict: Dict[str, float]) -> float:
 
             numerator = (
@@ -168,3 +211,167 @@ class CopertHotStrategy:
             ef = numerator / denominator * (1 - reduction_factor)
             return ef
 
+    #
+    # *** batch calculation ***
+    #
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_if_necessary(kwargs)
+        self.initialize_los_ef_table_if_necessary(vehicle_dict, pollutants, **kwargs)
+
+        vehicle_names = list(vehicle_dict.keys())
+        link_indices = self.los_ef_table.get_indices(traffic_and_link_data["LinkID"])
+        los_percentages = traffic_and_link_data[
+            ["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]].to_numpy(dtype=float)
+        link_length = traffic_and_link_data["Length"].to_numpy(dtype=float)
+        vehicle_counts = traffic_and_link_data[vehicle_names].to_numpy(dtype=float)
+
+        self.emissions_context = HotEmissionsContext(
+            hot_efs={}, los_speeds=self.get_los_speeds_for_block(link_indices, vehicle_dict))
+
+        emissions = {}
+        for pollutant_index, pollutant in enumerate(pollutants):
+            ef = self.get_ef_batch(traffic_and_link_data, link_indices, los_percentages, pollutant_index)
+            emissions[pollutant] = pd.DataFrame(
+                ef * link_length[:, np.newaxis] * vehicle_counts,
+                index=traffic_and_link_data.index, columns=vehicle_names)
+            self.emissions_context.hot_efs[pollutant] = pd.DataFrame(
+                ef, index=traffic_and_link_data.index, columns=vehicle_names)
+
+        return emissions
+
+    def initialize_ef_arrays_if_necessary(self, vehicle_dict: Dict[str, str], pollutants: List[str]):
+
+        ef_arrays_key = (tuple(vehicle_dict.keys()), tuple(pollutants))
+        if self.ef_arrays_key != ef_arrays_key:
+            self.ef_arrays = self.get_ef_arrays(list(vehicle_dict.keys()), pollutants)
+            self.ef_arrays_key = ef_arrays_key
+
+    def initialize_los_ef_table_if_necessary(self, vehicle_dict: Dict[str, str], pollutants: List[str], **kwargs):
+        """ Load or build the table with the emission factors for each link, vehicle, pollutant and LOS.
+
+        If the config argument ``los_ef_table_file`` is given, the table is saved to that file and reused
+        in later runs with the same input data.
+        """
+
+        if (self.los_ef_table is not None
+                and self.los_ef_table.vehicle_names == list(vehicle_dict.keys())
+                and self.los_ef_table.pollutants == list(pollutants)):
+            return
+
+        fingerprint = get_fingerprint(
+            type(self).__name__, vehicle_dict, pollutants, kwargs["los_speeds_data"], kwargs["emission_factor_data"])
+        self.los_ef_table = load_or_build_los_ef_table(
+            kwargs.get("los_ef_table_file"), fingerprint, lambda: self.build_los_ef_table(vehicle_dict, pollutants))
+        self.los_speeds_for_table_keys = None
+
+    def build_los_ef_table(self, vehicle_dict: Dict[str, str], pollutants: List[str]) -> LosEfTable:
+
+        self.initialize_ef_arrays_if_necessary(vehicle_dict, pollutants)
+        link_ids, los_speeds = self.get_los_speeds_for_all_links(vehicle_dict)
+
+        efs = np.empty((len(link_ids), len(vehicle_dict), len(pollutants), 4))
+        for pollutant_index in range(len(pollutants)):
+            efs[:, :, pollutant_index, :] = self.calculate_ef_copert_batch(los_speeds, pollutant_index)
+
+        missing = np.repeat(np.isnan(los_speeds).any(axis=2)[:, :, np.newaxis], len(pollutants), axis=2)
+        return LosEfTable(link_ids, list(vehicle_dict.keys()), pollutants, efs, missing)
+
+    def get_ef_arrays(self, vehicle_names: List[str], pollutants: List[str]) -> Dict[str, np.ndarray]:
+        """ Pack the emission factor coefficients into arrays of shape (vehicles, pollutants). """
+
+        coefficients = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zita", "Hta", "ReductionPerc",
+                        "MinSpeed", "MaxSpeed"]
+        ef_arrays = {coefficient: np.empty((len(vehicle_names), len(pollutants))) for coefficient in coefficients}
+
+        for vehicle_index, vehicle_name in enumerate(vehicle_names):
+            for pollutant_index, pollutant in enumerate(pollutants):
+                ef_dict_for_vehicle = self.get_ef_dict_for_vehicle(vehicle_name, pollutant)
+                for coefficient in coefficients:
+                    ef_arrays[coefficient][vehicle_index, pollutant_index] = float(ef_dict_for_vehicle[coefficient])
+
+        return ef_arrays
+
+    def get_los_speeds_for_all_links(self, vehicle_dict: Dict[str, str]) -> Tuple[pd.Index, np.ndarray]:
+        """ Returns the LinkIDs and the los speeds for all links and vehicles as an array of shape (links, vehicles, 4).
+
+        The speeds are NaN for vehicles whose vehicle category has no los speeds for a link.
+        """
+
+        los_speeds_data = pd.DataFrame.from_dict(self.los_speeds_dict, orient="index")[
+            ["LOS1Speed", "LOS2Speed", "LOS3Speed", "LOS4Speed"]].astype(float)
+        link_ids = los_speeds_data.index.get_level_values(0).unique()
+        vehicle_categories = los_speeds_data.index.get_level_values(1)
+
+        los_speeds = np.full((len(link_ids), len(vehicle_dict), 4), np.nan)
+        for vehicle_index, vehicle_category in enumerate(vehicle_dict.values()):
+            if vehicle_category in vehicle_categories:
+                los_speeds[:, vehicle_index, :] = los_speeds_data.xs(vehicle_category, level=1).reindex(link_ids)
+
+        return link_ids, los_speeds
+
+    def get_los_speeds_for_block(self, link_indices: np.ndarray, vehicle_dict: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """ Returns the los speeds for the rows of a block in the format ``VehicleCategory -> array of shape (rows, 4)``.
+
+        link_indices are the positions of the rows' links in los_ef_table (see LosEfTable.get_indices).
+        """
+
+        if self.los_speeds_for_table_keys is None:
+            link_ids, los_speeds = self.get_los_speeds_for_all_links(vehicle_dict)
+            self.los_speeds_for_table_keys = los_speeds[link_ids.get_indexer(self.los_ef_table.keys)]
+
+        los_speeds_for_block = {}
+        for vehicle_index, vehicle_category in enumerate(vehicle_dict.values()):
+            if vehicle_category not in los_speeds_for_block:
+                los_speeds_for_block[vehicle_category] = self.los_speeds_for_table_keys[link_indices, vehicle_index, :]
+
+        return los_speeds_for_block
+
+    def get_ef_batch(self,
+                     traffic_and_link_data: pd.DataFrame,
+                     link_indices: np.ndarray,
+                     los_percentages: np.ndarray,
+                     pollutant_index: int) -> np.ndarray:
+        """ Vectorized version of ``get_ef``. Returns the emission factors as an array of shape (rows, vehicles). """
+
+        ef = self.los_ef_table.get_los_weighted_efs(link_indices, pollutant_index, los_percentages)
+
+        if "EF" in traffic_and_link_data.columns:
+            ef_from_config = traffic_and_link_data["EF"].to_numpy(dtype=float)[:, np.newaxis]
+            ef = np.where(np.isnan(ef_from_config), ef, ef_from_config)
+
+        return ef
+
+    def calculate_ef_copert_batch(self, speeds: np.ndarray, pollutant_index: int) -> np.ndarray:
+        """ Vectorized version of ``calculate_ef_copert``.
+
+        speeds is an array of shape (rows, vehicles) or (rows, vehicles, n_speeds). The speeds are
+        clipped to the valid speed range of the emission factor for each vehicle before calculating the ef.
+        """
+
+        alpha, beta, gamma, delta, epsilon, zita, hta, reduction_factor, min_speed, max_speed = (
+            self.get_coefficients_for_pollutant(pollutant_index, speeds.ndim))
+
+        speed = self.clip_speeds(speeds, min_speed, max_speed)
+
+        numerator = alpha * speed ** 2 + beta * speed + gamma + delta / speed
+        denominator = epsilon * speed ** 2 + zita * speed + hta
+        return numerator / denominator * (1 - reduction_factor)
+
+    def get_coefficients_for_pollutant(self, pollutant_index: int, ndim: int) -> Tuple[np.ndarray, ...]:
+
+        shape = (1, -1) + (1,) * (ndim - 2)
+        return tuple(
+            self.ef_arrays[coefficient][:, pollutant_index].reshape(shape)
+            for coefficient in ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zita", "Hta", "ReductionPerc",
+                                "MinSpeed", "MaxSpeed"]
+        )
+
+    def clip_speeds(self, speeds: np.ndarray, min_speed: np.ndarray, max_speed: np.ndarray) -> np.ndarray:
+
+        return np.where(speeds > max_speed, max_speed, np.where(speeds < min_speed, min_speed, speeds))
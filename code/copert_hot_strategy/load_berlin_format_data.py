@@ -1,5 +1,5 @@
 from code.data_loading.DataLoader import DataLoader
-from code.strategy_helpers.helpers import save_dataframes
+from code.strategy_helpers.helpers import get_traffic_data_dict, save_dataframes
 
 
 def load_copert_hot_berlin_format_data(**kwargs):
@@ -17,7 +17,8 @@ def load_copert_hot_berlin_format_data(**kwargs):
         nh3_ef_file=kwargs.get("berlin_format_nh3_emission_factors"),
         nh3_mapping_file=kwargs.get("berlin_format_nh3_mapping")
     )
-    data = loader.load_data(use_nh3_ef=use_nh3_tier2_ef)
+    data = loader.load_data(use_nh3_ef=use_nh3_tier2_ef,
+                            factored_traffic_data=kwargs.get("factored_traffic_data", False))
     (link_data, vehicle_data, traffic_data, los_speeds_data, emission_factor_data, missing_ef_data) = data
 
     yeti_format_data_file_paths = save_dataframes(
@@ -27,7 +28,8 @@ def load_copert_hot_berlin_format_data(**kwargs):
             "yeti_format_los_speeds": los_speeds_data,
             "yeti_format_vehicle_data": vehicle_data,
             "yeti_format_link_data": link_data,
-            "yeti_format_traffic_data": traffic_data
-         }
+            **get_traffic_data_dict(traffic_data)
+         },
+        file_format=kwargs.get("yeti_format_file_format", "csv")
     )
     return yeti_format_data_file_paths
\ No newline at end of file
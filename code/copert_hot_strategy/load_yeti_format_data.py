@@ -1,5 +1,6 @@
 import numpy as np
-import pandas as pd
+
+from code.data_loading.yeti_format_files import read_yeti_format_file, read_yeti_format_traffic_data_file
 
 
 def load_copert_hot_yeti_format_data(**kwargs):
@@ -11,30 +12,33 @@ def load_copert_hot_yeti_format_data(**kwargs):
     link_data_file = kwargs.get('yeti_format_link_data')
     traffic_data_file = kwargs.get('yeti_format_traffic_data')
     traffic_data_n_rows = kwargs.get('use_n_traffic_data_rows')
+    traffic_data_chunk_size = kwargs.get('traffic_data_chunk_size')
 
-    emission_factor_data = pd.read_csv(emission_factor_data_file,
-                                       dtype={"Pollutant": "category", "VehicleName": str})
+    emission_factor_data = read_yeti_format_file(emission_factor_data_file,
+                                                 dtype={"Pollutant": "category", "VehicleName": str})
 
-    vehicle_data = pd.read_csv(vehicle_data_file,
-                               dtype={"VehicleName": str, "VehicleCategory": "category",
-                                      "RoadType": "category", "AreaType": "category"})
+    vehicle_data = read_yeti_format_file(vehicle_data_file,
+                                         dtype={"VehicleName": str, "VehicleCategory": "category",
+                                                "RoadType": "category", "AreaType": "category"})
 
-    link_data = pd.read_csv(link_data_file,
-                            dtype={"LinkID": str})
+    link_data = read_yeti_format_file(link_data_file,
+                                      dtype={"LinkID": str})
 
     vehicle_names = list(vehicle_data.VehicleName)
 
-    traffic_data = pd.read_csv(
+    traffic_data = read_yeti_format_traffic_data_file(
         traffic_data_file,
+        kwargs.get('yeti_format_vehicle_shares'),  # only given for factored traffic data
         dtype={"LinkID": str, "Dir": "category", "DayType": "category", "Hour": np.int8,
                **{veh_name: np.float32 for veh_name in vehicle_names},
                **{f"LOS{i}Percentage": np.float32 for i in range(1, 5)}},
-        nrows=traffic_data_n_rows
+        nrows=traffic_data_n_rows,
+        chunksize=traffic_data_chunk_size  # if given, traffic_data is an iterator over chunks
     )
 
-    los_speeds_data = pd.read_csv(los_speeds_data_file,
-                                  dtype={"LinkID": str, "VehicleCategory": "category", "LOSType": "category",
-                                         "LOS1": float, "LOS2": float, "LOS3": float, "LOS4": float})
+    los_speeds_data = read_yeti_format_file(los_speeds_data_file,
+                                            dtype={"LinkID": str, "VehicleCategory": "category", "LOSType": "category",
+                                                   "LOS1": float, "LOS2": float, "LOS3": float, "LOS4": float})
 
     return {
         "link_data": link_data,
@@ -31,6 +31,8 @@ The output of this Strategy depends on the config arguments. There are three cas
 """
 from typing import Any, Dict, List
 
+import pandas as pd
+
 from code.copert_cold_strategy.CopertColdStrategy import CopertColdStrategy
 from code.copert_hot_fixed_speed_strategy.CopertHotFixedSpeedStrategy import CopertHotFixedSpeedStrategy
 from code.copert_hot_strategy.CopertHotStrategy import CopertHotStrategy
@@ -58,12 +60,19 @@ class CopertStrategy:
         The main interface for this Strategy. calculate_emissions is called over and over during
         a model run. Its job is to take a single traffic row (and some other parameters) and output
         a single emissions row for each pollutant.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once. Raises a
+        NotImplementedError if the Strategies used for the calculation don't support batch calculation.
+    calculate_emissions_batch_for_scenarios
+        Does the same as calculate_emissions_batch for each scenario of a scenario sweep (see ScenarioSweepStrategy).
+        The hot emissions are calculated only once.
     """
 
     def __init__(self):
 
         self.hot_strategy = None
         self.cold_strategy = None
+        self.cold_strategies_for_scenarios = {}
 
     def calculate_emissions(self,
                             traffic_and_link_data_row: Dict[str, Any],
@@ -81,12 +90,106 @@ class CopertStrategy:
         hot_emissions = self.calculate_hot_emissions(
             traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs)
         cold_emissions = self.calculate_cold_emissions(
-            traffic_and_link_data_row, vehicle_dict, pollutants, emissions_from_hot_strategy=hot_emissions, **kwargs)
+            traffic_and_link_data_row, vehicle_dict, pollutants, emissions_from_hot_strategy=hot_emissions,
+            **self.get_emissions_context_from_hot_strategy(), **kwargs)
 
         hot_emissions = add_prefix_to_keys("hot", hot_emissions)
 
         return {**hot_emissions, **cold_emissions}
 
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_if_necessary(**kwargs)
+        return self.calculate_emissions_batch_with_sub_strategies(
+            traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+
+    def calculate_emissions_batch_with_sub_strategies(
+            self, traffic_and_link_data, vehicle_dict, pollutants, **kwargs) -> Dict[str, pd.DataFrame]:
+
+        if kwargs.get("only_hot") is True:
+            kwargs = remove_prefix_from_keys("hot_", kwargs)
+            return self.call_batch_function_of_strategy(
+                self.hot_strategy, traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+
+        if getattr(self.cold_strategy, "calculate_emissions_batch", None) is None:
+            raise NotImplementedError(f"{type(self.cold_strategy).__name__} does not support batch calculation.")
+
+        hot_emissions = self.call_batch_function_of_strategy(
+            self.hot_strategy, traffic_and_link_data, vehicle_dict, pollutants, **self.get_kwargs_for_hot(kwargs))
+        cold_emissions = self.call_batch_function_of_strategy(
+            self.cold_strategy, traffic_and_link_data, vehicle_dict, pollutants,
+            emissions_from_hot_strategy=hot_emissions, **self.get_emissions_context_from_hot_strategy(),
+            **self.get_kwargs_for_cold(kwargs))
+
+        return {**add_prefix_to_keys("hot", hot_emissions), **add_prefix_to_keys("cold", cold_emissions)}
+
+    def calculate_emissions_batch_for_scenarios(self,
+                                                traffic_and_link_data: pd.DataFrame,
+                                                vehicle_dict: Dict[str, str],
+                                                pollutants: List[str],
+                                                scenarios: Dict[str, Dict[str, Any]],
+                                                **kwargs) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Returns the return value of calculate_emissions_batch for each scenario by scenario name. The config
+        arguments of a scenario (e.g. 'temperature' and 'ltrip') override the ones in kwargs.
+
+        The hot emissions don't depend on the scenario. They are calculated once for all scenarios. The cold
+        emissions are calculated with one cold Strategy per scenario (see get_cold_strategy_for_scenario).
+        """
+
+        self.initialize_if_necessary(**kwargs)
+
+        if kwargs.get("only_hot") is True:
+            emissions = self.calculate_emissions_batch_with_sub_strategies(
+                traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+            return {name: emissions for name in scenarios}
+
+        if getattr(self.cold_strategy, "calculate_emissions_batch", None) is None:
+            raise NotImplementedError(f"{type(self.cold_strategy).__name__} does not support batch calculation.")
+
+        hot_emissions = self.call_batch_function_of_strategy(
+            self.hot_strategy, traffic_and_link_data, vehicle_dict, pollutants, **self.get_kwargs_for_hot(kwargs))
+        emissions_context = self.get_emissions_context_from_hot_strategy()
+
+        emissions = {}
+        for name, scenario in scenarios.items():
+            kwargs_for_cold = self.get_kwargs_for_cold({**kwargs, **scenario})
+            cold_emissions = self.call_batch_function_of_strategy(
+                self.get_cold_strategy_for_scenario(name, kwargs_for_cold), traffic_and_link_data, vehicle_dict,
+                pollutants, emissions_from_hot_strategy=hot_emissions, **emissions_context, **kwargs_for_cold)
+            emissions[name] = {**add_prefix_to_keys("hot", hot_emissions), **add_prefix_to_keys("cold", cold_emissions)}
+
+        return emissions
+
+    def get_cold_strategy_for_scenario(self, name: str, kwargs_for_cold: Dict[str, Any]):
+        """ The first scenario uses the cold_strategy. The other scenarios use copies of it if the cold Strategy
+        implements `copy_for_scenario` (the copies share the lookup tables that don't depend on the scenario)
+        and new instances otherwise. """
+
+        if name not in self.cold_strategies_for_scenarios:
+            if len(self.cold_strategies_for_scenarios) == 0:
+                cold_strategy = self.cold_strategy
+            elif callable(getattr(self.cold_strategy, "copy_for_scenario", None)):
+                cold_strategy = self.cold_strategy.copy_for_scenario(**kwargs_for_cold)
+            else:
+                cold_strategy = type(self.cold_strategy)()
+            self.cold_strategies_for_scenarios[name] = cold_strategy
+
+        return self.cold_strategies_for_scenarios[name]
+
+    def call_batch_function_of_strategy(
+            self, sub_strategy, traffic_and_link_data, vehicle_dict, pollutants, **kwargs) -> Dict[str, pd.DataFrame]:
+
+        batch_function = getattr(sub_strategy, "calculate_emissions_batch", None)
+        if batch_function is None:
+            raise NotImplementedError(f"{type(sub_strategy).__name__} does not support batch calculation.")
+
+        return batch_function(traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+
     def initialize_if_necessary(self, **kwargs):
 
         if self.hot_strategy is None or self.cold_strategy is None:
@@ -103,22 +206,38 @@ class CopertStrategy:
 
     def calculate_hot_emissions(self, traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs):
 
-        kwargs_for_hot = drop_keys_starting_with("cold_", kwargs)
-        kwargs_for_hot = remove_prefix_from_keys("hot_", kwargs_for_hot)
-
         hot_emissions = self.hot_strategy.calculate_emissions(
-            traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs_for_hot)
+            traffic_and_link_data_row, vehicle_dict, pollutants, **self.get_kwargs_for_hot(kwargs))
 
         return hot_emissions
 
     def calculate_cold_emissions(self, traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs):
 
-        kwargs_for_cold = drop_keys_starting_with("hot_", kwargs)
-        kwargs_for_cold = remove_prefix_from_keys("cold_", kwargs_for_cold)
-
         cold_emissions = self.cold_strategy.calculate_emissions(
-            traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs_for_cold)
+            traffic_and_link_data_row, vehicle_dict, pollutants, **self.get_kwargs_for_cold(kwargs))
 
         cold_emissions = add_prefix_to_keys("cold", cold_emissions)
 
         return cold_emissions
+
+    def get_emissions_context_from_hot_strategy(self) -> Dict[str, Any]:
+        """ Returns the kwargs that pass the HotEmissionsContext of the hot Strategy on to the cold Strategy.
+
+        The cold Strategy then doesn't need to recover the hot emission factors from the hot emissions. The
+        kwargs are empty if the hot Strategy does not provide a context.
+        """
+
+        emissions_context = getattr(self.hot_strategy, "emissions_context", None)
+        if emissions_context is None:
+            return {}
+        return {"emissions_context_from_hot_strategy": emissions_context}
+
+    def get_kwargs_for_hot(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+
+        kwargs_for_hot = drop_keys_starting_with("cold_", kwargs)
+        return remove_prefix_from_keys("hot_", kwargs_for_hot)
+
+    def get_kwargs_for_cold(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+
+        kwargs_for_cold = drop_keys_starting_with("hot_", kwargs)
+        return remove_prefix_from_keys("cold_", kwargs_for_cold)
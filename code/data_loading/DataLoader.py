@@ -38,7 +38,7 @@ class DataLoader:
 
         self.filenames_dict = kwargs
 
-    def load_data(self, use_nh3_ef: bool = True, **kwargs):
+    def load_data(self, use_nh3_ef: bool = True, factored_traffic_data: bool = False, **kwargs):
         """ Load and transform input data in berlin_format.
 
         This method will delegate responsibilities to other classes to perform all
@@ -46,7 +46,8 @@ class DataLoader:
         It will use the file locations that were passed to the constructor ('__init__').
 
         :return: link_data, vehicle_data, traffic_data, los_speeds_data, emission_factor_data and missing_ef_data
-                 in yeti_format as pd.DataFrames
+                 in yeti_format as pd.DataFrames. If factored_traffic_data is True, traffic_data is the tuple
+                 (traffic_data_by_category, vehicle_shares) (see TrafficDataLoader.load_factored_data).
         """
 
         print("[data_loading] 1/7: Loading data from file.")
@@ -79,7 +80,10 @@ class DataLoader:
         los_speeds_data = self.load_los_speeds_data(link_data, los_speeds_data)
 
         print("[data_loading] 7/7: Building traffic_data.")
-        traffic_data = self.load_traffic_data(fleet_comp_data, link_data, traffic_count_data)
+        if factored_traffic_data:
+            traffic_data = self.load_factored_traffic_data(fleet_comp_data, link_data, traffic_count_data)
+        else:
+            traffic_data = self.load_traffic_data(fleet_comp_data, link_data, traffic_count_data)
 
         print("[data_loading] Done.")
         return yeti_format_link_data, vehicle_data, traffic_data, los_speeds_data, ef_data, missing_ef_data
@@ -106,6 +110,12 @@ class DataLoader:
             fleet_comp_data=fleet_comp_data, link_data=link_data, traffic_count_data=traffic_data
         ).load_data()
 
+    def load_factored_traffic_data(self, fleet_comp_data, link_data, traffic_data):
+
+        return TrafficDataLoader(
+            fleet_comp_data=fleet_comp_data, link_data=link_data, traffic_count_data=traffic_data
+        ).load_factored_data()
+
     def load_berlin_format_data(self, use_nh3_ef: bool):  # -> 8 - tuple of pd.DataFrames
 
         return FileDataLoader(**self.filenames_dict).load_data(use_nh3_ef, use_hbefa_ef=False)
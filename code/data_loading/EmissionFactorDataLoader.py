@@ -133,16 +133,18 @@ class EmissionFactorDataLoader:
 
     def determine_missing_ef_data(self, ef_data):
 
-        missing_ef_data = []
+        # Look up each combination of vehicle name and pollutant in a set of the combinations in ef_data
+        # instead of filtering ef_data for each of them.
+        vehicle_names_and_pollutants_with_ef_data = set(zip(ef_data["VehicleName"], ef_data["Pollutant"]))
 
         vehicle_names = self.fleet_comp_data[FLEET_COMP_VEH_NAME]
         pollutants = list(PollutantType)
 
-        for veh_name, poll in product(vehicle_names, pollutants):
-            ef_data_reduce = ef_data[(ef_data["VehicleName"] == veh_name) &
-                                     (ef_data["Pollutant"] == poll)]
-            if ef_data_reduce.empty:
-                missing_ef_data.append({"VehicleName": veh_name, "Pollutant": poll})
+        missing_ef_data = [
+            {"VehicleName": veh_name, "Pollutant": poll}
+            for veh_name, poll in product(vehicle_names, pollutants)
+            if (veh_name, poll) not in vehicle_names_and_pollutants_with_ef_data
+        ]
 
         return pd.DataFrame(missing_ef_data)
 
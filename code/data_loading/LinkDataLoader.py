@@ -1,5 +1,6 @@
 from code.constants.column_names import *
 from code.constants.enumerations import AreaType, RoadType
+from code.data_loading.loader_utils import convert_to_enum
 
 
 class LinkDataLoader:
@@ -39,7 +40,7 @@ class LinkDataLoader:
                      SHAPE_MAX_SPEED: "MaxSpeed"})
 
         # convert to enumeration objects
-        link_data_new.loc[:, "AreaType"] = link_data_new["AreaType"].apply(lambda val: AreaType.from_val(val))
-        link_data_new.loc[:, "RoadType"] = link_data_new["RoadType"].apply(lambda val: RoadType.from_val(val))
+        link_data_new["AreaType"] = convert_to_enum(link_data_new["AreaType"], AreaType)
+        link_data_new["RoadType"] = convert_to_enum(link_data_new["RoadType"], RoadType)
 
         return link_data_new
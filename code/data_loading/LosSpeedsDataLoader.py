@@ -1,13 +1,13 @@
-from collections import defaultdict
-from copy import copy
-from itertools import chain
-
+import numpy as np
 import pandas as pd
 
 from code.constants.column_names import *
 from code.constants.mappings import *
 
 
+LOS_TYPES = {"Freeflow": 1, "Heavy": 2, "Satur.": 3, "St+Go": 4}
+
+
 class LosSpeedsDataLoader:
 
     def __init__(self, **kwargs):
@@ -41,43 +41,29 @@ class LosSpeedsDataLoader:
         return self.construct_dataframe(los_speeds_in_yeti_format_data_format, los_speeds_for_mopeds)
 
     def construct_mapping_between_link_and_los_speeds_data(self):
+        """ Map each combination of area category, road category and max speed in the link data to the four
+        traffic situations (one per LOS type) in the los speeds data. """
 
         self.drop_speed_col_from_shape_data_if_possible()
         unique_link_situations = self.link_data[[SHAPE_AREA_CAT, SHAPE_ROAD_CAT, SHAPE_MAX_SPEED]].drop_duplicates()
 
-        mapping_df_parts = []
-        for _, row in unique_link_situations.iterrows():
-            for los_type in range(1, 5):
+        # to_numpy gives the values in the same types as iterating over the rows, so that they are formatted the same
+        values = unique_link_situations.to_numpy()
+        traffic_situations = self.get_traffic_situations(values[:, 0], values[:, 1], values[:, 2])
 
-                mapping_df_parts.append({
-                    "AreaCat": row[SHAPE_AREA_CAT],
-                    "RoadCat": row[SHAPE_ROAD_CAT],
-                    "MaxSpeed_kmh": row[SHAPE_MAX_SPEED],
-                    "TS": self.get_ts_for_link_situation_and_los_type(row, los_type)
-                })
-
-        return pd.DataFrame(mapping_df_parts)
+        return pd.DataFrame({
+            "AreaCat": np.repeat(values[:, 0], len(LOS_TYPES)),
+            "RoadCat": np.repeat(values[:, 1], len(LOS_TYPES)),
+            "MaxSpeed_kmh": np.repeat(values[:, 2], len(LOS_TYPES)),
+            "TS": np.repeat(traffic_situations, len(LOS_TYPES)) + np.tile([f"/{los}" for los in LOS_TYPES],
+                                                                          len(traffic_situations))
+        })
 
     def drop_speed_col_from_shape_data_if_possible(self):
 
         if SHAPE_SPEED_OPTIONAL in self.link_data.columns:
             self.link_data = self.link_data.drop(SHAPE_SPEED_OPTIONAL, axis=1)
 
-    def get_ts_for_link_situation_and_los_type(self, row: pd.Series, los_type: int) -> str:
-
-        road_type = HEBEFA_ROAD_CAT_TO_LOS_SPEEDS_DATA_ROAD_CAT_MAPPING[
-            str(row[SHAPE_ROAD_CAT])]
-        traffic_situation = self.get_traffic_situation(road_type, row[SHAPE_MAX_SPEED], row[SHAPE_AREA_CAT])
-
-        if los_type == 1:
-            return f"{traffic_situation}/Freeflow"
-        if los_type == 2:
-            return f"{traffic_situation}/Heavy"
-        if los_type == 3:
-            return f"{traffic_situation}/Satur."
-        if los_type == 4:
-            return f"{traffic_situation}/St+Go"
-
     def merge_data_using_mapping(self, mapping):
 
         link_with_ts = pd.merge(self.link_data, mapping, left_on=[SHAPE_AREA_CAT, SHAPE_ROAD_CAT, SHAPE_MAX_SPEED],
@@ -89,13 +75,13 @@ class LosSpeedsDataLoader:
         link_and_los_speeds_merged = link_and_los_speeds_merged[
             [SHAPE_LINK_ID, LOS_SPEED_VEH_CAT, LOS_SPEED_TRAFFIC_SITUATION, LOS_SPEED_SPEED]]
 
-        link_and_los_speeds_merged["VehCat"] = link_and_los_speeds_merged["VehCat"].apply(
-            lambda veh_cat: VEH_CAT_MAPPING[veh_cat])
+        link_and_los_speeds_merged["VehCat"] = map_values(
+            link_and_los_speeds_merged["VehCat"].astype(object), VEH_CAT_MAPPING)
 
         return link_and_los_speeds_merged
 
-    def get_traffic_situation(self, road_type: str, max_speed: str, area_type: str) -> str:
-        """ Format link categorization information as string.
+    def get_traffic_situations(self, area_types: np.ndarray, road_types: np.ndarray, max_speeds: np.ndarray) -> np.ndarray:
+        """ Format link categorization information as strings.
 
         Link categorization information includes road type, area type
         and max speed for a particular link.
@@ -103,49 +89,73 @@ class LosSpeedsDataLoader:
         If area_type is none, type urban will be assumed.
         """
 
-        if area_type is None or str(area_type) == "1":
-            return f"URB/{road_type}/{max_speed}"
-        else:
-            return f"RUR/{road_type}/{max_speed}"
+        road_types = map_values(pd.Series(road_types, dtype=object).astype(str),
+                                HEBEFA_ROAD_CAT_TO_LOS_SPEEDS_DATA_ROAD_CAT_MAPPING)
+        is_urban = (pd.Series(area_types, dtype=object).astype(str) == "1").to_numpy() | (area_types == None)
+
+        return (np.where(is_urban, "URB/", "RUR/").astype(object) + road_types.to_numpy() + "/"
+                + pd.Series(max_speeds, dtype=object).astype(str).to_numpy())
 
     def reformat_merged_data_to_fit_yeti_format_data_format(self, merged_link_and_los_speeds_data):
+        """ Construct one row per link and vehicle category with the columns 'LOS1Speed' to 'LOS4Speed'.
+
+        The rows and columns are in the order in which the links, vehicle categories and LOS types appear
+        in the merged data. If there is more than one speed for a LOS type, the last one is used.
+        """
+
+        data = merged_link_and_los_speeds_data
+        los_types = data["TrafficSituation"].str.rsplit("/", n=1).str[-1].map(LOS_TYPES).to_numpy()
+        groups = data.groupby(["LinkID", "VehCat"], sort=False).ngroup().to_numpy()
+        speeds = data["Speed_kmh"].to_numpy()
+
+        first_rows_of_groups = np.unique(groups, return_index=True)[1]
+        group_and_los = pd.DataFrame({"group": groups, "los": los_types})
+        last_rows = ~group_and_los.duplicated(keep="last").to_numpy()
 
-        df_parts = defaultdict(dict)
-        for i, row in merged_link_and_los_speeds_data.iterrows():
-            row = row.to_dict()
-            los_string = row["TrafficSituation"].split("/")[-1]
-            if los_string == "Freeflow":
-                los_type = 1
-            elif los_string == "Heavy":
-                los_type = 2
-            elif los_string == "Satur.":
-                los_type = 3
-            elif los_string == "St+Go":
-                los_type = 4
-            df_parts[(row["LinkID"], row["VehCat"])].update({
-                f"LOS{los_type}Speed": row["Speed_kmh"],
-                "LinkID": row["LinkID"],
-                "VehicleCategory": row["VehCat"]
-            })
-
-        return df_parts
-
-    def get_speeds_for_vehicle_category_moped(self, df_parts):
-
-        moped_speeds = defaultdict(dict)
-        for val in df_parts.values():
-            if val["VehicleCategory"] == "VehicleCategory.MC":
-                val_moped = copy(val)
-                val_moped["VehicleCategory"] = "VehicleCategory.MOPED"
-                moped_speeds[(val["LinkID"], val["VehicleCategory"])] = val_moped
+        speeds_by_los = np.full((len(first_rows_of_groups), len(LOS_TYPES)), np.nan)
+        speeds_by_los[groups[last_rows], los_types[last_rows] - 1] = speeds[last_rows]
+
+        reformatted = pd.DataFrame({f"LOS{los_type}Speed": speeds_by_los[:, los_type - 1]
+                                    for los_type in LOS_TYPES.values()})
+        if np.issubdtype(speeds.dtype, np.integer):  # integer speeds stay integers in columns without missing values
+            for column in reformatted.columns:
+                if reformatted[column].notna().all():
+                    reformatted[column] = reformatted[column].astype(np.int64)
+
+        reformatted["LinkID"] = data["LinkID"].to_numpy()[first_rows_of_groups]
+        reformatted["VehicleCategory"] = data["VehCat"].to_numpy()[first_rows_of_groups]
+
+        return reformatted[self.get_column_order(group_and_los)]
+
+    def get_column_order(self, group_and_los: pd.DataFrame):
+        """ The columns are ordered like they would be in a pd.DataFrame constructed from one dict per row, with the
+        keys in the order in which they were set: The first LOS speed of the first row, 'LinkID' and
+        'VehicleCategory', and then the other LOS speeds in the order in which they first appear. """
+
+        first_occurrences = group_and_los.drop_duplicates().sort_values("group", kind="stable")
+        los_columns = [f"LOS{los_type}Speed" for los_type in first_occurrences["los"].unique()]
+
+        return los_columns[:1] + ["LinkID", "VehicleCategory"] + los_columns[1:]
+
+    def get_speeds_for_vehicle_category_moped(self, los_speeds_in_yeti_format_data_format):
+
+        moped_speeds = los_speeds_in_yeti_format_data_format[
+            los_speeds_in_yeti_format_data_format["VehicleCategory"] == "VehicleCategory.MC"].copy()
+        moped_speeds["VehicleCategory"] = "VehicleCategory.MOPED"
 
         return moped_speeds
 
     def construct_dataframe(self, los_speeds_in_yeti_format_data_format, los_speeds_for_mopeds):
 
-        all_rows_for_los_speeds_dataframe = chain(
-            los_speeds_in_yeti_format_data_format.values(), los_speeds_for_mopeds.values())
-        list_of_rows_for_los_speeds_dataframe = [val for val in all_rows_for_los_speeds_dataframe]
-        los_speeds_dataframe = pd.DataFrame(list_of_rows_for_los_speeds_dataframe)
+        return pd.concat([los_speeds_in_yeti_format_data_format, los_speeds_for_mopeds], ignore_index=True)
+
+
+def map_values(values: pd.Series, mapping: dict) -> pd.Series:
+    """ Map the values with the given dict. Raises a KeyError for values that are not in the dict. """
+
+    mapped = values.map(mapping)
+    unknown_values = values[mapped.isna()]
+    if len(unknown_values) > 0:
+        raise KeyError(unknown_values.iloc[0])
 
-        return los_speeds_dataframe
+    return mapped
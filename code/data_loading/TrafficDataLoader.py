@@ -4,6 +4,7 @@ import pandas as pd
 from code.constants.column_names import *
 from code.constants.enumerations import Dir, DayType
 from code.constants.mappings import FLEET_COMP_VEH_CAT_TO_LINK_DATA_TRAFFIC_PERC_MAPPING
+from code.data_loading.loader_utils import convert_to_enum
 
 # suppress pandas SettingWithCopyWarning
 pd.options.mode.chained_assignment = None
@@ -40,26 +41,31 @@ class TrafficDataLoader:
         :return: traffic_data : a pd.DataFrame
         """
 
+        return expand_traffic_data(*self.load_factored_data())
+
+    def load_factored_data(self):
+        """ Get traffic data in factored form.
+
+        The traffic data has one count column per vehicle category instead of one column per vehicle
+        (see get_count_column). The counts for the individual vehicles are the category counts multiplied
+        by the vehicle shares. Use expand_traffic_data to get the traffic data returned by load_data.
+
+        :return: (traffic_data_by_category, vehicle_shares) : two pd.DataFrames. vehicle_shares has the
+                 columns VehicleName, FleetCategory and VehicleShare.
+        """
+
         traffic_and_shape_data = pd.merge(self.traffic_count_data, self.link_data,
                                           left_on=[TRAFFIC_COUNT_LINK_ID], right_on=[SHAPE_LINK_ID])
 
-        traffic_data_for_vehicle_categories = {}
+        traffic_data = traffic_and_shape_data[[SHAPE_LINK_ID, TRAFFIC_COUNT_DIR,
+                                               TRAFFIC_COUNT_DAY_TYPE, TRAFFIC_COUNT_HOUR]]
 
         for vehicle_cat in FLEET_COMP_VEH_CAT_LEVELS:
             perc_column = FLEET_COMP_VEH_CAT_TO_LINK_DATA_TRAFFIC_PERC_MAPPING[vehicle_cat]
             traffic_for_veh_cat = traffic_and_shape_data[TRAFFIC_COUNT_VEH_COUNT] * traffic_and_shape_data[perc_column]
-            traffic_data_for_vehicle_categories[vehicle_cat] = traffic_for_veh_cat
-
-        traffic_data = traffic_and_shape_data[[SHAPE_LINK_ID, TRAFFIC_COUNT_DIR,
-                                               TRAFFIC_COUNT_DAY_TYPE, TRAFFIC_COUNT_HOUR]]
-
-        for i, row in enumerate(self.fleet_comp_data.itertuples()):
-            veh_name = row.__getattribute__(FLEET_COMP_VEH_NAME)
-            veh_cat = row.__getattribute__(FLEET_COMP_VEH_CAT)
-            veh_perc = row.__getattribute__(FLEET_COMP_VEH_PERC)
-            traffic_data[veh_name] = np.around(veh_perc * traffic_data_for_vehicle_categories[veh_cat], decimals=5)
+            traffic_data[get_count_column(vehicle_cat)] = traffic_for_veh_cat
 
-        traffic_data[["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]] = \
+        traffic_data[LOS_PERCENTAGE_COLUMNS] = \
             traffic_and_shape_data[[TRAFFIC_COUNT_LOS_1_PERC, TRAFFIC_COUNT_LOS_2_PERC,
                                     TRAFFIC_COUNT_LOS_3_PERC, TRAFFIC_COUNT_LOS_4_PERC]]
 
@@ -71,7 +77,40 @@ class TrafficDataLoader:
                 TRAFFIC_COUNT_HOUR: "Hour"
             })
 
-        traffic_data["Dir"] = traffic_data["Dir"].apply(lambda x: Dir.from_val(x))
-        traffic_data["DayType"] = traffic_data["DayType"].apply(lambda x: DayType.from_val(x))
+        traffic_data["Dir"] = convert_to_enum(traffic_data["Dir"], Dir)
+        traffic_data["DayType"] = convert_to_enum(traffic_data["DayType"], DayType)
+
+        vehicle_shares = self.fleet_comp_data[[FLEET_COMP_VEH_NAME, FLEET_COMP_VEH_CAT, FLEET_COMP_VEH_PERC]].rename(
+            columns={FLEET_COMP_VEH_NAME: "VehicleName", FLEET_COMP_VEH_CAT: "FleetCategory",
+                     FLEET_COMP_VEH_PERC: "VehicleShare"})
+
+        return traffic_data, vehicle_shares
+
+
+LOS_PERCENTAGE_COLUMNS = ["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]
+
+
+def get_count_column(fleet_category: str) -> str:
+    """ The name of the column with the vehicle counts for a vehicle category in factored traffic data. """
+
+    return f"VehCount_{fleet_category}"
+
+
+def expand_traffic_data(traffic_data_by_category: pd.DataFrame, vehicle_shares: pd.DataFrame) -> pd.DataFrame:
+    """ Convert factored traffic data (see TrafficDataLoader.load_factored_data) to yeti_format traffic data
+    with one column per vehicle.
+
+    This works for whole tables as well as for chunks of the traffic data, so that the traffic data can be saved
+    in factored form and expanded chunk by chunk when it is used.
+    """
+
+    traffic_data = traffic_data_by_category[["LinkID", "Dir", "DayType", "Hour"]]
+
+    vehicle_counts = {}
+    for row in vehicle_shares.itertuples():
+        count_column = get_count_column(str(row.FleetCategory))
+        vehicle_counts[row.VehicleName] = np.around(row.VehicleShare * traffic_data_by_category[count_column], decimals=5)
 
-        return traffic_data
+    traffic_data = pd.concat([traffic_data, pd.DataFrame(vehicle_counts, index=traffic_data.index),
+                              traffic_data_by_category[LOS_PERCENTAGE_COLUMNS]], axis=1)
+    return traffic_data
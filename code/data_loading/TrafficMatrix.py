@@ -0,0 +1,208 @@
+"""
+TrafficMatrix
+
+This module contains a storage layout for yeti_format data that can be read without loading it into memory.
+It is meant for the traffic data, which is basically a dense (rows x vehicles) matrix of vehicle counts plus
+a few key columns (LinkID, Dir, DayType, Hour).
+
+A table in this layout is a folder (by convention with the extension '.memmap') that contains:
+- schema.json: the column names, dtypes and - for text columns - the categories.
+- matrix.npy: all float32 columns (vehicle counts, LOS percentages) as one array of shape (rows, columns).
+- column_<i>.npy: every other column as an array of shape (rows,). Text columns are saved as integer codes into
+  the categories in the schema.
+
+The arrays are opened as `numpy.memmap`s. Only the rows that are accessed are read from disc, and processes that
+read the same table share the pages in the operating system's file cache.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+
+SCHEMA_FILE = "schema.json"
+MATRIX_FILE = "matrix.npy"
+MATRIX_DTYPE = np.float32
+
+
+class TrafficMatrix:
+    """
+    A table of yeti_format data in the memory-mapped layout described in the module docstring.
+
+    Instances only hold the folder, the schema and (optionally) the positions of the rows they represent.
+    The memory-mapped arrays are opened on first use. This makes instances cheap to send to worker processes.
+
+    Attributes
+    ----------
+    folder : str
+        The folder with the files of the table.
+    schema : Dict
+        The contents of schema.json.
+    rows : np.ndarray
+        The positions of the rows of this table in the files. None if the table consists of all rows.
+
+    Methods
+    -------
+    get_rows
+        Returns the rows from start to stop as a pd.DataFrame.
+    get_link_ids
+        Returns the LinkIDs of all rows without reading the other columns.
+    select_rows
+        Returns a TrafficMatrix for a subset of the rows.
+    chunks
+        Returns a TrafficMatrixChunks instance to iterate over the table in chunks of pd.DataFrames.
+    """
+
+    def __init__(self, folder: str, rows: np.ndarray = None):
+
+        self.folder = folder
+        with open(os.path.join(folder, SCHEMA_FILE)) as fp:
+            self.schema = json.load(fp)
+        self.rows = rows
+        self.arrays = {}
+
+    def __len__(self) -> int:
+
+        return self.schema["n_rows"] if self.rows is None else len(self.rows)
+
+    def __getstate__(self) -> Dict:
+
+        return {**self.__dict__, "arrays": {}}  # the memmaps are opened again in the receiving process
+
+    def get_array(self, file: str) -> np.ndarray:
+
+        if file not in self.arrays:
+            self.arrays[file] = np.load(os.path.join(self.folder, file), mmap_mode="r")
+        return self.arrays[file]
+
+    def get_values(self, file: str, start: int = 0, stop: int = None) -> np.ndarray:
+        """ Read the values for the rows from start to stop from the array in file. """
+
+        array = self.get_array(file)
+        stop = len(self) if stop is None else min(stop, len(self))
+        if self.rows is None:
+            return array[start:stop]
+        return array[self.rows[start:stop]]
+
+    def get_column(self, column: Dict, start: int = 0, stop: int = None):
+
+        values = self.get_values(column["file"], start, stop)
+        if "categories" in column:
+            return pd.Categorical.from_codes(values, categories=column["categories"])
+        return values
+
+    def get_rows(self, start: int = 0, stop: int = None, dtype: Dict = None) -> pd.DataFrame:
+        """ Return the rows from start to stop as a pd.DataFrame with the same columns as the original data.
+
+        :param dtype: Like the dtype argument of pd.read_csv. Columns that are not mentioned are returned in the way
+                      pd.read_csv would return them for a csv file with the same data.
+        """
+
+        dtype = dtype if dtype is not None else {}
+        matrix = self.get_values(MATRIX_FILE, start, stop) if self.schema["matrix_columns"] else None
+
+        data = {}
+        for column in self.schema["columns"]:
+            name = column["name"]
+            if "matrix_index" in column:
+                values = matrix[:, column["matrix_index"]]
+                if dtype.get(name) not in (MATRIX_DTYPE, "float32"):  # pd.read_csv reads numbers as float64 by default
+                    values = values.astype(str).astype(np.float64)
+                data[name] = values
+            else:
+                data[name] = self.get_column(column, start, stop)
+                if isinstance(data[name], pd.Categorical):  # pd.read_csv returns text columns as object columns
+                    data[name] = (data[name].remove_unused_categories() if dtype.get(name) == "category"
+                                  else np.asarray(data[name], dtype=object))
+
+        stop = len(self) if stop is None else min(stop, len(self))
+        data = pd.DataFrame(data, index=pd.RangeIndex(start, max(start, stop)))
+        return data.astype({name: value for name, value in dtype.items() if name in data.columns}, copy=False)
+
+    def get_link_ids(self) -> pd.Series:
+
+        column = next(column for column in self.schema["columns"] if column["name"] == "LinkID")
+        return pd.Series(self.get_column(column)).astype(str)
+
+    def select_rows(self, mask: np.ndarray) -> "TrafficMatrix":
+        """ Return a TrafficMatrix for the rows where mask is True. The data is not copied. """
+
+        positions = np.flatnonzero(mask)
+        rows = positions if self.rows is None else self.rows[positions]
+        return TrafficMatrix(self.folder, rows)
+
+    def head(self, n_rows: int) -> "TrafficMatrix":
+
+        return self.select_rows(np.arange(len(self)) < n_rows)
+
+    def chunks(self, chunksize: int, dtype: Dict = None) -> "TrafficMatrixChunks":
+
+        return TrafficMatrixChunks(self, chunksize, dtype)
+
+
+class TrafficMatrixChunks:
+    """
+    An iterable over the rows of a TrafficMatrix in chunks of pd.DataFrames. Like the reader returned by
+    pd.read_csv with a chunksize, but it can be iterated over more than once and split into subsets of rows.
+    """
+
+    def __init__(self, traffic_matrix: TrafficMatrix, chunksize: int, dtype: Dict = None):
+
+        self.traffic_matrix = traffic_matrix
+        self.chunksize = chunksize
+        self.dtype = dtype
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+
+        for start in range(0, len(self.traffic_matrix), self.chunksize):
+            yield self.traffic_matrix.get_rows(start, start + self.chunksize, self.dtype)
+
+    def get_link_ids(self) -> pd.Series:
+
+        return self.traffic_matrix.get_link_ids()
+
+    def select_rows(self, mask: np.ndarray) -> "TrafficMatrixChunks":
+
+        return TrafficMatrixChunks(self.traffic_matrix.select_rows(mask), self.chunksize, self.dtype)
+
+
+def write_traffic_matrix(data: pd.DataFrame, folder: str):
+    """ Save data in the memory-mapped layout described in the module docstring. Existing files are replaced. """
+
+    if os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder)
+
+    matrix_columns = [name for name in data.columns if data[name].dtype == MATRIX_DTYPE]
+    columns = []
+    for i, name in enumerate(data.columns):
+        if name in matrix_columns:
+            columns.append({"name": name, "matrix_index": matrix_columns.index(name)})
+        else:
+            columns.append(write_column(data[name], folder, f"column_{i}.npy"))
+
+    if matrix_columns:
+        np.save(os.path.join(folder, MATRIX_FILE), data[matrix_columns].to_numpy(dtype=MATRIX_DTYPE))
+
+    with open(os.path.join(folder, SCHEMA_FILE), "w") as fp:
+        json.dump({"n_rows": len(data), "matrix_columns": matrix_columns, "columns": columns}, fp)
+
+
+def write_column(values: pd.Series, folder: str, file: str) -> Dict:
+
+    column = {"name": values.name, "file": file}
+    if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        np.save(os.path.join(folder, file), values.to_numpy())
+    else:
+        categorical = pd.Categorical(values)
+        column["categories"] = get_categories(categorical)
+        np.save(os.path.join(folder, file), categorical.codes)
+    return column
+
+
+def get_categories(categorical: pd.Categorical) -> List:
+
+    return [category.item() if isinstance(category, np.generic) else category for category in categorical.categories]
@@ -1,4 +1,5 @@
 """ This module contains helper functions used by the DataLoaders. """
+import numpy as np
 import pandas as pd
 
 from code.constants.enumerations import *
@@ -13,6 +14,24 @@ def convert_dir_and_day_type(df: pd.DataFrame,
     dataframe to instances of the Dir or DayType enumeration classes.
     """
 
-    df.loc[:, dir_col] = df[dir_col].apply(lambda x: Dir.from_val(x))
-    df.loc[:, day_type_col] = df[day_type_col].apply(lambda x: DayType.from_val(x))
+    df[dir_col] = convert_to_enum(df[dir_col], Dir)
+    df[day_type_col] = convert_to_enum(df[day_type_col], DayType)
     return df
+
+
+def convert_to_enum(values: pd.Series, enum_class) -> pd.Series:
+    """ Convert the values to instances of enum_class like enum_class.from_val.
+
+    from_val is only called once for each unique value. The result is a categorical column with the
+    enumeration instances as categories. Values that can't be converted (from_val returns None) are missing.
+    """
+
+    codes, unique_values = pd.factorize(values)
+    enum_values = [enum_class.from_val(value) for value in unique_values]
+
+    categories = list(dict.fromkeys(value for value in enum_values if value is not None))
+    category_codes = np.array([categories.index(value) if value is not None else -1 for value in enum_values] + [-1])
+    # missing values have the code -1 in codes, which selects the -1 at the end of category_codes
+
+    return pd.Series(pd.Categorical.from_codes(category_codes[codes], categories=categories),
+                     index=values.index, name=values.name)
@@ -0,0 +1,209 @@
+"""
+This module contains functions to write and read files with yeti_format data.
+
+yeti_format data is saved as csv (default), parquet or feather files. When reading, the file format is detected by
+the file extension, so that the load_yeti_format_data functions work with all formats and existing configs with
+csv files keep working.
+
+Parquet and feather files are much faster to read than csv files because the values don't need to be parsed.
+Feather files are memory-mapped, so that the columns are read from disc only when they are used.
+
+The memmap format (see TrafficMatrix) saves tables as memory-mapped NumPy arrays. If such a file is read in chunks,
+only the rows of the current chunk are read from disc. This makes it possible to process traffic data that doesn't
+fit into memory.
+"""
+from typing import Dict, Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+from code.constants.column_names import FLEET_COMP_VEH_CAT_LEVELS
+from code.data_loading.TrafficDataLoader import expand_traffic_data, get_count_column
+from code.data_loading.TrafficMatrix import TrafficMatrix, write_traffic_matrix
+
+try:
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+except ImportError:  # pyarrow is only needed for yeti_format data in parquet and feather files
+    pyarrow = None
+
+
+FILE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "memmap": ".memmap"}
+
+
+def write_yeti_format_file(data: pd.DataFrame, file: str, file_format: str = "csv"):
+
+    if file_format == "csv":
+        data.to_csv(file, index=False)
+    elif file_format == "parquet":
+        raise_error_if_pyarrow_is_missing(file_format)
+        like_csv_values(data).to_parquet(file, index=False)
+    elif file_format == "feather":
+        raise_error_if_pyarrow_is_missing(file_format)
+        like_csv_values(data).reset_index(drop=True).to_feather(file)
+    elif file_format == "memmap":
+        write_traffic_matrix(like_csv_values(data, keep_float32=True), file)
+    else:
+        raise RuntimeError(f"Unknown file format for yeti_format data: {file_format}. "
+                           f"Use one of {list(FILE_EXTENSIONS)}.")
+
+
+def read_yeti_format_file(file: str,
+                          dtype: Dict = None,
+                          nrows: int = None,
+                          chunksize: int = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """ Read a file with yeti_format data. The file format is detected by the file extension ('.parquet',
+    '.feather' or '.memmap'). Csv files are read otherwise.
+
+    The arguments work like the ones of pd.read_csv. If chunksize is given, an iterator over chunks of the
+    data is returned.
+    """
+
+    file_format = get_file_format(file)
+    if file_format == "csv":
+        return pd.read_csv(file, dtype=dtype, nrows=nrows, chunksize=chunksize)
+    if file_format == "memmap":
+        return read_traffic_matrix(file, dtype, nrows, chunksize)
+
+    raise_error_if_pyarrow_is_missing(file_format)
+    if file_format == "parquet" and chunksize is not None:
+        return read_parquet_file_in_chunks(file, dtype, nrows, chunksize)
+
+    table = read_arrow_table(file, file_format)
+    if nrows is not None:
+        table = table.slice(0, nrows)
+    if chunksize is not None:
+        return read_arrow_table_in_chunks(table, dtype, chunksize)
+    return convert_dtypes(table.to_pandas(split_blocks=True), dtype)
+
+
+def read_yeti_format_traffic_data_file(file: str,
+                                       vehicle_shares_file: str = None,
+                                       dtype: Dict = None,
+                                       nrows: int = None,
+                                       chunksize: int = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """ Read the yeti_format traffic data like read_yeti_format_file.
+
+    If a vehicle_shares_file is given, the traffic data in file is in factored form (see
+    TrafficDataLoader.load_factored_data). It is expanded to one column per vehicle chunk by chunk, so that the
+    full traffic data is never held in memory if chunksize is given.
+    """
+
+    if vehicle_shares_file is None:
+        return read_yeti_format_file(file, dtype=dtype, nrows=nrows, chunksize=chunksize)
+
+    vehicle_shares = read_yeti_format_file(vehicle_shares_file,
+                                           dtype={"VehicleName": str, "FleetCategory": str, "VehicleShare": np.float32})
+    # the counts are float32 like in the TrafficDataLoader, so that the expanded counts are the same
+    dtype_by_category = {**(dtype or {}), **{get_count_column(cat): np.float32 for cat in FLEET_COMP_VEH_CAT_LEVELS}}
+    traffic_data = read_yeti_format_file(file, dtype=dtype_by_category, nrows=nrows, chunksize=chunksize)
+
+    if chunksize is None:
+        return convert_dtypes(expand_traffic_data(traffic_data, vehicle_shares), dtype)
+    return (convert_dtypes(expand_traffic_data(chunk, vehicle_shares), dtype) for chunk in traffic_data)
+
+
+def get_file_format(file: str) -> str:
+
+    for file_format, file_extension in FILE_EXTENSIONS.items():
+        if str(file).endswith(file_extension):
+            return file_format
+    return "csv"
+
+
+def read_traffic_matrix(file: str, dtype: Dict, nrows: int, chunksize: int):
+
+    traffic_matrix = TrafficMatrix(file)
+    if nrows is not None:
+        traffic_matrix = traffic_matrix.head(nrows)
+    if chunksize is not None:
+        return traffic_matrix.chunks(chunksize, dtype)
+    return traffic_matrix.get_rows(dtype=dtype)
+
+
+def read_arrow_table(file: str, file_format: str) -> "pyarrow.Table":
+
+    if file_format == "feather":
+        # The table references the memory-mapped file. Slicing it does not copy any data.
+        return pyarrow.feather.read_table(file, memory_map=True)
+    return pyarrow.parquet.read_table(file, memory_map=True)
+
+
+def read_parquet_file_in_chunks(file: str, dtype: Dict, nrows: int, chunksize: int) -> Iterator[pd.DataFrame]:
+
+    n_rows_read = 0
+    for batch in pyarrow.parquet.ParquetFile(file).iter_batches(batch_size=chunksize):
+        chunk = batch.to_pandas()
+        if nrows is not None:
+            chunk = chunk.iloc[:nrows - n_rows_read]
+        if len(chunk) == 0:
+            return
+
+        chunk.index = pd.RangeIndex(n_rows_read, n_rows_read + len(chunk))  # continue the index like pd.read_csv
+        n_rows_read += len(chunk)
+        yield convert_dtypes(chunk, dtype)
+
+
+def read_arrow_table_in_chunks(table: "pyarrow.Table", dtype: Dict, chunksize: int) -> Iterator[pd.DataFrame]:
+
+    for start in range(0, table.num_rows, chunksize):
+        chunk = table.slice(start, chunksize).to_pandas(split_blocks=True)
+        chunk.index = pd.RangeIndex(start, start + len(chunk))  # continue the index like pd.read_csv
+        yield convert_dtypes(chunk, dtype)
+
+
+def convert_dtypes(data: pd.DataFrame, dtype: Dict) -> pd.DataFrame:
+
+    if dtype is None:
+        return data
+
+    # Only convert columns that don't have the dtype yet. The other columns keep sharing memory with the file.
+    dtype = {column: column_dtype for column, column_dtype in dtype.items()
+             if column in data.columns and not has_dtype(data[column], column_dtype)}
+    if len(dtype) == 0:
+        return data
+    return data.astype(dtype, copy=False)
+
+
+def has_dtype(column: pd.Series, column_dtype) -> bool:
+
+    if column_dtype in ("category", str):
+        return False  # csv files may contain other values than strings, so that these columns are always converted
+    return column.dtype == column_dtype
+
+
+def like_csv_values(data: pd.DataFrame, keep_float32: bool = False) -> pd.DataFrame:
+    """ Prepare the columns of data for writing them to a parquet file.
+
+    The columns are converted in the way they would come back from a csv file, so that the emissions don't depend
+    on the file format: Columns with only numbers become numeric columns. In all other columns, values that are not
+    strings (e.g. Dir.L) are converted to strings. Missing values stay missing. float32 values are written to csv
+    files with their shortest decimal representation and read as float64, so they are converted the same way
+    unless keep_float32 is True.
+    """
+
+    data = data.copy()
+    for column in data.columns:
+        if data[column].dtype == np.float32 and not keep_float32:
+            data[column] = data[column].astype(str).astype(np.float64)
+        elif data[column].dtype == object or isinstance(data[column].dtype, pd.CategoricalDtype):
+            values = data[column].astype(object)
+            if values.dropna().map(is_number).all() and values.notna().any():
+                data[column] = pd.to_numeric(values)
+            else:
+                data[column] = values.map(lambda value: value if pd.isna(value) or isinstance(value, str) else str(value))
+    return data
+
+
+def is_number(value) -> bool:
+
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+def raise_error_if_pyarrow_is_missing(file_format: str):
+
+    if pyarrow is None:
+        raise RuntimeError(
+            f"yeti_format data in {file_format} files requires the package pyarrow. "
+            f"Please install it with 'pip install pyarrow'.")
@@ -10,6 +10,9 @@ cold start with respect to pollutant "poll".
 from typing import Dict, Any, List, Tuple
 import collections
 
+import numpy as np
+import pandas as pd
+
 
 class HbefaColdStrategy:
     """
@@ -20,6 +23,9 @@ class HbefaColdStrategy:
     cold_start_ef_for_vehicle_and_pollutant : Dict
        Holds emission factor data in the format ``(VehicleName, Pollutant) -> emission factor
        E.g. ("PC petrol <1.4L Euro-1", "PollutantType.NOx"): 0.76
+    ef_matrix : np.ndarray
+       Holds the emission factors from cold_start_ef_for_vehicle_and_pollutant as an array of shape
+       (vehicles, pollutants). Used by ``calculate_emissions_batch``.
     emissions : Dict
        Contains emission values and is used to assemble the output of ``calculate_emissions``.
 
@@ -29,12 +35,16 @@ class HbefaColdStrategy:
        The main interface for this Strategy. calculate_emissions is called over and over during
        a model run. Its job is to take a single row of the cold starts data (and some other parameters) and output
        a single emissions row for each pollutant.
+    calculate_emissions_batch
+       Does the same as calculate_emissions, but for a whole block of cold starts rows at once.
     """
 
     def __init__(self):
 
         self.cold_start_ef_for_vehicle_and_pollutant = {}  # type: Dict[Tuple[str,str], float]
         self.emissions = collections.defaultdict(dict)
+        self.ef_matrix = None
+        self.ef_matrix_key = None
 
     def calculate_emissions(self,
                             cold_starts_and_link_data_row: Dict[str, Any],
@@ -63,8 +73,9 @@ class HbefaColdStrategy:
 
     def initialize(self, **kwargs):
 
-        for _, row in kwargs["emission_factor_data"].iterrows():
-            self.cold_start_ef_for_vehicle_and_pollutant[(row["VehicleName"], row["Pollutant"])] = row["EmissionsPerStart"]
+        ef_data = kwargs["emission_factor_data"]
+        self.cold_start_ef_for_vehicle_and_pollutant.update(
+            zip(zip(ef_data["VehicleName"], ef_data["Pollutant"]), ef_data["EmissionsPerStart"]))
 
     def delete_emissions_from_last_call_to_this_function(self):
 
@@ -81,3 +92,49 @@ class HbefaColdStrategy:
         emissions = starts_for_the_given_vehicle * emissions_per_cold_start_for_the_given_vehicle
 
         self.emissions[pollutant][vehicle_name] = emissions
+
+    def calculate_emissions_batch(self,
+                                  cold_starts_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Does the same as calculate_emissions, but for a whole block of rows at once.
+
+        The cold starts of the block (rows x vehicles) are multiplied with the emission factors of all vehicles
+        (vehicles x pollutants) at once. Raises a KeyError if an emission factor is missing.
+        """
+
+        self.initialize_if_necessary(**kwargs)
+        self.initialize_ef_matrix_if_necessary(vehicle_dict, pollutants)
+
+        vehicle_names = list(vehicle_dict.keys())
+        cold_starts = cold_starts_and_link_data[vehicle_names].to_numpy(dtype=float)
+        emissions = cold_starts[:, :, np.newaxis] * self.ef_matrix[np.newaxis, :, :]
+
+        return {
+            pollutant: pd.DataFrame(
+                emissions[:, :, pollutant_index], index=cold_starts_and_link_data.index, columns=vehicle_names)
+            for pollutant_index, pollutant in enumerate(pollutants)
+        }
+
+    def initialize_ef_matrix_if_necessary(self, vehicle_dict: Dict[str, str], pollutants: List[str]):
+
+        ef_matrix_key = (tuple(vehicle_dict.keys()), tuple(pollutants))
+        if self.ef_matrix_key == ef_matrix_key:
+            return
+
+        missing = [
+            (vehicle_name, pollutant) for vehicle_name in vehicle_dict.keys() for pollutant in pollutants
+            if (vehicle_name, pollutant) not in self.cold_start_ef_for_vehicle_and_pollutant
+        ]
+        if missing:
+            raise KeyError(f"No cold start emission factors for {missing[:10]}")
+
+        ef_matrix = np.array([
+            [self.cold_start_ef_for_vehicle_and_pollutant[(vehicle_name, pollutant)] for pollutant in pollutants]
+            for vehicle_name in vehicle_dict.keys()
+        ], dtype=float).reshape(len(vehicle_dict), len(pollutants))
+
+        self.ef_matrix = ef_matrix
+        self.ef_matrix_key = ef_matrix_key
@@ -22,6 +22,7 @@ def load_hbefa_cold_berlin_format_data(**kwargs):
             "yeti_format_vehicle_data": vehicle_data,
             "yeti_format_link_data": link_data,
             "yeti_format_cold_starts_data": cold_starts_data
-        }
+        },
+        file_format=kwargs.get("yeti_format_file_format", "csv")
     )
     return yeti_format_data_file_paths
\ No newline at end of file
@@ -1,11 +1,11 @@
-import pandas as pd
+from code.data_loading.yeti_format_files import read_yeti_format_file
 
 
 def load_hbefa_cold_yeti_format_data(**kwargs):
 
     return {
-        "link_data": pd.read_csv(kwargs["yeti_format_link_data"]),
-        "vehicle_data": pd.read_csv(kwargs["yeti_format_vehicle_data"]),
-        "traffic_data": pd.read_csv(kwargs["yeti_format_cold_starts_data"]),
-        "emission_factor_data": pd.read_csv(kwargs["yeti_format_emission_factors"])
+        "link_data": read_yeti_format_file(kwargs["yeti_format_link_data"]),
+        "vehicle_data": read_yeti_format_file(kwargs["yeti_format_vehicle_data"]),
+        "traffic_data": read_yeti_format_file(kwargs["yeti_format_cold_starts_data"]),
+        "emission_factor_data": read_yeti_format_file(kwargs["yeti_format_emission_factors"])
     }
\ No newline at end of file
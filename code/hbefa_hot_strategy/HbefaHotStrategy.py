@@ -7,7 +7,13 @@ It works with emission factors that are dependent on the vehicle and the traffic
 from typing import Any, Dict, List
 import collections
 
+import numpy as np
+import pandas as pd
+
 from code.constants.mappings import ROAD_CAT_FROM_ENUM
+from code.strategy_helpers.LosEfTable import LosEfTable, get_fingerprint, load_or_build_los_ef_table
+
+LOS_TYPES = ["Freeflow", "Heavy", "Satur.", "St+Go"]
 
 
 class HbefaHotStrategy:
@@ -16,9 +22,19 @@ class HbefaHotStrategy:
 
     Attributes
     ----------
-    ef_dict : Dict
-       Holds emission factor data in the format ``(Pollutant, TrafficSituation, VehicleName) -> emission factor
-       E.g. ("PollutantType.NOx", "URB/MW-City/100/Freeflow", "PC petrol <1.4L Euro-1"): 0.76
+    ef_index : LosEfTable
+       Holds the emission factors of all traffic situations, vehicles and pollutants in the emission factor data
+       as an array of shape (traffic situations, vehicles, pollutants, 4). The traffic situations do not include the
+       LOS type. E.g. the emission factor for ("PollutantType.NOx", "URB/MW-City/100/Freeflow", "PC petrol <1.4L Euro-1")
+       is at ``efs[traffic_situation_ids["URB/MW-City/100"], vehicle_ids["PC petrol <1.4L Euro-1"],
+       pollutant_ids["PollutantType.NOx"], 0]``.
+    vehicle_ids, pollutant_ids, traffic_situation_ids : Dict
+       Map vehicle names, pollutants and traffic situations (without the LOS type) to their position in ef_index.
+    traffic_situation_id_for_link : Dict
+       Caches the traffic situation id of each link.
+    los_ef_table : LosEfTable
+       Holds the emission factors for each traffic situation (without the LOS suffix), vehicle, pollutant and LOS.
+       Used by ``calculate_emissions_batch``.
     emissions : Dict
        Contains emission values and is used to assemble the output of ``calculate_emissions``.
 
@@ -28,11 +44,19 @@ class HbefaHotStrategy:
        The main interface for this Strategy. calculate_emissions is called over and over during
        a model run. Its job is to take a single traffic row (and some other parameters) and output
        a single emissions row for each pollutant.
+    calculate_emissions_batch
+       Does the same as calculate_emissions, but for a whole block of traffic rows at once.
     """
 
     def __init__(self, **kwargs):
 
-        self.ef_dict = None
+        self.ef_index = None
+        self.vehicle_ids = None
+        self.pollutant_ids = None
+        self.traffic_situation_ids = None
+        self.traffic_situation_id_for_link = {}
+
+        self.los_ef_table = None
         self.emissions = collections.defaultdict(dict)
 
     def calculate_emissions(self,
@@ -44,12 +68,12 @@ class HbefaHotStrategy:
         self.initialize_if_necessary(**kwargs)
         self.delete_emissions_from_last_call_to_this_function()
 
-        traffic_situation = self.get_traffic_situation(traffic_and_link_data_row)
+        traffic_situation_id = self.get_traffic_situation_id(traffic_and_link_data_row)
 
         for pollutant in pollutants:
             for vehicle_name in vehicle_dict.keys():
                 self.calculate_emissions_for_vehicle(
-                    traffic_and_link_data_row, vehicle_name, traffic_situation, pollutant, **kwargs)
+                    traffic_and_link_data_row, vehicle_name, traffic_situation_id, pollutant, **kwargs)
 
         return self.emissions
 
@@ -60,15 +84,45 @@ class HbefaHotStrategy:
 
     def is_not_initialized(self):
 
-        return self.ef_dict is None
+        return self.ef_index is None
 
     def initialize_ef_data(self, kwargs):
 
         ef_data = kwargs.get("emission_factor_data")
-        self.ef_dict = {
-            (row["Pollutant"], row["TrafficSituation"], row["VehicleName"]): row["EF"]
-            for _, row in ef_data.iterrows()
-        }
+        self.ef_index = self.get_ef_index(ef_data)
+        self.vehicle_ids = {vehicle_name: i for i, vehicle_name in enumerate(self.ef_index.vehicle_names)}
+        self.pollutant_ids = {pollutant: i for i, pollutant in enumerate(self.ef_index.pollutants)}
+        self.traffic_situation_ids = {traffic_situation: i for i, traffic_situation in enumerate(self.ef_index.keys)}
+        self.traffic_situation_id_for_link = {}
+
+    def get_ef_index(self, ef_data: pd.DataFrame) -> LosEfTable:
+        """ Arrange the emission factors in an array with integer-coded traffic situations, vehicles and pollutants.
+
+        The traffic situations in the emission factor data are split into the traffic situation of the link
+        (e.g. 'URB/MW-City/100') and the LOS type (e.g. 'Freeflow'). Emission factors for other LOS types are ignored.
+        """
+
+        traffic_situations_and_los_types = ef_data["TrafficSituation"].str.rpartition("/")
+        ef_data = ef_data.assign(
+            TrafficSituationOfLink=traffic_situations_and_los_types[0],
+            LosType=traffic_situations_and_los_types[2]
+        )
+        ef_data = ef_data[ef_data["LosType"].isin(LOS_TYPES)]
+        ef_data = ef_data.drop_duplicates(["Pollutant", "TrafficSituation", "VehicleName"], keep="last")
+
+        traffic_situation_ids, traffic_situations = pd.factorize(ef_data["TrafficSituationOfLink"])
+        vehicle_ids, vehicle_names = pd.factorize(ef_data["VehicleName"])
+        pollutant_ids, pollutants = pd.factorize(ef_data["Pollutant"])
+        los_ids = ef_data["LosType"].map({los_type: i for i, los_type in enumerate(LOS_TYPES)}).to_numpy()
+
+        shape = (len(traffic_situations), len(vehicle_names), len(pollutants), 4)
+        efs = np.full(shape, np.nan)
+        efs[traffic_situation_ids, vehicle_ids, pollutant_ids, los_ids] = ef_data["EF"].astype(float).to_numpy()
+        is_given = np.zeros(shape, dtype=bool)
+        is_given[traffic_situation_ids, vehicle_ids, pollutant_ids, los_ids] = True
+
+        return LosEfTable(traffic_situations, list(vehicle_names), list(pollutants), efs,
+                          missing=~is_given.all(axis=3))
 
     def delete_emissions_from_last_call_to_this_function(self):
 
@@ -81,15 +135,37 @@ class HbefaHotStrategy:
 
         return f"{area_type_hbefa}/{road_type_hbefa}/{row['MaxSpeed']}"
 
-    def calculate_emissions_for_vehicle(self, traffic_and_link_data_row, vehicle_name, traffic_situation, pollutant,
+    def get_traffic_situation_id(self, row) -> int:
+        """ Return the id of the row's traffic situation. The id is determined only once for each link. """
+
+        link_id = row.get("LinkID")
+        traffic_situation_id = self.traffic_situation_id_for_link.get(link_id)
+
+        if traffic_situation_id is None:
+            traffic_situation = self.get_traffic_situation(row)
+            if traffic_situation not in self.traffic_situation_ids:
+                raise KeyError(f"No emission factors for traffic situation {traffic_situation}")
+            traffic_situation_id = self.traffic_situation_ids[traffic_situation]
+            if link_id is not None:
+                self.traffic_situation_id_for_link[link_id] = traffic_situation_id
+
+        return traffic_situation_id
+
+    def get_efs_for_los_types(self, traffic_situation_id: int, vehicle_name: str, pollutant: str) -> List[float]:
+
+        vehicle_id = self.vehicle_ids.get(vehicle_name)
+        pollutant_id = self.pollutant_ids.get(pollutant)
+        if vehicle_id is None or pollutant_id is None \
+                or self.ef_index.missing[traffic_situation_id, vehicle_id, pollutant_id]:
+            raise KeyError(f"Missing emission factors for pollutant {pollutant}, traffic situation "
+                           f"{self.ef_index.keys[traffic_situation_id]} and vehicle {vehicle_name}")
+
+        return self.ef_index.efs[traffic_situation_id, vehicle_id, pollutant_id].tolist()
+
+    def calculate_emissions_for_vehicle(self, traffic_and_link_data_row, vehicle_name, traffic_situation_id, pollutant,
                                         **kwargs):
 
-        efs_for_los_types = [
-            float(self.ef_dict[(pollutant, f"{traffic_situation}/Freeflow", vehicle_name)]),
-            float(self.ef_dict[(pollutant, f"{traffic_situation}/Heavy", vehicle_name)]),
-            float(self.ef_dict[(pollutant, f"{traffic_situation}/Satur.", vehicle_name)]),
-            float(self.ef_dict[(pollutant, f"{traffic_situation}/St+Go", vehicle_name)])
-        ]
+        efs_for_los_types = self.get_efs_for_los_types(traffic_situation_id, vehicle_name, pollutant)
 
         ef = 0
         for los_perc_col, ef_for_los in zip(
@@ -99,3 +175,76 @@ class HbefaHotStrategy:
 
         emissions = ef * traffic_and_link_data_row["Length"] * traffic_and_link_data_row[vehicle_name]
         self.emissions[pollutant][vehicle_name] = emissions
+
+    #
+    # *** batch calculation ***
+    #
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_if_necessary(**kwargs)
+        self.initialize_los_ef_table_if_necessary(vehicle_dict, pollutants, **kwargs)
+
+        vehicle_names = list(vehicle_dict.keys())
+        traffic_situation_ids = self.get_traffic_situation_ids_for_block(traffic_and_link_data)
+        los_percentages = traffic_and_link_data[
+            ["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]].to_numpy(dtype=float)
+        link_length = traffic_and_link_data["Length"].to_numpy(dtype=float)
+        vehicle_counts = traffic_and_link_data[vehicle_names].to_numpy(dtype=float)
+
+        emissions = {}
+        for pollutant_index, pollutant in enumerate(pollutants):
+            ef = self.los_ef_table.get_los_weighted_efs(traffic_situation_ids, pollutant_index, los_percentages)
+            emissions[pollutant] = pd.DataFrame(
+                ef * link_length[:, np.newaxis] * vehicle_counts,
+                index=traffic_and_link_data.index, columns=vehicle_names)
+
+        return emissions
+
+    def initialize_los_ef_table_if_necessary(self, vehicle_dict: Dict[str, str], pollutants: List[str], **kwargs):
+        """ Load or build the table with the emission factors for each traffic situation, vehicle, pollutant and LOS.
+
+        If the config argument ``los_ef_table_file`` is given, the table is saved to that file and reused
+        in later runs with the same input data.
+        """
+
+        if (self.los_ef_table is not None
+                and self.los_ef_table.vehicle_names == list(vehicle_dict.keys())
+                and self.los_ef_table.pollutants == list(pollutants)):
+            return
+
+        fingerprint = get_fingerprint(
+            type(self).__name__, list(vehicle_dict.keys()), pollutants, kwargs["emission_factor_data"])
+        self.los_ef_table = load_or_build_los_ef_table(
+            kwargs.get("los_ef_table_file"), fingerprint,
+            lambda: self.build_los_ef_table(list(vehicle_dict.keys()), pollutants))
+
+    def build_los_ef_table(self, vehicle_names: List[str], pollutants: List[str]) -> LosEfTable:
+        """ Select the emission factors for the given vehicles and pollutants from the ef_index. """
+
+        n_traffic_situations = len(self.ef_index.keys)
+        efs = np.full((n_traffic_situations, len(vehicle_names), len(pollutants), 4), np.nan)
+        missing = np.ones((n_traffic_situations, len(vehicle_names), len(pollutants)), dtype=bool)
+
+        for vehicle_index, vehicle_name in enumerate(vehicle_names):
+            for pollutant_index, pollutant in enumerate(pollutants):
+                if vehicle_name in self.vehicle_ids and pollutant in self.pollutant_ids:
+                    vehicle_id, pollutant_id = self.vehicle_ids[vehicle_name], self.pollutant_ids[pollutant]
+                    efs[:, vehicle_index, pollutant_index] = self.ef_index.efs[:, vehicle_id, pollutant_id]
+                    missing[:, vehicle_index, pollutant_index] = self.ef_index.missing[:, vehicle_id, pollutant_id]
+
+        return LosEfTable(self.ef_index.keys, vehicle_names, pollutants, efs, missing)
+
+    def get_traffic_situation_ids_for_block(self, traffic_and_link_data: pd.DataFrame) -> np.ndarray:
+        """ Returns the traffic situation id for each row. The ids are positions in ef_index and los_ef_table. """
+
+        new_links = traffic_and_link_data.drop_duplicates("LinkID")
+        new_links = new_links[~new_links["LinkID"].isin(list(self.traffic_situation_id_for_link))]
+        for row in new_links.to_dict(orient="records"):
+            self.get_traffic_situation_id(row)
+
+        return traffic_and_link_data["LinkID"].map(self.traffic_situation_id_for_link).to_numpy()
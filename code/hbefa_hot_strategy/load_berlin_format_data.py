@@ -1,5 +1,5 @@
 from code.data_loading.HbefaDataLoader import HbefaDataLoader
-from code.strategy_helpers.helpers import save_dataframes
+from code.strategy_helpers.helpers import get_traffic_data_dict, save_dataframes
 
 
 def load_hbefa_hot_berlin_format_data(**kwargs):
@@ -12,7 +12,7 @@ def load_hbefa_hot_berlin_format_data(**kwargs):
         emission_factor_file=kwargs["berlin_format_emission_factors"],
         traffic_data_file=kwargs["berlin_format_traffic_data"]
     )
-    data = loader.load_data(use_nh3_ef=False)
+    data = loader.load_data(use_nh3_ef=False, factored_traffic_data=kwargs.get("factored_traffic_data", False))
     (link_data, vehicle_data, traffic_data, _, emission_factor_data, missing_ef_data) = data
 
     yeti_format_data_file_paths = save_dataframes(
@@ -21,7 +21,8 @@ def load_hbefa_hot_berlin_format_data(**kwargs):
             "yeti_format_emission_factors": emission_factor_data,
             "yeti_format_vehicle_data": vehicle_data,
             "yeti_format_link_data": link_data,
-            "yeti_format_traffic_data": traffic_data
-        }
+            **get_traffic_data_dict(traffic_data)
+        },
+        file_format=kwargs.get("yeti_format_file_format", "csv")
     )
     return yeti_format_data_file_paths
\ No newline at end of file
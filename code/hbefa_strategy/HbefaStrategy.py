@@ -29,6 +29,8 @@ The output of this Strategy depends on the config arguments. There are three cas
 """
 from typing import Any, Dict, List
 
+import pandas as pd
+
 from code.copert_strategy.CopertStrategy import CopertStrategy
 from code.hbefa_cold_strategy.HbefaColdStrategy import HbefaColdStrategy
 from code.hbefa_hot_strategy.HbefaHotStrategy import HbefaHotStrategy
@@ -55,6 +57,9 @@ class HbefaStrategy(CopertStrategy):
         The main interface for this Strategy. calculate_emissions is called over and over during
         a model run. Its job is to take a single traffic row (and some other parameters) and output
         a single emissions row for each pollutant.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once. Raises a
+        NotImplementedError if the Strategies used for the calculation don't support batch calculation.
     """
     def __init__(self):
 
@@ -76,12 +81,23 @@ class HbefaStrategy(CopertStrategy):
         hot_emissions = self.calculate_hot_emissions(
             traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs)
         cold_emissions = self.calculate_cold_emissions(
-            traffic_and_link_data_row, vehicle_dict, pollutants, emissions_from_hot_strategy=hot_emissions, **kwargs)
+            traffic_and_link_data_row, vehicle_dict, pollutants, emissions_from_hot_strategy=hot_emissions,
+            **self.get_emissions_context_from_hot_strategy(), **kwargs)
 
         hot_emissions = add_prefix_to_keys("hot", hot_emissions)
 
         return {**hot_emissions, **cold_emissions}
 
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_cold_strategy_if_necessary(**kwargs)
+        return self.calculate_emissions_batch_with_sub_strategies(
+            traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+
     def initialize_cold_strategy_if_necessary(self, **kwargs):
 
         if self.cold_strategy is None:
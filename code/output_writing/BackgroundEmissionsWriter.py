@@ -0,0 +1,108 @@
+"""
+BackgroundEmissionsWriter
+
+This module contains a wrapper for the emissions writers that saves the emissions in a separate thread. It is
+used by the StrategyInvoker if the config argument `write_in_background` is true.
+"""
+import queue
+import threading
+
+import pandas as pd
+
+
+class BackgroundEmissionsWriter:
+    """
+    Passes the data given to `write` on to another emissions writer in a dedicated writer thread, so that the
+    emission calculation for the next block of rows overlaps with formatting and saving the previous block.
+
+    The blocks waiting to be written are kept in a bounded queue. If the queue is full, `write` blocks until the
+    writer thread has saved a block. This keeps the memory usage bounded if writing is slower than calculating.
+
+    If the wrapped writer raises an error, the writer thread stops writing and discards the remaining blocks.
+    The next call to `write` or `close` raises a RuntimeError. `close` always closes the wrapped writer, so that
+    the blocks written before the error are saved properly.
+
+    Attributes
+    ----------
+    emissions_writer
+        The wrapped emissions writer, e.g. a CsvEmissionsWriter.
+    queue : queue.Queue
+        The blocks of data waiting to be written as (data, file) tuples.
+    error : Exception
+        The first error raised by the wrapped writer. None if there was no error.
+    """
+
+    STOP = None
+
+    def __init__(self, emissions_writer, queue_size: int = 4):
+
+        self.emissions_writer = emissions_writer
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+
+        self.thread = threading.Thread(target=self.write_blocks_from_queue, name="emissions-writer", daemon=True)
+        self.thread.start()
+
+    @property
+    def file_extension(self):
+
+        return self.emissions_writer.file_extension
+
+    @property
+    def supports_checkpoints(self):
+
+        return self.emissions_writer.supports_checkpoints
+
+    def write(self, data: pd.DataFrame, file: str):
+
+        self.raise_error_if_writing_failed()
+        self.queue.put((data, file))  # blocks if the queue is full
+
+    def close(self):
+        """ Wait until all blocks in the queue are written, then close the wrapped writer. """
+
+        if self.thread.is_alive():
+            self.queue.put(self.STOP)
+            self.thread.join()
+
+        self.emissions_writer.close()
+        self.raise_error_if_writing_failed()
+
+    def flush(self):
+        """ Wait until all blocks in the queue are written, then flush the wrapped writer. """
+
+        self.queue.join()
+        self.raise_error_if_writing_failed()
+        self.emissions_writer.flush()
+
+    def get_file_sizes(self):
+
+        return self.emissions_writer.get_file_sizes()
+
+    def resume(self, file_sizes):
+
+        self.emissions_writer.resume(file_sizes)
+
+    def concatenate_files(self, *args, **kwargs):
+
+        self.emissions_writer.concatenate_files(*args, **kwargs)
+
+    def write_blocks_from_queue(self):
+
+        while True:
+            item = self.queue.get()
+            if item is self.STOP:
+                self.queue.task_done()
+                return
+
+            if self.error is None:
+                try:
+                    self.emissions_writer.write(*item)
+                except Exception as e:
+                    self.error = e
+            self.queue.task_done()
+
+    def raise_error_if_writing_failed(self):
+
+        if self.error is not None:
+            raise RuntimeError(f"Writing emissions failed in the background: {self.error!r}") from self.error
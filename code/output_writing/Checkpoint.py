@@ -0,0 +1,132 @@
+"""
+Checkpoint
+
+This module contains the checkpoints of the emission calculation. It is used by the StrategyInvoker to continue an
+interrupted run (config argument `resume`) instead of starting over.
+
+A checkpoint is a json file in the emissions output folder with
+- the number of rows of the traffic and link data for which the emissions are saved,
+- the size in bytes of each output file after these rows were saved,
+- a fingerprint of the config, so that a run is only resumed with the config it was started with,
+- whether the emission calculation is finished.
+
+The checkpoint is replaced atomically. Either the old or the new checkpoint survives if the process is killed while
+the checkpoint is saved.
+"""
+from typing import Any, Dict, Optional
+
+import hashlib
+import json
+import os
+from time import perf_counter
+
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Config arguments that don't change the emissions or the order of the rows in the output files.
+CONFIG_ARGUMENTS_IGNORED_IN_FINGERPRINT = [
+    "resume", "profile", "checkpoint_interval_in_seconds", "write_in_background", "write_queue_size",
+    "output_folder", "output_folder_for_yeti_format_data", "conversion_cache_folder", "yeti_format_file_format",
+    "traffic_data_chunk_size"
+]
+
+
+class Checkpoint:
+    """
+    Saves and loads the checkpoint of the emission calculation in an output folder.
+
+    Attributes
+    ----------
+    file : str
+        The checkpoint file.
+    interval_in_seconds : float
+        The minimum time between two checkpoints. See `is_due`.
+    fingerprint : str
+        The fingerprint of the config of the run.
+
+    Methods
+    -------
+    is_due
+        Returns True if the last checkpoint was saved at least `interval_in_seconds` ago.
+    save
+        Saves a checkpoint.
+    load
+        Returns the saved checkpoint. None if there is no checkpoint.
+    """
+
+    def __init__(self, output_folder: str, config: Dict[str, Any], interval_in_seconds: float = 60):
+
+        self.output_folder = output_folder
+        self.file = f"{output_folder}/{CHECKPOINT_FILE}"
+        self.interval_in_seconds = interval_in_seconds
+        self.fingerprint = get_config_fingerprint(config)
+        self.time_of_last_save = perf_counter()
+
+    def is_due(self) -> bool:
+
+        return perf_counter() - self.time_of_last_save >= self.interval_in_seconds
+
+    def save(self, rows_done: int, file_sizes: Dict[str, int], finished: bool = False):
+        """ Save the checkpoint. The keys of `file_sizes` are the paths of the output files. """
+
+        checkpoint = {
+            "rows_done": rows_done,
+            "file_sizes": {os.path.relpath(file, self.output_folder): size for file, size in file_sizes.items()},
+            "config_fingerprint": self.fingerprint,
+            "finished": finished
+        }
+
+        temporary_file = f"{self.file}.tmp"
+        with open(temporary_file, "w") as fp:
+            json.dump(checkpoint, fp, indent=2)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temporary_file, self.file)
+
+        self.time_of_last_save = perf_counter()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """ Load the checkpoint. The keys of 'file_sizes' are the paths of the output files. """
+
+        if not os.path.isfile(self.file):
+            return None
+
+        with open(self.file) as fp:
+            checkpoint = json.load(fp)
+
+        if checkpoint["config_fingerprint"] != self.fingerprint:
+            raise RuntimeError(
+                f"The checkpoint {self.file} was saved by a run with another config. The run can only be resumed "
+                f"with the config it was started with. Remove the checkpoint to start the run from the beginning.")
+
+        checkpoint["file_sizes"] = {
+            os.path.join(self.output_folder, file): size for file, size in checkpoint["file_sizes"].items()
+        }
+        return checkpoint
+
+
+def get_config_fingerprint(config: Dict[str, Any]) -> str:
+    """ A hash of the config arguments with plain values (e.g. strings, numbers and lists or dicts of them).
+    Data (e.g. pd.DataFrames) and classes in `config` are ignored. """
+
+    config_values = {
+        key: value for key, value in config.items()
+        if key not in CONFIG_ARGUMENTS_IGNORED_IN_FINGERPRINT and is_plain_value(value)
+    }
+    return hashlib.sha256(json.dumps(config_values, sort_keys=True).encode()).hexdigest()
+
+
+def is_plain_value(value) -> bool:
+
+    if isinstance(value, (list, tuple)):
+        return all(is_plain_value(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and is_plain_value(item) for key, item in value.items())
+    return value is None or isinstance(value, (str, bool, int, float))
+
+
+def remove_checkpoint(output_folder: str):
+
+    checkpoint_file = f"{output_folder}/{CHECKPOINT_FILE}"
+    if os.path.isfile(checkpoint_file):
+        os.remove(checkpoint_file)
@@ -0,0 +1,240 @@
+"""
+EmissionsWriter
+
+This module contains the writers used by the StrategyInvoker to save emissions to disc. The writer is selected
+with the config argument `output_format`:
+- csv (default): CsvEmissionsWriter
+- parquet: ParquetEmissionsWriter
+- feather: FeatherEmissionsWriter
+
+All writers append the data of each call to `write` to the given file. The first call for a file overwrites
+existing files.
+
+Only the CsvEmissionsWriter supports checkpoints (see Checkpoint.py): csv files can be truncated to the size they had
+at the last checkpoint and appended to. Parquet and feather files are only readable after their footer is written.
+"""
+from typing import Dict, Iterator, List
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is only needed for the output formats 'parquet' and 'feather'
+    pa = None
+
+
+DICTIONARY_ENCODED_COLUMNS = ["LinkID", "DayType", "Dir"]
+NOT_EMISSION_COLUMNS = DICTIONARY_ENCODED_COLUMNS + ["Hour"]
+
+
+class CsvEmissionsWriter:
+    """
+    Writes emissions to csv files. The header is only written with the first block of data for each file.
+    """
+
+    file_extension = "csv"
+    supports_checkpoints = True
+
+    def __init__(self):
+
+        self.files_written = set()
+
+    def write(self, data: pd.DataFrame, file: str):
+
+        # the first save should override an existing file
+        use_header = file not in self.files_written
+        mode = "w" if use_header else "a"
+
+        with open(file, mode) as fp:
+            data.to_csv(fp, header=use_header, index_label=False, index=False)
+
+        self.files_written.add(file)
+
+    def close(self):
+
+        self.files_written = set()
+
+    def flush(self):
+        """ Make sure that the data written so far is on disc, even if the machine goes down. """
+
+        for file in self.files_written:
+            with open(file, "a") as fp:
+                os.fsync(fp.fileno())
+
+    def get_file_sizes(self) -> Dict[str, int]:
+
+        return {file: os.path.getsize(file) for file in self.files_written}
+
+    def resume(self, file_sizes: Dict[str, int]):
+        """ Continue writing the given files after truncating them to the given sizes in bytes. Rows written after the
+        sizes were recorded are removed. The header is not written again. """
+
+        for file, size in file_sizes.items():
+            if not os.path.isfile(file) or os.path.getsize(file) < size:
+                raise RuntimeError(f"The output file {file} is missing or smaller than at the last checkpoint. "
+                                   f"The run can't be resumed.")
+            with open(file, "r+") as fp:
+                fp.truncate(size)
+            self.files_written.add(file)
+
+    def concatenate_files(self, files: List[str], output_file: str):
+        """ Concatenate csv files with the same header. The header is only kept once. """
+
+        with open(output_file, "w") as output_fp:
+            for i, file in enumerate(files):
+                with open(file) as input_fp:
+                    header = input_fp.readline()
+                    if i == 0:
+                        output_fp.write(header)
+                    shutil.copyfileobj(input_fp, output_fp)
+
+
+class ArrowEmissionsWriter:
+    """
+    Base class for writers of columnar output files. Each call to `write` adds a new row group (parquet) or
+    record batch (feather) to the file.
+
+    The emission columns are saved as float32. The columns LinkID, DayType and Dir are dictionary-encoded.
+    The dictionary for each column grows with each block of data, so that all blocks in a file share the
+    same dictionary.
+
+    Attributes
+    ----------
+    file_writers : Dict[str, Any]
+        The open pyarrow writers by file name.
+    schemas : Dict[str, pa.Schema]
+        The schema of each file. The schema is determined from the first block of data written to a file.
+    dictionaries : Dict[Tuple[str, str], pd.Index]
+        The dictionary values by file name and column name.
+    """
+
+    file_extension = None
+    supports_checkpoints = False
+
+    def __init__(self):
+
+        if pa is None:
+            raise RuntimeError(
+                f"The output format '{self.file_extension}' requires the package pyarrow. "
+                f"Please install it with 'pip install pyarrow' or use the output format 'csv'.")
+
+        self.file_writers = {}
+        self.schemas = {}
+        self.dictionaries = {}
+
+    def write(self, data: pd.DataFrame, file: str):
+
+        table = self.to_arrow_table(data, file)
+
+        if file not in self.file_writers:
+            self.schemas[file] = table.schema
+            self.file_writers[file] = self.open_file_writer(file, table.schema)
+        elif not table.schema.equals(self.schemas[file]):
+            table = table.cast(self.schemas[file])
+
+        self.file_writers[file].write_table(table)
+
+    def close(self):
+
+        for file_writer in self.file_writers.values():
+            file_writer.close()
+
+        self.file_writers = {}
+        self.schemas = {}
+        self.dictionaries = {}
+
+    def concatenate_files(self, files: List[str], output_file: str):
+        """ Concatenate files written by this writer class. The dictionaries are re-encoded for the output file. """
+
+        for file in files:
+            for batch in self.read_batches(file):
+                self.write(batch.to_pandas(), output_file)
+        self.close()
+
+    def to_arrow_table(self, data: pd.DataFrame, file: str) -> "pa.Table":
+
+        arrays = []
+        for column in data.columns:
+            if column in DICTIONARY_ENCODED_COLUMNS:
+                arrays.append(self.dictionary_encode(data[column], file, column))
+            elif column in NOT_EMISSION_COLUMNS:
+                arrays.append(pa.array(data[column].to_numpy()))
+            else:
+                arrays.append(pa.array(data[column].to_numpy(dtype=np.float32)))
+
+        return pa.Table.from_arrays(arrays, names=[str(column) for column in data.columns])
+
+    def dictionary_encode(self, values: pd.Series, file: str, column: str) -> "pa.DictionaryArray":
+
+        values = np.asarray(values)
+        known_values = self.dictionaries.get((file, column), pd.Index([], dtype=object))
+        new_values = pd.Index(pd.unique(values)).difference(known_values, sort=False)
+        if len(new_values) > 0:
+            known_values = known_values.append(new_values)
+            self.dictionaries[(file, column)] = known_values
+
+        indices = pa.array(known_values.get_indexer(values), type=pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(known_values.to_numpy()))
+
+    def open_file_writer(self, file: str, schema: "pa.Schema"):
+
+        raise NotImplementedError()
+
+    def read_batches(self, file: str) -> Iterator["pa.RecordBatch"]:
+
+        raise NotImplementedError()
+
+
+class ParquetEmissionsWriter(ArrowEmissionsWriter):
+    """ Writes emissions to parquet files with one row group per block of data. """
+
+    file_extension = "parquet"
+
+    def open_file_writer(self, file: str, schema: "pa.Schema"):
+
+        return pa.parquet.ParquetWriter(file, schema)
+
+    def read_batches(self, file: str) -> Iterator["pa.RecordBatch"]:
+
+        parquet_file = pa.parquet.ParquetFile(file)
+        for i in range(parquet_file.num_row_groups):
+            yield from parquet_file.read_row_group(i).to_batches()
+
+
+class FeatherEmissionsWriter(ArrowEmissionsWriter):
+    """ Writes emissions to feather (Arrow IPC) files with one record batch per block of data. """
+
+    file_extension = "feather"
+
+    def open_file_writer(self, file: str, schema: "pa.Schema"):
+
+        # The dictionaries only grow, so later blocks can be written as dictionary deltas.
+        options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        return pa.ipc.new_file(file, schema, options=options)
+
+    def read_batches(self, file: str) -> Iterator["pa.RecordBatch"]:
+
+        with pa.ipc.open_file(file) as reader:
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+
+EMISSIONS_WRITERS: Dict[str, type] = {
+    "csv": CsvEmissionsWriter,
+    "parquet": ParquetEmissionsWriter,
+    "feather": FeatherEmissionsWriter
+}
+
+
+def get_emissions_writer(output_format: str = "csv"):
+
+    if output_format not in EMISSIONS_WRITERS:
+        raise RuntimeError(
+            f"output_format {output_format} is not recognized. Please use one of {list(EMISSIONS_WRITERS)}.")
+    return EMISSIONS_WRITERS[output_format]()
@@ -6,6 +6,9 @@ Sources for PM non-exhaust emissions are tyre wear, brake wear and road surface
 """
 from typing import Any, Dict, Iterable, Tuple, List
 
+import numpy as np
+import pandas as pd
+
 
 class PMNonExhaustStrategy:
     """
@@ -31,6 +34,12 @@ class PMNonExhaustStrategy:
     number_of_axles_per_vehicle : Dict
         Maps vehicle names to the corresponding number of axles.
             E.g. "RT >14-20t Euro-II": 4
+    efs_for_vehicles : Dict
+        Holds the emission factors for tyre wear, break wear and road surface wear as arrays with one entry
+        per vehicle in the format ``'tyre' -> np.ndarray``. Used by ``calculate_emissions_batch``.
+    mass_fractions : Dict
+        Holds the TSP, PM10 and PM25 mass fractions for tyre wear, break wear and road surface wear in the
+        format ``'tyre' -> (1, 0.6, 0.42)``. Used by ``calculate_emissions_batch``.
 
     Methods
     -------
@@ -38,6 +47,8 @@ class PMNonExhaustStrategy:
         The main interface for this Strategy. calculate_emissions is called over and over during
         a model run. Its job is to take a single traffic row (and some other parameters) and output
         a single row of the TSP emissions data, the PM10 emissions data, and PM25 emissions data.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once.
     """
 
     def __init__(self):
@@ -47,6 +58,10 @@ class PMNonExhaustStrategy:
         self.load_factor = None
         self.los_speeds_dict = None
 
+        self.efs_for_vehicles = None
+        self.mass_fractions = None
+        self.los_speeds_for_vehicle_categories = None
+
     def calculate_emissions(self,
                             traffic_and_link_data_row: Dict[str, Any],
                             vehicle_dict: Dict[str, str],
@@ -427,3 +442,134 @@ class PMNonExhaustStrategy:
     def pm25_road_surface_wear_mass_fraction(self) -> float:
 
         return 0.27
+
+    #
+    # *** batch calculation ***
+    #
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once.
+
+        The emission factors and mass fractions are looked up once per vehicle. The speed factors are calculated
+        for the los speeds of all rows, vehicles and LOS at once.
+        """
+
+        self.initialize_if_necessary(vehicle_dict, **kwargs)
+        self.initialize_efs_and_mass_fractions_if_necessary()
+
+        num_vehicles = traffic_and_link_data[list(self.vehicles())].to_numpy(dtype=float)
+        link_length = traffic_and_link_data["Length"].to_numpy(dtype=float)
+        los_percentages = traffic_and_link_data[
+            ["LOS1Percentage", "LOS2Percentage", "LOS3Percentage", "LOS4Percentage"]].to_numpy(dtype=float)
+        los_speeds = self.get_los_speeds_for_block(traffic_and_link_data["LinkID"])
+
+        total_pm_emissions = {
+            "break": self.calculate_emissions_for_los_types_batch(
+                num_vehicles, link_length, self.efs_for_vehicles["break"],
+                self.calculate_break_wear_speed_factor_batch(los_speeds), los_percentages),
+            "tyre": self.calculate_emissions_for_los_types_batch(
+                num_vehicles, link_length, self.efs_for_vehicles["tyre"],
+                self.calculate_tyre_wear_speed_factor_batch(los_speeds), los_percentages),
+            "road_surface": self.emissions_formula(
+                num_vehicles, link_length[:, np.newaxis], self.efs_for_vehicles["road_surface"], 1, 1)
+        }
+
+        emissions = {}
+        for pm_type_index, pm_type in enumerate(["TSP", "PM10", "PM25"]):
+            # add up the sources in the same order as add_emission_dicts
+            emissions_for_pm_type = sum(
+                total_pm_emissions[source] * self.mass_fractions[source][pm_type_index]
+                for source in ["break", "tyre", "road_surface"])
+            emissions[pm_type] = pd.DataFrame(
+                emissions_for_pm_type, index=traffic_and_link_data.index, columns=list(self.vehicles()))
+
+        return emissions
+
+    def initialize_efs_and_mass_fractions_if_necessary(self):
+
+        if self.efs_for_vehicles is None:
+            self.efs_for_vehicles = {
+                "tyre": np.array([self.get_tyre_wear_ef_for_vehicle(vehicle) for vehicle in self.vehicles()]),
+                "break": np.array([self.get_break_wear_ef_for_vehicle(vehicle) for vehicle in self.vehicles()]),
+                "road_surface": np.array(
+                    [self.get_road_surface_wear_ef_for_vehicle(vehicle) for vehicle in self.vehicles()])
+            }
+            self.mass_fractions = {
+                "tyre": (1, self.pm10_tyre_wear_mass_fraction(), self.pm25_tyre_wear_mass_fraction()),
+                "break": (1, self.pm10_break_wear_mass_fraction(), self.pm25_break_wear_mass_fraction()),
+                "road_surface": (
+                    1, self.pm10_road_surface_wear_mass_fraction(), self.pm25_road_surface_wear_mass_fraction())
+            }
+
+    def calculate_emissions_for_los_types_batch(
+            self, num_vehicles: np.ndarray, link_length: np.ndarray, ef: np.ndarray, speed_factor: np.ndarray,
+            los_percentages: np.ndarray) -> np.ndarray:
+        """ Batch version of calculate_tyre_wear_emissions and calculate_break_wear_emissions without the split
+        into mass fractions. Returns the emissions as an array of shape (rows, vehicles).
+
+        :param speed_factor: The speed factors with shape (rows, vehicles, 4).
+        """
+
+        total_pm_emissions = np.zeros(num_vehicles.shape)
+        for los_index in range(4):
+            emissions_for_speed = self.emissions_formula(
+                num_vehicles, link_length[:, np.newaxis], ef, 1, speed_factor[:, :, los_index])
+            total_pm_emissions += emissions_for_speed * los_percentages[:, [los_index]]
+
+        return total_pm_emissions
+
+    def calculate_tyre_wear_speed_factor_batch(self, speeds: np.ndarray) -> np.ndarray:
+
+        return np.select(
+            [speeds < 40, (40 <= speeds) & (speeds <= 90), speeds > 90],
+            [1.39, -0.00974 * speeds + 1.78, 0.902],
+            default=np.nan)
+
+    def calculate_break_wear_speed_factor_batch(self, speeds: np.ndarray) -> np.ndarray:
+
+        return np.select(
+            [speeds < 40, (40 <= speeds) & (speeds <= 95), speeds > 95],
+            [1.67, -0.027 * speeds + 2.75, 0.185],
+            default=np.nan)
+
+    def get_los_speeds_for_block(self, link_ids: pd.Series) -> np.ndarray:
+        """ Returns the los speeds for the given links and all vehicles as an array of shape (rows, vehicles, 4).
+
+        Raises a KeyError if there are no los speeds for a link and vehicle category and a ValueError if
+        a los speed is missing.
+        """
+
+        los_speeds_for_vehicle_categories = self.get_los_speeds_for_vehicle_categories()
+
+        los_speeds = np.empty((len(link_ids), len(self.vehicle_dict), 4))
+        for vehicle_index, vehicle_category in enumerate(self.vehicle_dict.values()):
+            los_speeds_for_category = los_speeds_for_vehicle_categories.get(vehicle_category)
+            if los_speeds_for_category is None:
+                raise KeyError(f"No los speeds for vehicle category {vehicle_category}")
+
+            indices = los_speeds_for_category.index.get_indexer(link_ids)
+            if (indices < 0).any():
+                unknown_links = pd.unique(link_ids.to_numpy()[indices < 0])
+                raise KeyError(f"No los speeds for vehicle category {vehicle_category} and links {list(unknown_links[:10])}")
+            los_speeds[:, vehicle_index, :] = los_speeds_for_category.to_numpy(dtype=float)[indices]
+
+        if np.isnan(los_speeds).any():
+            raise ValueError("Some of the los speeds for the block are missing.")
+
+        return los_speeds
+
+    def get_los_speeds_for_vehicle_categories(self) -> Dict[str, pd.DataFrame]:
+
+        if self.los_speeds_for_vehicle_categories is None:
+            los_speeds_data = pd.DataFrame.from_dict(self.los_speeds_dict, orient="index")[
+                ["LOS1Speed", "LOS2Speed", "LOS3Speed", "LOS4Speed"]]
+            self.los_speeds_for_vehicle_categories = {
+                vehicle_category: los_speeds_data.xs(vehicle_category, level=1)
+                for vehicle_category in los_speeds_data.index.get_level_values(1).unique()
+            }
+        return self.los_speeds_for_vehicle_categories
@@ -1,5 +1,5 @@
 from code.data_loading.PMNonExhaustDataLoader import PMNonExhaustDataLoader
-from code.strategy_helpers.helpers import save_dataframes
+from code.strategy_helpers.helpers import get_traffic_data_dict, save_dataframes
 
 
 def load_pm_non_exhaust_berlin_format_data(**kwargs):
@@ -12,7 +12,8 @@ def load_pm_non_exhaust_berlin_format_data(**kwargs):
         los_speeds_file=kwargs["berlin_format_los_speeds"],
         traffic_data_file=kwargs["berlin_format_traffic_data"]
     )
-    (link_data, vehicle_data, traffic_data, los_speeds_data, _, _) = loader.load_data()
+    (link_data, vehicle_data, traffic_data, los_speeds_data, _, _) = loader.load_data(
+        factored_traffic_data=kwargs.get("factored_traffic_data", False))
 
     yeti_format_data_file_paths = save_dataframes(
         output_folder,
@@ -20,7 +21,8 @@ def load_pm_non_exhaust_berlin_format_data(**kwargs):
             "yeti_format_los_speeds": los_speeds_data,
             "yeti_format_vehicle_data": vehicle_data,
             "yeti_format_link_data": link_data,
-            "yeti_format_traffic_data": traffic_data
-        }
+            **get_traffic_data_dict(traffic_data)
+        },
+        file_format=kwargs.get("yeti_format_file_format", "csv")
     )
     return yeti_format_data_file_paths
\ No newline at end of file
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Any, Callable, Dict
+
+
+class ConversionCache:
+    """
+    Caches the yeti_format data produced from berlin_format data.
+
+    Each cache entry is a folder in cache_folder. Its name is a hash of the berlin_format input files (the contents of
+    all files given with config arguments containing 'berlin_format', e.g. 'hot_berlin_format_emission_factors') and of
+    all other config arguments, except for the ones that only matter for the emission calculation or the output
+    (RUNTIME_CONFIG_KEYS). This way config arguments of composed Strategies (e.g. 'only_hot' or 'cold_strategy') are
+    part of the key as well. A model run with the same inputs finds the entry and reuses its yeti_format files instead
+    of converting the berlin_format data again.
+    The yeti_format files in the cache are saved as parquet files (or feather files if 'yeti_format_file_format' is
+    'feather'), which are much faster to read than csv files.
+
+    Attributes
+    ----------
+    cache_folder : str
+        The folder that holds the cache entries.
+    key : str
+        The hash that identifies the cache entry for the given config.
+    entry_folder : str
+        The folder of the cache entry for the given config.
+
+    Methods
+    -------
+    load_or_convert
+        Returns the locations of the cached yeti_format files. Converts the berlin_format data with the given
+        load function and caches the result if there is no cache entry yet.
+    """
+
+    FORMAT_VERSION = "1"
+    MANIFEST_FILE = "yeti_format_files.json"
+    RUNTIME_CONFIG_KEYS = ("output_folder", "output_folder_for_yeti_format_data", "conversion_cache_folder",
+                           "profile", "resume", "checkpoint_interval_in_seconds", "workers", "partition_by",
+                           "output_format", "write_in_background", "write_queue_size", "traffic_data_chunk_size",
+                           "scenarios")
+
+    def __init__(self, cache_folder: str, config_dict: Dict[str, Any]):
+
+        self.cache_folder = cache_folder
+        self.config_dict = config_dict
+        self.key = self.get_key()
+        self.entry_folder = os.path.join(cache_folder, self.key)
+
+    def get_key(self) -> str:
+
+        sha = hashlib.sha1(f"version: {self.FORMAT_VERSION}".encode())
+        for key in sorted(self.config_dict):
+            value = self.config_dict[key]
+            if key in self.RUNTIME_CONFIG_KEYS:
+                continue
+            sha.update(f"{key}: ".encode())
+            if "berlin_format" in key and isinstance(value, str) and os.path.isfile(value):
+                update_hash_with_file_contents(sha, value)
+            else:
+                sha.update(f"{value!r}\n".encode())
+        return sha.hexdigest()
+
+    def load_or_convert(self, load_function: Callable[..., Dict[str, str]]) -> Dict[str, str]:
+
+        manifest_file = os.path.join(self.entry_folder, self.MANIFEST_FILE)
+        if os.path.isfile(manifest_file):
+            yeti_format_file_locations = self.read_manifest(manifest_file)
+            if all(os.path.exists(location) for location in yeti_format_file_locations.values()):
+                logging.info(f"Using the cached yeti_format data in {self.entry_folder}.")
+                return yeti_format_file_locations
+            logging.debug(f"The cache entry {self.entry_folder} is incomplete. Converting the data again.")
+
+        os.makedirs(self.cache_folder, exist_ok=True)
+        tmp_folder = f"{self.entry_folder}.tmp-{os.getpid()}"
+        yeti_format_file_locations = load_function(**{
+            **self.config_dict,
+            "output_folder_for_yeti_format_data": tmp_folder,
+            "yeti_format_file_format": self.get_file_format()
+        })
+        self.write_manifest(os.path.join(tmp_folder, self.MANIFEST_FILE), yeti_format_file_locations, tmp_folder)
+
+        # Move the finished entry into place in one step, so that other runs never see a partly written entry.
+        if os.path.isdir(self.entry_folder):
+            shutil.rmtree(self.entry_folder)
+        os.replace(tmp_folder, self.entry_folder)
+        logging.debug(f"Saved the yeti_format data in the cache entry {self.entry_folder}.")
+
+        return self.read_manifest(manifest_file)
+
+    def get_file_format(self) -> str:
+
+        file_format = self.config_dict.get("yeti_format_file_format", "parquet")
+        return file_format if file_format != "csv" else "parquet"
+
+    def write_manifest(self, manifest_file: str, yeti_format_file_locations: Dict[str, str], folder: str):
+
+        # Files in the cache entry are saved relative to the entry, so that the entry can be moved.
+        # Files outside of the entry (e.g. berlin_format files that are used as they are) are saved as absolute paths.
+        folder = os.path.abspath(folder)
+        manifest = {}
+        for name, location in yeti_format_file_locations.items():
+            location = os.path.abspath(location)
+            if os.path.commonpath([location, folder]) == folder:
+                manifest[name] = {"file": os.path.relpath(location, folder), "in_cache_entry": True}
+            else:
+                manifest[name] = {"file": location, "in_cache_entry": False}
+
+        with open(manifest_file, "w") as fp:
+            json.dump(manifest, fp, indent=2)
+
+    def read_manifest(self, manifest_file: str) -> Dict[str, str]:
+
+        with open(manifest_file) as fp:
+            manifest = json.load(fp)
+
+        return {
+            name: os.path.join(self.entry_folder, entry["file"]) if entry["in_cache_entry"] else entry["file"]
+            for name, entry in manifest.items()
+        }
+
+
+def update_hash_with_file_contents(sha, file: str, block_size: int = 2 ** 20):
+
+    with open(file, "rb") as fp:
+        for block in iter(lambda: fp.read(block_size), b""):
+            sha.update(block)
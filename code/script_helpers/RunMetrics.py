@@ -0,0 +1,152 @@
+"""
+RunMetrics
+
+This module contains the instrumentation for the steps of a model run. For each step (and for each phase of the
+emission calculation in the StrategyInvoker) RunMetrics records:
+- the wall time,
+- the CPU time of the process and of its finished child processes (e.g. the worker processes of the
+  ParallelStrategyInvoker),
+- the peak resident set size (RSS) of the process and its child processes until the end of the step,
+- the number of rows processed and the throughput in rows per second, if the step processes rows.
+
+The peak RSS is only available on systems with the Python module 'resource' (Linux and macOS).
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import json
+import os
+import sys
+from time import perf_counter, process_time
+
+try:
+    import resource
+except ImportError:  # the module 'resource' is not available on Windows
+    resource = None
+
+
+class RunMetrics:
+    """
+    Collects the wall time, CPU time, peak RSS and number of rows of named stages.
+
+    Stages can be measured more than once (e.g. once per chunk of the traffic data). The values are then summed up.
+    If a stage is measured while another stage is being measured, the time of the inner stage is not counted for the
+    outer stage. This way the times of the stages add up to the time of the whole run.
+
+    Attributes
+    ----------
+    stages : OrderedDict
+        Maps the stage names to dicts with the metrics of the stage, in the order in which the stages were first
+        started.
+
+    Methods
+    -------
+    measure
+        A context manager that measures the code executed in its body as the given stage.
+    add_rows
+        Adds to the number of rows processed in a stage.
+    add_metrics
+        Adds the metrics from another RunMetrics instance (e.g. from a worker process) given as a dict.
+    to_dict
+        Returns the metrics as a dict that can be saved as json.
+    """
+
+    def __init__(self):
+
+        self.stages = OrderedDict()
+        self.times_of_inner_stages: List[List[float]] = []
+        self.stages_in_progress: List[str] = []
+
+    @contextmanager
+    def measure(self, stage: str, rows: int = 0):
+
+        self.add(stage)  # the stages are listed in the order in which they are started
+        start_wall_time, start_cpu_time = perf_counter(), get_cpu_time()
+        self.times_of_inner_stages.append([0.0, 0.0])
+        self.stages_in_progress.append(stage)
+        try:
+            yield self
+        finally:
+            wall_time, cpu_time = perf_counter() - start_wall_time, get_cpu_time() - start_cpu_time
+            inner_wall_time, inner_cpu_time = self.times_of_inner_stages.pop()
+            self.stages_in_progress.pop()
+            self.add(stage, wall_time - inner_wall_time, cpu_time - inner_cpu_time, rows, get_peak_rss_in_mb())
+
+            if len(self.times_of_inner_stages) > 0:
+                self.times_of_inner_stages[-1][0] += wall_time
+                self.times_of_inner_stages[-1][1] += cpu_time
+
+    def add(self, stage: str, wall_time: float = 0.0, cpu_time: float = 0.0, rows: int = 0, peak_rss_in_mb=None):
+
+        metrics = self.stages.setdefault(stage, {"wall_time_s": 0.0, "cpu_time_s": 0.0, "peak_rss_mb": None, "rows": 0})
+        metrics["wall_time_s"] += wall_time
+        metrics["cpu_time_s"] += cpu_time
+        metrics["rows"] += rows
+        if peak_rss_in_mb is not None:
+            metrics["peak_rss_mb"] = max(metrics["peak_rss_mb"] or 0.0, peak_rss_in_mb)
+
+    def add_rows(self, stage: str, rows: int):
+
+        self.add(stage, rows=rows)
+
+    def add_metrics(self, stages: Dict[str, Dict[str, Any]]):
+        """ Add the metrics of the stages in the return value of another instance's to_dict. """
+
+        for stage, metrics in stages.items():
+            self.add(stage, metrics["wall_time_s"], metrics["cpu_time_s"], metrics["rows"], metrics["peak_rss_mb"])
+
+    def get_rows(self, stage: str) -> int:
+
+        return self.stages[stage]["rows"] if stage in self.stages else 0
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+
+        return OrderedDict(
+            (stage, {**metrics, "rows_per_s": get_rows_per_second(metrics)}) for stage, metrics in self.stages.items()
+        )
+
+    def get_text(self) -> str:
+        """ Format the metrics as a table for run_info.txt. Stages that are still being measured are marked. """
+
+        lines = [f"{'':<40}{'wall time [s]':>15}{'cpu time [s]':>15}{'peak rss [MB]':>15}{'rows':>12}{'rows/s':>12}"]
+        for stage, metrics in self.to_dict().items():
+            stage = f"{stage} (in progress)" if stage in self.stages_in_progress else stage
+            peak_rss = "-" if metrics["peak_rss_mb"] is None else f"{metrics['peak_rss_mb']:.1f}"
+            rows = "-" if metrics["rows"] == 0 else str(metrics["rows"])
+            rows_per_second = "-" if metrics["rows_per_s"] is None else f"{metrics['rows_per_s']:.1f}"
+            lines.append(f"{stage:<40}{metrics['wall_time_s']:>15.3f}{metrics['cpu_time_s']:>15.3f}{peak_rss:>15}"
+                         f"{rows:>12}{rows_per_second:>12}")
+        return "\n".join(lines)
+
+
+def get_rows_per_second(metrics: Dict[str, Any]):
+
+    if metrics["rows"] == 0 or metrics["wall_time_s"] <= 0:
+        return None
+    return metrics["rows"] / metrics["wall_time_s"]
+
+
+def get_cpu_time() -> float:
+    """ The CPU time of this process and its finished child processes in seconds. """
+
+    times = os.times()
+    return process_time() + times.children_user + times.children_system
+
+
+def get_peak_rss_in_mb():
+    """ The peak RSS of this process or of its largest finished child process in MB. None if it is not available. """
+
+    if resource is None:
+        return None
+
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    bytes_per_unit = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak_rss * bytes_per_unit / 2 ** 20
+
+
+def write_metrics_file(output_file: str, metrics: Dict[str, Any]):
+
+    with open(output_file, "w") as fp:
+        json.dump(metrics, fp, indent=2)
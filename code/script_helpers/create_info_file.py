@@ -1,7 +1,8 @@
 import os
 
 
-def create_info_file(output_file, timestamp, duration, config_dict, config_file, yeti_format_file_locations):
+def create_info_file(output_file, timestamp, duration, config_dict, config_file, yeti_format_file_locations,
+                     metrics_text=None):
 
     mode = config_dict["mode"]
 
@@ -15,6 +16,7 @@ def create_info_file(output_file, timestamp, duration, config_dict, config_file,
                  f"=============\n"
                  f"{general_info_text}\n"
                  f"\n"
+                 f"{get_metrics_section(metrics_text)}"
                  f"File Locations:\n"
                  f"===============\n"
                  f"{file_locations_text}\n"
@@ -38,6 +40,7 @@ def get_general_info_text(config_dict, duration, mode, timestamp):
     validation_function = config_dict.get("validation_function")
     links_to_use = config_dict.get("links_to_use", [])
     use_n_traffic_data_rows = config_dict.get("use_n_traffic_data_rows")
+    traffic_data_chunk_size = config_dict.get("traffic_data_chunk_size")
 
     general_info_text = (
         f"time of run: {timestamp}\n"
@@ -45,9 +48,11 @@ def get_general_info_text(config_dict, duration, mode, timestamp):
         f"pollutants: {pollutants}\n"
         f"output folder: {output_folder}\n"
         f"yeti_format data output folder: {config_dict.get('output_folder_for_yeti_format_data')}\n"
+        f"yeti_format data file format: {config_dict.get('yeti_format_file_format', 'csv')}\n"
         f"use nh3 tier 2 ef: {use_nh3_tier2_ef}\n"
         f"links to use: {links_to_use}\n"
         f"n traffic data rows used: {use_n_traffic_data_rows}\n"
+        f"traffic data chunk size: {traffic_data_chunk_size}\n"
         f"\n"
         f"mode: {mode}\n"
         f"strategy: {strategy}\n"
@@ -58,6 +63,16 @@ def get_general_info_text(config_dict, duration, mode, timestamp):
     return general_info_text
 
 
+def get_metrics_section(metrics_text):
+
+    if metrics_text is None:
+        return ""
+    return (f"Run Metrics:\n"
+            f"============\n"
+            f"{metrics_text}\n"
+            f"\n")
+
+
 def get_file_locations_text(config_dict, mode, yeti_format_file_locations):
 
     newline = "\n"  # make '\n' usable for join operations in f-Strings
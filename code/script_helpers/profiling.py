@@ -0,0 +1,103 @@
+"""
+This module contains the profiling of the emission calculation. It is used if the config argument 'profile' is True
+(e.g. with the flag --profile of run_yeti.py).
+
+The emission calculation is profiled with cProfile. The results are saved next to the emissions output:
+- emission_calculation.pstats: the full profile. Read it with the module pstats or tools like snakeviz.
+- emission_calculation_profile.txt: the time spent in the methods of the Strategy and of the other YETI classes
+  (e.g. CopertHotStrategy.get_ef_copert vs StrategyInvoker.associate_emissions_with_time_and_location_info),
+  followed by the functions with the highest own time.
+
+If the emissions are calculated in multiple processes, each worker process profiles its shards and the profiles are
+combined.
+"""
+from contextlib import contextmanager
+from typing import List
+
+import cProfile
+import inspect
+import io
+import os
+import pstats
+
+import code
+
+
+PROFILE_FILE = "emission_calculation.pstats"
+REPORT_FILE = "emission_calculation_profile.txt"
+
+
+@contextmanager
+def profile(stats_file: str, enabled: bool = True):
+    """ Profile the body of the with statement with cProfile and save the stats in stats_file. """
+
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(stats_file)
+
+
+def combine_stats_files(stats_files: List[str], output_file: str):
+    """ Combine the profiles in stats_files into output_file. The other files are removed. """
+
+    stats = pstats.Stats(*stats_files)
+    stats.dump_stats(output_file)
+    for stats_file in stats_files:
+        if os.path.abspath(stats_file) != os.path.abspath(output_file):
+            os.remove(stats_file)
+
+
+def write_profile_report(stats_file: str, report_file: str, strategy_class, n_functions: int = 30):
+
+    stats = pstats.Stats(stats_file)
+    folders = {os.path.dirname(os.path.abspath(file)) for file in [code.__file__, inspect.getfile(strategy_class)]}
+
+    report = (f"# Profile of the emission calculation with {strategy_class.__name__}.\n"
+              f"# The full profile is in {os.path.basename(stats_file)}.\n"
+              f"\n"
+              f"Total time: {stats.total_tt:.3f} s\n"
+              f"\n"
+              f"Time per method of the Strategy and the other YETI classes:\n"
+              f"===========================================================\n"
+              f"{get_method_breakdown(stats, folders)}\n"
+              f"\n"
+              f"Functions with the highest own time:\n"
+              f"====================================\n"
+              f"{get_functions_with_highest_own_time(stats, n_functions)}")
+
+    with open(report_file, "w") as fp:
+        fp.write(report)
+
+
+def get_method_breakdown(stats: pstats.Stats, folders) -> str:
+    """ A table with the calls, own time and cumulative time of all functions defined in the given folders,
+    sorted by cumulative time. The functions are named '<module>.<function>'. YETI has one class per module,
+    so that this is the class and method name for methods. """
+
+    rows = []
+    for (file, _, function), (_, n_calls, own_time, cumulative_time, _) in stats.stats.items():
+        if any(os.path.abspath(file).startswith(folder + os.sep) for folder in folders):
+            name = f"{os.path.splitext(os.path.basename(file))[0]}.{function}"
+            rows.append((name, n_calls, own_time, cumulative_time))
+
+    total_time = max(stats.total_tt, 1e-9)
+    lines = [f"{'method':<80}{'calls':>10}{'own time [s]':>15}{'cum. time [s]':>15}{'cum. time [%]':>15}"]
+    for name, n_calls, own_time, cumulative_time in sorted(rows, key=lambda row: row[3], reverse=True):
+        lines.append(f"{name:<80}{n_calls:>10}{own_time:>15.3f}{cumulative_time:>15.3f}"
+                     f"{100 * cumulative_time / total_time:>15.1f}")
+    return "\n".join(lines)
+
+
+def get_functions_with_highest_own_time(stats: pstats.Stats, n_functions: int) -> str:
+
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("tottime").print_stats(n_functions)
+    return stream.getvalue()
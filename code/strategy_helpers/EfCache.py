@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class EfCache:
+    """
+    A bounded least-recently-used cache for emission factors.
+
+    The Strategies use it to avoid evaluating the same emission factor function over and over again, e.g. for
+    the same (vehicle, pollutant, speed) combination on every traffic row of a link.
+
+    Attributes
+    ----------
+    max_size : int
+        The maximum number of cached emission factors. If the cache is full, the least recently used emission
+        factor is removed. If max_size is 0, nothing is cached.
+    hits : int
+        The number of lookups that found an emission factor in the cache.
+    misses : int
+        The number of lookups that did not find an emission factor in the cache.
+    """
+
+    def __init__(self, max_size: int = 100000):
+
+        self.max_size = max_size
+        self.efs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[float]:
+
+        ef = self.efs.get(key)
+        if ef is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.efs.move_to_end(key)
+        return ef
+
+    def put(self, key: Hashable, ef: float):
+
+        if self.max_size <= 0:
+            return
+
+        self.efs[key] = ef
+        self.efs.move_to_end(key)
+        if len(self.efs) > self.max_size:
+            self.efs.popitem(last=False)
+
+    def clear(self):
+
+        self.efs.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+
+        return len(self.efs)
+
+    def hit_rate(self) -> float:
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __repr__(self):
+
+        return (f"EfCache(size={len(self)}, max_size={self.max_size}, hits={self.hits}, misses={self.misses}, "
+                f"hit_rate={self.hit_rate():.3f})")
@@ -0,0 +1,36 @@
+import collections
+from typing import Dict
+
+import numpy as np
+
+
+class HotEmissionsContext:
+    """
+    Holds intermediate results of a hot Strategy for the traffic row (or block of traffic rows) it calculated last.
+
+    Composed Strategies like the CopertStrategy pass the context from the hot Strategy on to the cold Strategy.
+    The cold Strategy can then use the hot emission factors and los speeds directly instead of dividing the hot
+    emissions by link length and vehicle count and looking up the los speeds again.
+
+    Attributes
+    ----------
+    hot_efs : Dict
+        The hot emission factors in the format ``pollutant -> efs``. For a single row, efs is a Dict
+        ``VehicleName -> ef``. For a block of rows, efs is a pd.DataFrame with one column per vehicle.
+    los_speeds : Dict
+        The los speeds in the format ``VehicleCategory -> los speeds``. For a single row, the los speeds are a Dict
+        ``{'LOS1Speed': .., 'LOS2Speed': .., 'LOS3Speed': .., 'LOS4Speed': ..}``. For a block of rows, they are an
+        array of shape (rows, 4). Empty if the hot Strategy does not use los speeds.
+    """
+
+    def __init__(self, hot_efs: Dict = None, los_speeds: Dict = None):
+
+        self.hot_efs = hot_efs if hot_efs is not None else collections.defaultdict(dict)
+        self.los_speeds = los_speeds if los_speeds is not None else {}
+
+    def select_rows(self, rows: np.ndarray) -> "HotEmissionsContext":
+        """ Return a context for a subset of the block of rows. rows is a boolean array with one value per row. """
+
+        return HotEmissionsContext(
+            hot_efs={pollutant: efs[rows] for pollutant, efs in self.hot_efs.items()},
+            los_speeds={category: los_speeds[rows] for category, los_speeds in self.los_speeds.items()})
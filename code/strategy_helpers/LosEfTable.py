@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+
+class LosEfTable:
+    """
+    Holds precomputed emission factors for the four levels of service (LOS) as an array of shape
+    (keys, vehicles, pollutants, 4). The keys are e.g. LinkIDs or traffic situations.
+
+    Hot Strategies build the table once per run. The emission factor for a traffic row then reduces
+    to weighting the four emission factors of the row's key with the row's LOS percentages.
+
+    Attributes
+    ----------
+    keys : pd.Index
+        The keys for the first dimension of efs.
+    vehicle_names : List[str]
+        The vehicle names for the second dimension of efs.
+    pollutants : List[str]
+        The pollutants for the third dimension of efs.
+    efs : np.ndarray
+        The emission factors for LOS1 to LOS4 with shape (keys, vehicles, pollutants, 4).
+    missing : np.ndarray
+        Boolean array of shape (keys, vehicles, pollutants). True where no emission factor could be determined.
+    fingerprint : str
+        Identifies the input data the table was built from. Used to decide if a saved table can be reused.
+    """
+
+    def __init__(self, keys, vehicle_names: List[str], pollutants: List[str], efs: np.ndarray,
+                 missing: np.ndarray = None, fingerprint: str = ""):
+
+        self.keys = pd.Index(keys)
+        self.vehicle_names = list(vehicle_names)
+        self.pollutants = list(pollutants)
+        self.efs = efs
+        self.missing = missing if missing is not None else np.zeros(efs.shape[:3], dtype=bool)
+        self.fingerprint = fingerprint
+
+    def get_indices(self, keys) -> np.ndarray:
+        """ Return the positions of the given keys in the table. Raises a KeyError for unknown keys. """
+
+        indices = self.keys.get_indexer(keys)
+        if (indices < 0).any():
+            unknown_keys = pd.unique(np.asarray(keys)[indices < 0])
+            raise KeyError(f"No emission factors in the LOS emission factor table for {list(unknown_keys[:10])}")
+        return indices
+
+    def get_los_weighted_efs(self, indices: np.ndarray, pollutant_index: int, los_percentages: np.ndarray) -> np.ndarray:
+        """ Return the LOS weighted emission factors as an array of shape (rows, vehicles).
+
+        :param indices: The positions of the rows' keys in the table (see get_indices).
+        :param pollutant_index: The position of the pollutant in self.pollutants.
+        :param los_percentages: The LOS1Percentage to LOS4Percentage values of the rows with shape (rows, 4).
+        """
+
+        if self.missing[indices, :, pollutant_index].any():
+            raise KeyError(f"Missing emission factors for pollutant {self.pollutants[pollutant_index]}.")
+
+        efs = self.efs[indices, :, pollutant_index, :]
+
+        # add up one LOS after the other to get the same results as adding up the LOS emission factors row by row
+        los_weighted_ef = np.zeros(efs.shape[:2])
+        for los_index in range(4):
+            los_weighted_ef += los_percentages[:, [los_index]] * efs[:, :, los_index]
+
+        return los_weighted_ef
+
+    def save(self, file: str):
+
+        with open(file, "wb") as fp:  # np.savez would append '.npz' to file names without that extension
+            np.savez(fp, keys=np.asarray(self.keys, dtype=object), vehicle_names=np.asarray(self.vehicle_names),
+                     pollutants=np.asarray(self.pollutants), efs=self.efs, missing=self.missing,
+                     fingerprint=np.asarray(self.fingerprint))
+
+    @classmethod
+    def load(cls, file: str) -> "LosEfTable":
+
+        with np.load(file, allow_pickle=True) as data:
+            return cls(
+                keys=data["keys"], vehicle_names=data["vehicle_names"].tolist(), pollutants=data["pollutants"].tolist(),
+                efs=data["efs"], missing=data["missing"], fingerprint=str(data["fingerprint"]))
+
+
+def load_or_build_los_ef_table(file: str, fingerprint: str, build_function: Callable[[], LosEfTable]) -> LosEfTable:
+    """ Load the LOS emission factor table from file if it was built from the same input data. Build it otherwise.
+
+    If a file is given, newly built tables are saved to it, so that later runs with the same data can reuse them.
+    """
+
+    if file is not None and os.path.isfile(file):
+        table = LosEfTable.load(file)
+        if table.fingerprint == fingerprint:
+            logging.debug(f"Loaded the LOS emission factor table from {file}.")
+            return table
+        logging.debug(f"The LOS emission factor table in {file} was built from other data. Rebuilding it.")
+
+    table = build_function()
+    table.fingerprint = fingerprint
+
+    if file is not None:
+        table.save(file)
+        logging.debug(f"Saved the LOS emission factor table to {file}.")
+
+    return table
+
+
+def get_fingerprint(*parts) -> str:
+    """ Hash the given strings, lists and DataFrames into a short string that identifies them. """
+
+    sha = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            sha.update(str(list(part.columns)).encode())
+            sha.update(pd.util.hash_pandas_object(part.astype(str), index=False).to_numpy().tobytes())
+        else:
+            sha.update(repr(part).encode())
+    return sha.hexdigest()
@@ -0,0 +1,152 @@
+"""
+ScenarioSweepStrategy
+
+This module implements the scenario sweep. It is used by the Model instead of the Strategy given in the config if the
+config argument 'scenarios' is given. 'scenarios' maps config arguments (e.g. 'temperature' and 'ltrip') to lists of
+values. There is one scenario for each combination of the values.
+
+The data is validated, converted and loaded once. The emissions for all scenarios are calculated in one pass over the
+traffic data: each block (or row) of the traffic data is passed to the Strategy once per scenario, with the config
+arguments of the scenario. The output files of each scenario are prefixed with the name of the scenario, e.g.
+'temperature_5_ltrip_12_PollutantType.CO_emissions.csv'.
+
+A Strategy may implement the function `calculate_emissions_batch_for_scenarios` to share work between the scenarios
+(e.g. the CopertStrategy calculates the hot emissions only once per block). Otherwise there is one Strategy instance
+per scenario.
+"""
+import itertools
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from code.script_helpers.dynamic_import_from import dynamic_import_from
+from code.strategy_helpers.helpers import add_prefix_to_keys
+
+
+class ScenarioSweepStrategy:
+    """
+    Calculates emissions for all scenarios of a scenario sweep with the Strategy given in the config.
+
+    Attributes
+    ----------
+    scenarios : Dict[str, Dict[str, Any]]
+        The config arguments of each scenario by scenario name.
+    strategy
+        The Strategy instance shared by all scenarios. Only used if the Strategy implements the function
+        `calculate_emissions_batch_for_scenarios`.
+    strategies_for_scenarios : Dict[str, Any]
+        One Strategy instance per scenario. Used if the Strategy doesn't implement
+        `calculate_emissions_batch_for_scenarios` or for the row by row calculation.
+
+    Methods
+    -------
+    calculate_emissions
+        Calculates the emissions for a single traffic row for all scenarios.
+    calculate_emissions_batch
+        Does the same as calculate_emissions, but for a whole block of traffic rows at once. Raises a
+        NotImplementedError if the Strategy doesn't support batch calculation.
+    """
+
+    def __init__(self):
+
+        self.strategy_class = None
+        self.scenarios = None
+        self.strategy = None
+        self.strategies_for_scenarios = None
+
+    def calculate_emissions(self,
+                            traffic_and_link_data_row: Dict[str, Any],
+                            vehicle_dict: Dict[str, str],
+                            pollutants: List[str],
+                            **kwargs):
+
+        self.initialize_if_necessary(**kwargs)
+        kwargs = drop_scenario_grid(kwargs)
+
+        emissions = {}
+        for name, scenario in self.scenarios.items():
+            emissions_for_scenario = self.strategies_for_scenarios[name].calculate_emissions(
+                traffic_and_link_data_row, vehicle_dict, pollutants, **{**kwargs, **scenario})
+            emissions.update(add_scenario_name_to_keys(name, emissions_for_scenario))
+
+        return emissions
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs) -> Dict[str, pd.DataFrame]:
+
+        self.initialize_if_necessary(**kwargs)
+        kwargs = drop_scenario_grid(kwargs)
+
+        if self.strategy is not None:
+            emissions_for_scenarios = self.strategy.calculate_emissions_batch_for_scenarios(
+                traffic_and_link_data, vehicle_dict, pollutants, self.scenarios, **kwargs)
+        else:
+            emissions_for_scenarios = {
+                name: self.call_batch_function_of_strategy(
+                    self.strategies_for_scenarios[name], traffic_and_link_data, vehicle_dict, pollutants,
+                    **{**kwargs, **scenario})
+                for name, scenario in self.scenarios.items()
+            }
+
+        emissions = {}
+        for name, emissions_for_scenario in emissions_for_scenarios.items():
+            emissions.update(add_scenario_name_to_keys(name, emissions_for_scenario))
+        return emissions
+
+    def call_batch_function_of_strategy(
+            self, strategy, traffic_and_link_data, vehicle_dict, pollutants, **kwargs):
+
+        batch_function = getattr(strategy, "calculate_emissions_batch", None)
+        if batch_function is None:
+            raise NotImplementedError(f"{type(strategy).__name__} does not support batch calculation.")
+
+        return batch_function(traffic_and_link_data, vehicle_dict, pollutants, **kwargs)
+
+    def initialize_if_necessary(self, **kwargs):
+
+        if self.scenarios is None:
+            self.strategy_class = dynamic_import_from(kwargs["strategy"])
+            self.scenarios = get_scenarios(kwargs["scenarios"])
+            self.strategies_for_scenarios = {name: self.strategy_class() for name in self.scenarios}
+            if callable(getattr(self.strategy_class, "calculate_emissions_batch_for_scenarios", None)):
+                self.strategy = self.strategy_class()
+
+
+def get_scenarios(scenario_grid: Dict[str, List[Any]]) -> Dict[str, Dict[str, Any]]:
+    """ Returns the config arguments of each scenario by scenario name. The scenarios are all combinations of the
+    values in `scenario_grid`. The first config argument varies slowest.
+
+    Example: {"temperature": [5, 15], "ltrip": [12]} ->
+        {"temperature_5_ltrip_12": {"temperature": 5, "ltrip": 12},
+         "temperature_15_ltrip_12": {"temperature": 15, "ltrip": 12}}
+    """
+
+    if not isinstance(scenario_grid, dict) or len(scenario_grid) == 0 \
+            or any(not isinstance(values, list) or len(values) == 0 for values in scenario_grid.values()):
+        raise RuntimeError(f"The config argument 'scenarios' must map config arguments to non-empty lists of values. "
+                           f"Got: {scenario_grid}")
+
+    scenarios = {}
+    for values in itertools.product(*scenario_grid.values()):
+        scenario = dict(zip(scenario_grid.keys(), values))
+        scenarios["_".join(f"{key}_{value}" for key, value in scenario.items())] = scenario
+    return scenarios
+
+
+def drop_scenario_grid(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """ The Strategy gets the config arguments of the scenario instead of the config argument 'scenarios'. """
+
+    return {key: value for key, value in kwargs.items() if key != "scenarios"}
+
+
+def add_scenario_name_to_keys(name: str, emissions) -> Dict[str, Any]:
+    """ Prefix the names of the emissions of a scenario with the scenario name. A single pd.DataFrame (batch
+    calculation) or a Dict mapping vehicles to emissions (row by row calculation) gets the scenario name. """
+
+    if isinstance(emissions, pd.DataFrame) or not any(isinstance(value, (dict, pd.DataFrame))
+                                                      for value in emissions.values()):
+        return {name: emissions}
+    return add_prefix_to_keys(name, emissions)
@@ -2,28 +2,42 @@ import logging
 import os
 from copy import copy
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Tuple, Union
 
 import pandas as pd
 
+from code.data_loading.yeti_format_files import FILE_EXTENSIONS, write_yeti_format_file
 from code.script_helpers.dynamic_import_from import dynamic_import_from
 
 
-def save_dataframes(output_folder: str, data_dict: Dict[str, pd.DataFrame]) -> Dict[str, str]:
+def save_dataframes(output_folder: str, data_dict: Dict[str, pd.DataFrame], file_format: str = "csv") -> Dict[str, str]:
 
     output_folder = output_folder[:-1] if output_folder[-1] == "/" else output_folder
     if not os.path.exists(output_folder):
         os.mkdir(output_folder)
 
+    file_extension = FILE_EXTENSIONS.get(file_format, f".{file_format}")
     for name, dataframe in data_dict.items():
         file = f"{output_folder}/{name}"
-        if file.endswith(".csv") is False:
-            file = file + ".csv"
-        dataframe.to_csv(file, index=False)
+        if file.endswith(file_extension) is False:
+            file = file + file_extension
+        write_yeti_format_file(dataframe, file, file_format)
         data_dict[name] = file
     return data_dict
 
 
+def get_traffic_data_dict(
+        traffic_data: Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+    """ Return the traffic data for save_dataframes. Factored traffic data (see TrafficDataLoader.load_factored_data)
+    is saved in two files: the traffic data by vehicle category and the vehicle shares.
+    """
+
+    if isinstance(traffic_data, tuple):
+        traffic_data_by_category, vehicle_shares = traffic_data
+        return {"yeti_format_traffic_data": traffic_data_by_category, "yeti_format_vehicle_shares": vehicle_shares}
+    return {"yeti_format_traffic_data": traffic_data}
+
+
 def get_timestamp(short: bool = False) -> str:
     if short is True:
         return datetime.now().strftime('%Hh:%Mmin')
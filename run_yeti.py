@@ -19,20 +19,36 @@ def main():
                         help="Set this flag to print less info messages.",
                         dest="quiet",
                         action="store_true")
+    parser.add_argument("--profile",
+                        help="Set this flag to profile the emission calculation with cProfile. The profile is saved "
+                             "in the output folder.",
+                        dest="profile",
+                        action="store_true")
+    parser.add_argument("--resume",
+                        help="Set this flag to continue an interrupted run with the same config after the last "
+                             "checkpoint of the emission calculation.",
+                        dest="resume",
+                        action="store_true")
 
-    config_file, quiet = parse_args(parser)
+    config_file, quiet, profile, resume = parse_args(parser)
     config_dict = parse_config(config_file)
+    if profile is True:
+        config_dict["profile"] = True
+    if resume is True:
+        config_dict["resume"] = True
     set_logging_level(quiet)
 
     Model().run(config_dict, config_file)
 
 
-def parse_args(parser: argparse.ArgumentParser) -> Tuple[str, bool]:
+def parse_args(parser: argparse.ArgumentParser) -> Tuple[str, bool, bool, bool]:
 
     args = parser.parse_args()
     config_file = args.config_file
     quiet = args.quiet
-    return config_file, quiet
+    profile = args.profile
+    resume = args.resume
+    return config_file, quiet, profile, resume
 
 
 def set_logging_level(quiet: bool):
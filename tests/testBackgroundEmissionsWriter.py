@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+import threading
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.StrategyInvoker import StrategyInvoker
+from code.output_writing.BackgroundEmissionsWriter import BackgroundEmissionsWriter
+from code.output_writing.EmissionsWriter import CsvEmissionsWriter
+from tests.testStrategyInvoker import BatchStrategy
+
+
+class BlockingWriter(CsvEmissionsWriter):
+
+    def __init__(self):
+
+        super().__init__()
+        self.may_write = threading.Event()
+        self.n_written = 0
+
+    def write(self, data, file):
+
+        self.may_write.wait()
+        self.n_written += 1
+
+
+class FailingWriter(CsvEmissionsWriter):
+
+    def __init__(self):
+
+        super().__init__()
+        self.is_closed = False
+
+    def write(self, data, file):
+
+        raise OSError("Disk full.")
+
+    def close(self):
+
+        self.is_closed = True
+
+
+class TestBackgroundEmissionsWriter(TestCase):
+
+    def setUp(self) -> None:
+
+        self.output_folder = tempfile.mkdtemp()
+        self.data = pd.DataFrame({"LinkID": ["a", "b"], "vehA": [1.0, 2.0]})
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def test_write(self):
+
+        writer = BackgroundEmissionsWriter(CsvEmissionsWriter())
+        for _ in range(5):
+            writer.write(self.data, f"{self.output_folder}/emissions.csv")
+        writer.close()
+
+        actual = pd.read_csv(f"{self.output_folder}/emissions.csv")
+        pd.testing.assert_frame_equal(pd.concat([self.data] * 5, ignore_index=True), actual)
+        self.assertEqual("csv", writer.file_extension)
+
+    def test_write_blocks_if_queue_is_full(self):
+
+        blocking_writer = BlockingWriter()
+        writer = BackgroundEmissionsWriter(blocking_writer, queue_size=1)
+        producer = threading.Thread(target=lambda: [writer.write(self.data, "file") for _ in range(4)])
+        producer.start()
+
+        producer.join(timeout=0.2)
+        self.assertTrue(producer.is_alive())
+        self.assertLessEqual(writer.queue.qsize(), 1)
+
+        blocking_writer.may_write.set()
+        producer.join()
+        writer.close()
+        self.assertEqual(4, blocking_writer.n_written)
+
+    def test_error_is_raised_and_wrapped_writer_is_closed(self):
+
+        failing_writer = FailingWriter()
+        writer = BackgroundEmissionsWriter(failing_writer, queue_size=1)
+        writer.write(self.data, "file")
+
+        with self.assertRaises(RuntimeError) as context:
+            writer.close()
+
+        self.assertIsInstance(context.exception.__cause__, OSError)
+        self.assertTrue(failing_writer.is_closed)
+        self.assertRaises(RuntimeError, writer.write, self.data, "file")
+
+    def test_strategy_invoker_with_background_writer(self):
+
+        kwargs = {
+            "save_interval_in_rows": 2,
+            "Strategy": BatchStrategy,
+            "pollutants": ["PollutantType.NOx"],
+            "link_data": pd.DataFrame({"LinkID": ["link_a", "link_b"], "Length": [0.1, 0.5]}),
+            "traffic_data": pd.DataFrame({
+                "LinkID": ["link_a", "link_a", "link_b", "link_b", "link_b"],
+                "Dir": ["Dir.L", "Dir.R", "Dir.L", "Dir.R", "Dir.L"],
+                "DayType": ["DayType.SUN"] * 5,
+                "Hour": [0, 0, 0, 0, 1],
+                "vehA": [1.0, 2.0, 3.0, 4.0, 5.0]
+            }),
+            "vehicle_data": pd.DataFrame({"VehicleName": ["vehA"], "VehicleCategory": ["VehicleCategory.PC"]})
+        }
+        StrategyInvoker().calculate_and_save_emissions(f"{self.output_folder}/foreground", **kwargs)
+        StrategyInvoker().calculate_and_save_emissions(
+            f"{self.output_folder}/background", write_in_background=True, write_queue_size=1, **kwargs)
+
+        with open(f"{self.output_folder}/foreground/PollutantType.NOx_emissions.csv") as fp:
+            expected = fp.read()
+        with open(f"{self.output_folder}/background/PollutantType.NOx_emissions.csv") as fp:
+            actual = fp.read()
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+
+from benchmarks.benchmark_suite import compare_results
+from benchmarks.synthetic_data import generate_berlin_format_data, get_config
+from code.strategy_helpers.validation_helpers import validate_dataset
+
+
+class TestBenchmarks(TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_synthetic_data_matches_column_names(self):
+
+        files = generate_berlin_format_data(self.folder, links=10, hours=3, fleet_size=20, pollutants=["NOx", "CO"])
+
+        for name, shorthand in [("link_data", "SHAPE"), ("link_data_with_speed", "SHAPE"),
+                                ("fleet_composition", "FLEET_COMP"), ("traffic_data", "TRAFFIC_COUNT"),
+                                ("los_speeds", "LOS_SPEED"), ("vehicle_mapping", "MAP"),
+                                ("copert_emission_factors", "EF"), ("hbefa_emission_factors", "HBEFA_EF")]:
+            self.assertTrue(validate_dataset(files[name], shorthand), name)
+
+        self.assertEqual(10 * 2 * 4 * 3, len(pd.read_csv(files["traffic_data"])))
+        self.assertEqual(10 * 2 * 4 * 3, len(pd.read_csv(files["cold_starts"])))
+        fleet_comp_data = pd.read_csv(files["fleet_composition"])
+        self.assertEqual(20, len(fleet_comp_data))
+        for share in fleet_comp_data.groupby("VehCat")["VehPercOfCat"].sum():
+            self.assertAlmostEqual(1, share)
+
+    def test_synthetic_data_has_euro1_vehicle_for_each_segment(self):
+
+        files = generate_berlin_format_data(self.folder, links=1, hours=1, fleet_size=100, pollutants=["NOx"])
+
+        vehicle_mapping = pd.read_csv(files["vehicle_mapping"])
+        self.assertFalse(vehicle_mapping.drop(columns="VehName").duplicated().any())
+        petrol_vehicles = vehicle_mapping[
+            vehicle_mapping["VehCat"].isin(["Passenger Cars", "Light Commercial Vehicles"])
+            & (vehicle_mapping["Fuel"] == "Petrol")]
+        for (_, segment), vehicles in petrol_vehicles.groupby(["VehCat", "VehSegment"]):
+            self.assertEqual(1, (vehicles["EuroStandard"] == "Euro 1").sum(), segment)
+
+    def test_get_config(self):
+
+        files = generate_berlin_format_data(self.folder, links=1, hours=1, fleet_size=7, pollutants=["NOx", "NH3"])
+
+        config = get_config("CopertStrategy", files, ["NOx", "NH3"])
+        self.assertEqual(["PollutantType.NOx"], config["pollutants"])
+        self.assertEqual(files["copert_emission_factors"], config["berlin_format_emission_factors"])
+        self.assertIsNone(get_config("CopertStrategy", files, ["NH3"]))
+        self.assertEqual(["PollutantType.PM_Non_Exhaust"], get_config("PMNonExhaustStrategy", files)["pollutants"])
+
+    def test_compare_results(self):
+
+        baseline = {"Strategy": {"loading": {"rows_per_s": 100, "peak_rss_mb": 100},
+                                 "emission_calculation": {"rows_per_s": 100, "peak_rss_mb": 100},
+                                 "total": {"rows_per_s": 100, "peak_rss_mb": None}}}
+        results = {"Strategy": {"loading": {"rows_per_s": 80, "peak_rss_mb": 100},
+                                "emission_calculation": {"rows_per_s": 120, "peak_rss_mb": 105},
+                                "total": {"rows_per_s": 95, "peak_rss_mb": 150}},
+                   "OtherStrategy": {"total": {"rows_per_s": 10, "peak_rss_mb": 10}}}
+
+        text, regressions = compare_results(baseline, results, tolerance=0.1)
+
+        self.assertEqual(["Strategy.loading"], regressions)
+        self.assertIn("-20.0%", text)
+        self.assertNotIn("OtherStrategy", text)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
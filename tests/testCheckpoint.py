@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.StrategyInvoker import StrategyInvoker
+from code.output_writing.Checkpoint import CHECKPOINT_FILE, Checkpoint
+from tests.testStrategyInvoker import BatchStrategy, RowStrategy
+
+
+class Interruption(BaseException):
+    """ Not caught by the StrategyInvoker, like a KeyboardInterrupt. """
+
+
+def get_interrupted_strategy(strategy_class, n_calls_before_interruption):
+
+    class InterruptedStrategy(strategy_class):
+
+        n_calls = 0
+
+        def calculate_emissions(self, *args, **kwargs):
+
+            self.interrupt_if_it_is_time()
+            return super().calculate_emissions(*args, **kwargs)
+
+        def calculate_emissions_batch(self, *args, **kwargs):
+
+            self.interrupt_if_it_is_time()
+            return super().calculate_emissions_batch(*args, **kwargs)
+
+        def interrupt_if_it_is_time(self):
+
+            InterruptedStrategy.n_calls += 1
+            if InterruptedStrategy.n_calls > n_calls_before_interruption:
+                raise Interruption()
+
+    if not hasattr(strategy_class, "calculate_emissions_batch"):
+        del InterruptedStrategy.calculate_emissions_batch
+    return InterruptedStrategy
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self) -> None:
+
+        self.output_folder = tempfile.mkdtemp()
+        self.link_data = pd.DataFrame({
+            "LinkID": ["link_a", "link_b", "link_c"],
+            "Length": [0.1, 0.5, 1.0]
+        })
+        self.traffic_data = pd.DataFrame({
+            "LinkID": ["link_a"] * 4 + ["link_b"] * 4 + ["link_c"] * 4,
+            "Dir": ["Dir.L", "Dir.R"] * 6,
+            "DayType": ["DayType.SUN"] * 12,
+            "Hour": [0, 0, 1, 1] * 3,
+            "vehA": [float(i) for i in range(12)],
+            "vehB": [float(10 * i) for i in range(12)]
+        })
+        self.vehicle_data = pd.DataFrame({
+            "VehicleName": ["vehA", "vehB"],
+            "VehicleCategory": ["VehicleCategory.PC", "VehicleCategory.LCV"]
+        })
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def run_invoker(self, strategy_class, output_folder, traffic_data=None, **kwargs):
+
+        invoker = StrategyInvoker()
+        invoker.calculate_and_save_emissions(
+            emissions_output_folder=output_folder,
+            save_interval_in_rows=3,
+            Strategy=strategy_class,
+            pollutants=["PollutantType.NOx", "PollutantType.CO"],
+            link_data=self.link_data,
+            traffic_data=traffic_data if traffic_data is not None else self.traffic_data,
+            vehicle_data=self.vehicle_data,
+            checkpoint_interval_in_seconds=0,
+            **kwargs
+        )
+        return invoker
+
+    def read_output(self, output_folder):
+
+        return {
+            poll: pd.read_csv(f"{output_folder}/{poll}_emissions.csv")
+            for poll in ["PollutantType.NOx", "PollutantType.CO"]
+        }
+
+    def assert_interrupted_and_resumed_run_has_same_output_as_run_without_interruption(
+            self, strategy_class, n_calls_before_interruption, get_traffic_data=lambda data: data, **kwargs):
+
+        self.run_invoker(RowStrategy, f"{self.output_folder}/expected")
+        folder = f"{self.output_folder}/{strategy_class.__name__}_{n_calls_before_interruption}"
+
+        self.assertRaises(Interruption, self.run_invoker,
+                          get_interrupted_strategy(strategy_class, n_calls_before_interruption), folder,
+                          get_traffic_data(self.traffic_data), **kwargs)
+        with open(f"{folder}/PollutantType.NOx_emissions.csv", "a") as fp:
+            fp.write("link_c,DayType.SUN,Dir.")  # a row that was written after the last checkpoint
+        invoker = self.run_invoker(strategy_class, folder, get_traffic_data(self.traffic_data), resume=True, **kwargs)
+
+        self.assertGreater(invoker.metrics.get_rows("compute"), 0)
+        self.assertLess(invoker.metrics.get_rows("compute"), len(self.traffic_data))
+        expected = self.read_output(f"{self.output_folder}/expected")
+        actual = self.read_output(folder)
+        for poll in expected:
+            pd.testing.assert_frame_equal(expected[poll], actual[poll])
+
+    def test_resume_row_by_row(self):
+
+        for n_calls_before_interruption in [2, 4, 7]:
+            self.assert_interrupted_and_resumed_run_has_same_output_as_run_without_interruption(
+                RowStrategy, n_calls_before_interruption)
+
+    def test_resume_in_batches(self):
+
+        for n_calls_before_interruption in [1, 2]:
+            self.assert_interrupted_and_resumed_run_has_same_output_as_run_without_interruption(
+                BatchStrategy, n_calls_before_interruption)
+
+    def test_resume_with_traffic_data_in_chunks(self):
+
+        def get_chunks(data):
+            return iter([data.iloc[:5], data.iloc[5:6], data.iloc[6:]])
+
+        for strategy_class, n_calls_before_interruption in [(RowStrategy, 7), (BatchStrategy, 2)]:
+            self.assert_interrupted_and_resumed_run_has_same_output_as_run_without_interruption(
+                strategy_class, n_calls_before_interruption, get_chunks)
+
+    def test_resume_with_writing_in_background(self):
+
+        self.assert_interrupted_and_resumed_run_has_same_output_as_run_without_interruption(
+            BatchStrategy, 2, write_in_background=True)
+
+    def test_resume_without_checkpoint_starts_from_the_beginning(self):
+
+        invoker = self.run_invoker(BatchStrategy, f"{self.output_folder}/new", resume=True)
+
+        self.assertEqual(12, invoker.metrics.get_rows("compute"))
+
+    def test_resume_finished_run_calculates_nothing(self):
+
+        self.run_invoker(BatchStrategy, f"{self.output_folder}/finished")
+        with open(f"{self.output_folder}/finished/{CHECKPOINT_FILE}") as fp:
+            checkpoint = json.load(fp)
+        self.assertEqual(12, checkpoint["rows_done"])
+        self.assertTrue(checkpoint["finished"])
+
+        invoker = self.run_invoker(BatchStrategy, f"{self.output_folder}/finished", resume=True)
+
+        self.assertEqual(0, invoker.metrics.get_rows("compute"))
+        self.assertEqual(12, len(self.read_output(f"{self.output_folder}/finished")["PollutantType.NOx"]))
+
+    def test_resume_with_other_config_raises_error(self):
+
+        self.run_invoker(BatchStrategy, f"{self.output_folder}/config")
+
+        self.assertRaises(RuntimeError, self.run_invoker, BatchStrategy, f"{self.output_folder}/config",
+                          resume=True, links_to_use=["link_a"])
+
+    def test_resume_with_parquet_output_raises_error(self):
+
+        self.assertRaises(RuntimeError, self.run_invoker, BatchStrategy, f"{self.output_folder}/parquet",
+                          resume=True, output_format="parquet")
+
+    def test_checkpoint_paths_are_relative_to_output_folder(self):
+
+        checkpoint = Checkpoint(self.output_folder, {"pollutants": ["PollutantType.NOx"]})
+        checkpoint.save(10, {f"{self.output_folder}/emissions.csv": 100})
+
+        with open(f"{self.output_folder}/{CHECKPOINT_FILE}") as fp:
+            self.assertEqual({"emissions.csv": 100}, json.load(fp)["file_sizes"])
+        self.assertEqual({os.path.join(self.output_folder, "emissions.csv"): 100}, checkpoint.load()["file_sizes"])
+        self.assertFalse(os.path.isfile(f"{self.output_folder}/{CHECKPOINT_FILE}.tmp"))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
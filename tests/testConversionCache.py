@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.script_helpers.ConversionCache import ConversionCache
+from code.strategy_helpers.helpers import save_dataframes
+
+
+class TestConversionCache(TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.mkdtemp()
+        self.berlin_format_file = f"{self.folder}/berlin_format_link_data.csv"
+        pd.DataFrame({"LinkID": ["1", "2"], "Length": [10, 20]}).to_csv(self.berlin_format_file, index=False)
+        self.config = {
+            "berlin_format_link_data": self.berlin_format_file,
+            "use_nh3_tier2_ef": False,
+            "output_folder": f"{self.folder}/output"
+        }
+        self.n_conversions = 0
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.folder)
+
+    def load_berlin_format_data(self, **kwargs):
+
+        self.n_conversions += 1
+        link_data = pd.read_csv(kwargs["berlin_format_link_data"])
+        file_locations = save_dataframes(kwargs["output_folder_for_yeti_format_data"],
+                                         {"yeti_format_link_data": link_data},
+                                         file_format=kwargs["yeti_format_file_format"])
+        file_locations["yeti_format_unchanged_data"] = kwargs["berlin_format_link_data"]
+        return file_locations
+
+    def test_second_run_with_same_input_uses_cache(self):
+
+        cache_folder = f"{self.folder}/cache"
+
+        first = ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+        second = ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+
+        self.assertEqual(1, self.n_conversions)
+        self.assertEqual(first, second)
+        self.assertTrue(second["yeti_format_link_data"].endswith(".parquet"))
+        self.assertTrue(os.path.isfile(second["yeti_format_link_data"]))
+        self.assertEqual(self.berlin_format_file, second["yeti_format_unchanged_data"])
+        self.assertEqual([ConversionCache(cache_folder, self.config).key], os.listdir(cache_folder))
+
+    def test_changed_input_is_converted_again(self):
+
+        cache_folder = f"{self.folder}/cache"
+        ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+
+        ConversionCache(cache_folder, {**self.config, "use_nh3_tier2_ef": True}).load_or_convert(
+            self.load_berlin_format_data)
+        pd.DataFrame({"LinkID": ["1", "2"], "Length": [10, 30]}).to_csv(self.berlin_format_file, index=False)
+        ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+
+        self.assertEqual(3, self.n_conversions)
+        self.assertEqual(3, len(os.listdir(cache_folder)))
+
+    def test_changed_input_of_composed_strategy_is_converted_again(self):
+
+        cache_folder = f"{self.folder}/cache"
+        hot_ef_file = f"{self.folder}/hot_berlin_format_emission_factors.csv"
+        pd.DataFrame({"VehName": ["a"], "Alpha": [1.0]}).to_csv(hot_ef_file, index=False)
+        config = {**self.config, "hot_berlin_format_emission_factors": hot_ef_file, "only_hot": False}
+        ConversionCache(cache_folder, config).load_or_convert(self.load_berlin_format_data)
+
+        pd.DataFrame({"VehName": ["a"], "Alpha": [2.0]}).to_csv(hot_ef_file, index=False)
+        ConversionCache(cache_folder, config).load_or_convert(self.load_berlin_format_data)
+        ConversionCache(cache_folder, {**config, "only_hot": True}).load_or_convert(self.load_berlin_format_data)
+
+        self.assertEqual(3, self.n_conversions)
+        self.assertEqual(3, len(os.listdir(cache_folder)))
+
+    def test_runtime_config_arguments_are_not_part_of_the_key(self):
+
+        key = ConversionCache(f"{self.folder}/cache", self.config).key
+        config = {**self.config, "output_folder": f"{self.folder}/other_output", "workers": 4, "output_format": "parquet"}
+
+        self.assertEqual(key, ConversionCache(f"{self.folder}/cache", config).key)
+
+    def test_incomplete_entry_is_converted_again(self):
+
+        cache_folder = f"{self.folder}/cache"
+        locations = ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+        os.remove(locations["yeti_format_link_data"])
+
+        locations = ConversionCache(cache_folder, self.config).load_or_convert(self.load_berlin_format_data)
+
+        self.assertEqual(2, self.n_conversions)
+        self.assertTrue(os.path.isfile(locations["yeti_format_link_data"]))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+from unittest import TestCase, main
+
+from code.strategy_helpers.EfCache import EfCache
+
+
+class TestEfCache(TestCase):
+
+    def test_get_and_put(self):
+
+        cache = EfCache(max_size=10)
+
+        self.assertIsNone(cache.get(("vehA", "PollutantType.NOx", 50.0)))
+        cache.put(("vehA", "PollutantType.NOx", 50.0), 0.5)
+        self.assertEqual(0.5, cache.get(("vehA", "PollutantType.NOx", 50.0)))
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(0.5, cache.hit_rate())
+
+    def test_least_recently_used_ef_is_removed_if_cache_is_full(self):
+
+        cache = EfCache(max_size=2)
+        cache.put("a", 1.0)
+        cache.put("b", 2.0)
+        cache.get("a")
+        cache.put("c", 3.0)
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1.0, cache.get("a"))
+        self.assertEqual(3.0, cache.get("c"))
+
+    def test_max_size_zero_disables_caching(self):
+
+        cache = EfCache(max_size=0)
+        cache.put("a", 1.0)
+
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+from code.StrategyInvoker import StrategyInvoker
+from code.output_writing.EmissionsWriter import CsvEmissionsWriter, FeatherEmissionsWriter, ParquetEmissionsWriter, \
+    get_emissions_writer
+from tests.testStrategyInvoker import BatchStrategy, RowStrategy
+
+
+class TestEmissionsWriter(TestCase):
+
+    def setUp(self) -> None:
+
+        self.output_folder = tempfile.mkdtemp()
+        self.block_1 = pd.DataFrame({
+            "LinkID": ["link_a", "link_a"],
+            "DayType": ["DayType.SUN", "DayType.SUN"],
+            "Dir": ["Dir.L", "Dir.R"],
+            "Hour": [0, 0],
+            "vehA": [1.5, 2.5],
+            "vehB": [10.0, 20.0]
+        })
+        self.block_2 = pd.DataFrame({
+            "LinkID": ["link_b", "link_a"],
+            "DayType": ["DayType.SUN", "DayType.SAT"],
+            "Dir": ["Dir.L", "Dir.L"],
+            "Hour": [1, 2],
+            "vehA": [3.5, 4.5],
+            "vehB": [30.0, 40.0]
+        })
+        self.expected = pd.concat([self.block_1, self.block_2], ignore_index=True)
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def write_blocks(self, writer, file):
+
+        writer.write(self.block_1, file)
+        writer.write(self.block_2, file)
+        writer.close()
+
+    def assert_frame_equal_to_expected(self, actual):
+
+        actual = actual.astype({col: str for col in ["LinkID", "DayType", "Dir"]})
+        pd.testing.assert_frame_equal(self.expected, actual, check_dtype=False)
+
+    def test_get_emissions_writer(self):
+
+        self.assertIsInstance(get_emissions_writer(), CsvEmissionsWriter)
+        self.assertIsInstance(get_emissions_writer("parquet"), ParquetEmissionsWriter)
+        self.assertIsInstance(get_emissions_writer("feather"), FeatherEmissionsWriter)
+        self.assertRaises(RuntimeError, get_emissions_writer, "xlsx")
+
+    def test_csv(self):
+
+        self.write_blocks(CsvEmissionsWriter(), f"{self.output_folder}/emissions.csv")
+
+        self.assert_frame_equal_to_expected(pd.read_csv(f"{self.output_folder}/emissions.csv"))
+
+    def test_parquet(self):
+
+        file = f"{self.output_folder}/emissions.parquet"
+        self.write_blocks(ParquetEmissionsWriter(), file)
+
+        self.assert_frame_equal_to_expected(pd.read_parquet(file))
+        parquet_file = pa.parquet.ParquetFile(file)
+        self.assertEqual(2, parquet_file.num_row_groups)
+        schema = parquet_file.schema_arrow
+        self.assertEqual(pa.float32(), schema.field("vehA").type)
+        self.assertTrue(pa.types.is_dictionary(schema.field("LinkID").type))
+        self.assertTrue(pa.types.is_dictionary(schema.field("DayType").type))
+        self.assertTrue(pa.types.is_dictionary(schema.field("Dir").type))
+
+    def test_feather(self):
+
+        file = f"{self.output_folder}/emissions.feather"
+        self.write_blocks(FeatherEmissionsWriter(), file)
+
+        self.assert_frame_equal_to_expected(pd.read_feather(file))
+        with pa.ipc.open_file(file) as reader:
+            self.assertEqual(2, reader.num_record_batches)
+            self.assertEqual(pa.float32(), reader.schema.field("vehB").type)
+            self.assertTrue(pa.types.is_dictionary(reader.schema.field("LinkID").type))
+
+    def test_concatenate_files(self):
+
+        for writer_class in [CsvEmissionsWriter, ParquetEmissionsWriter, FeatherEmissionsWriter]:
+            ext = writer_class.file_extension
+            writer = writer_class()
+            writer.write(self.block_1, f"{self.output_folder}/1.{ext}")
+            writer.write(self.block_2, f"{self.output_folder}/2.{ext}")
+            writer.close()
+
+            writer.concatenate_files(
+                [f"{self.output_folder}/1.{ext}", f"{self.output_folder}/2.{ext}"], f"{self.output_folder}/all.{ext}")
+
+            actual = {
+                "csv": pd.read_csv, "parquet": pd.read_parquet, "feather": pd.read_feather
+            }[ext](f"{self.output_folder}/all.{ext}")
+            self.assert_frame_equal_to_expected(actual)
+
+    def test_strategy_invoker_writes_one_parquet_file_per_pollutant(self):
+
+        traffic_data = pd.DataFrame({
+            "LinkID": ["link_a", "link_a", "link_b"],
+            "Dir": ["Dir.L", "Dir.R", "Dir.L"],
+            "DayType": ["DayType.SUN"] * 3,
+            "Hour": [0, 0, 1],
+            "vehA": [1.0, 2.0, 3.0]
+        })
+        for strategy in [RowStrategy, BatchStrategy]:
+            StrategyInvoker().calculate_and_save_emissions(
+                emissions_output_folder=f"{self.output_folder}/{strategy.__name__}",
+                save_interval_in_rows=2,
+                output_format="parquet",
+                Strategy=strategy,
+                pollutants=["PollutantType.NOx", "PollutantType.CO"],
+                link_data=pd.DataFrame({"LinkID": ["link_a", "link_b"], "Length": [0.1, 0.5]}),
+                traffic_data=traffic_data,
+                vehicle_data=pd.DataFrame({"VehicleName": ["vehA"], "VehicleCategory": ["VehicleCategory.PC"]})
+            )
+
+            co = pd.read_parquet(f"{self.output_folder}/{strategy.__name__}/PollutantType.CO_emissions.parquet")
+            self.assertEqual(["link_a", "link_a", "link_b"], list(co["LinkID"].astype(str)))
+            self.assertEqual(pa.float32(), pa.parquet.read_schema(
+                f"{self.output_folder}/{strategy.__name__}/PollutantType.NOx_emissions.parquet").field("vehA").type)
+
+
+if __name__ == '__main__':
+    main()
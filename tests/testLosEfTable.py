@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import pandas as pd
+
+from code.strategy_helpers.LosEfTable import LosEfTable, get_fingerprint, load_or_build_los_ef_table
+
+
+class TestLosEfTable(TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.mkdtemp()
+        efs = np.arange(2 * 1 * 2 * 4, dtype=float).reshape((2, 1, 2, 4))
+        missing = np.array([[[False, False]], [[False, True]]])
+        self.table = LosEfTable(["link_a", "link_b"], ["vehA"], ["PollutantType.NOx", "PollutantType.CO"],
+                                efs, missing)
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.folder)
+
+    def test_get_los_weighted_efs(self):
+
+        indices = self.table.get_indices(pd.Series(["link_b", "link_a", "link_b"]))
+        los_percentages = np.array([[1, 0, 0, 0], [0.5, 0.5, 0, 0], [0, 0, 0, 1]])
+
+        actual = self.table.get_los_weighted_efs(indices, 0, los_percentages)
+
+        np.testing.assert_array_equal(np.array([[8.0], [0.5], [11.0]]), actual)
+
+    def test_unknown_keys_and_missing_efs_raise_key_error(self):
+
+        self.assertRaises(KeyError, self.table.get_indices, pd.Series(["link_a", "link_x"]))
+        self.assertRaises(KeyError, self.table.get_los_weighted_efs, np.array([1]), 1, np.ones((1, 4)))
+
+    def test_table_is_only_built_once_for_the_same_fingerprint(self):
+
+        file = f"{self.folder}/los_ef_table"
+        n_builds = []
+
+        def build():
+            n_builds.append(1)
+            return self.table
+
+        load_or_build_los_ef_table(file, "fingerprint_a", build)
+        loaded = load_or_build_los_ef_table(file, "fingerprint_a", build)
+        load_or_build_los_ef_table(file, "fingerprint_b", build)
+
+        self.assertTrue(os.path.isfile(file))
+        self.assertEqual(2, len(n_builds))
+        self.assertEqual(["link_a", "link_b"], list(loaded.keys))
+        np.testing.assert_array_equal(self.table.efs, loaded.efs)
+        np.testing.assert_array_equal(self.table.missing, loaded.missing)
+
+    def test_get_fingerprint(self):
+
+        data = pd.DataFrame({"a": [1, 2]})
+
+        self.assertEqual(get_fingerprint("x", data), get_fingerprint("x", data.copy()))
+        self.assertNotEqual(get_fingerprint("x", data), get_fingerprint("x", data.assign(a=[1, 3])))
+        self.assertNotEqual(get_fingerprint("x", data), get_fingerprint("y", data))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.ParallelStrategyInvoker import ParallelStrategyInvoker
+from code.StrategyInvoker import StrategyInvoker
+from code.copert_hot_strategy.CopertHotStrategy import CopertHotStrategy
+from code.data_loading.yeti_format_files import read_yeti_format_file, write_yeti_format_file
+
+
+class TestParallelStrategyInvoker(TestCase):
+
+    def setUp(self) -> None:
+
+        if os.path.isfile("./tests/test_data/yeti_format_data/emission_factor_data.csv"):
+            self.init_path = "./tests"
+        else:
+            self.init_path = "."
+
+        self.output_folder = tempfile.mkdtemp()
+        self.kwargs = {
+            "Strategy": CopertHotStrategy,
+            "pollutants": ["PollutantType.NOx"],
+            "link_data": pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/link_data.csv"),
+            "traffic_data": pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/traffic_data.csv"),
+            "vehicle_data": pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/vehicle_data.csv"),
+            "emission_factor_data": pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/emission_factor_data.csv"),
+            "los_speeds_data": pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/los_speeds_data.csv")
+        }
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def test_split_into_shards(self):
+
+        link_data = pd.DataFrame({"LinkID": ["a", "b", "c", "d"], "Area": [1, 1, 2, 3]})
+        traffic_data = pd.DataFrame({"LinkID": ["a", "a", "b", "b", "c", "c", "d", "d", "x"]})
+
+        shards = ParallelStrategyInvoker(workers=2).split_into_shards(link_data, traffic_data)
+
+        self.assertEqual([["a", "b"], ["c", "d"]], [list(links["LinkID"]) for links, _ in shards])
+        self.assertEqual([["a", "a", "b", "b"], ["c", "c", "d", "d"]],
+                         [list(traffic["LinkID"]) for _, traffic in shards])
+
+    def test_split_into_shards_by_other_column(self):
+
+        link_data = pd.DataFrame({"LinkID": ["a", "b", "c", "d"], "Area": [1, 2, 1, 1]})
+        traffic_data = pd.DataFrame({"LinkID": ["a", "b", "c", "d"]})
+
+        shards = ParallelStrategyInvoker(workers=4, partition_by="Area").split_into_shards(link_data, traffic_data)
+
+        self.assertEqual([["a", "c", "d"], ["b"]], [list(links["LinkID"]) for links, _ in shards])
+
+    def test_split_into_shards_with_missing_partition_value(self):
+
+        link_data = pd.DataFrame({"LinkID": ["a", "b", "c", "d"], "RoadType": ["x", None, "y", "z"]})
+        traffic_data = pd.DataFrame({"LinkID": ["a", "b", "c", "d"]})
+
+        shards = ParallelStrategyInvoker(workers=2, partition_by="RoadType").split_into_shards(link_data, traffic_data)
+
+        self.assertEqual([["a", "b"], ["c", "d"]], [list(links["LinkID"]) for links, _ in shards])
+        self.assertEqual([["a", "b"], ["c", "d"]], [list(traffic["LinkID"]) for _, traffic in shards])
+
+    def test_output_is_identical_to_output_of_single_process(self):
+
+        StrategyInvoker().calculate_and_save_emissions(f"{self.output_folder}/single", **self.kwargs)
+        ParallelStrategyInvoker(workers=2).calculate_and_save_emissions(f"{self.output_folder}/parallel", **self.kwargs)
+
+        self.assertEqual(["PollutantType.NOx_emissions.csv"], os.listdir(f"{self.output_folder}/parallel"))
+        with open(f"{self.output_folder}/single/PollutantType.NOx_emissions.csv") as fp:
+            expected = fp.read()
+        with open(f"{self.output_folder}/parallel/PollutantType.NOx_emissions.csv") as fp:
+            actual = fp.read()
+        self.assertEqual(expected, actual)
+
+    def test_parquet_output_is_identical_to_output_of_single_process(self):
+
+        kwargs = {**self.kwargs, "output_format": "parquet"}
+        StrategyInvoker().calculate_and_save_emissions(f"{self.output_folder}/single", **kwargs)
+        ParallelStrategyInvoker(workers=2).calculate_and_save_emissions(f"{self.output_folder}/parallel", **kwargs)
+
+        self.assertEqual(["PollutantType.NOx_emissions.parquet"], os.listdir(f"{self.output_folder}/parallel"))
+        expected = pd.read_parquet(f"{self.output_folder}/single/PollutantType.NOx_emissions.parquet")
+        actual = pd.read_parquet(f"{self.output_folder}/parallel/PollutantType.NOx_emissions.parquet")
+        pd.testing.assert_frame_equal(expected.astype({"LinkID": str}), actual.astype({"LinkID": str}))
+
+
+    def test_memmap_traffic_data_in_chunks_is_split_into_shards(self):
+
+        traffic_file = f"{self.output_folder}/traffic_data.memmap"
+        write_yeti_format_file(self.kwargs["traffic_data"], traffic_file, "memmap")
+        kwargs = {**self.kwargs, "traffic_data": read_yeti_format_file(traffic_file, dtype={"LinkID": str},
+                                                                        chunksize=2)}
+
+        StrategyInvoker().calculate_and_save_emissions(f"{self.output_folder}/single", **self.kwargs)
+        ParallelStrategyInvoker(workers=2).calculate_and_save_emissions(f"{self.output_folder}/parallel", **kwargs)
+
+        expected = pd.read_csv(f"{self.output_folder}/single/PollutantType.NOx_emissions.csv")
+        actual = pd.read_csv(f"{self.output_folder}/parallel/PollutantType.NOx_emissions.csv")
+        pd.testing.assert_frame_equal(expected, actual)
+
+    def test_csv_traffic_data_in_chunks_raises_error(self):
+
+        kwargs = {**self.kwargs, "traffic_data": iter([self.kwargs["traffic_data"]])}
+
+        self.assertRaises(RuntimeError, ParallelStrategyInvoker(workers=2).calculate_and_save_emissions,
+                          f"{self.output_folder}/parallel", **kwargs)
+
+if __name__ == '__main__':
+    main()
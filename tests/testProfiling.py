@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.StrategyInvoker import StrategyInvoker
+from code.script_helpers.profiling import combine_stats_files, profile, write_profile_report
+
+
+class RowStrategy:
+
+    def calculate_emissions(self, traffic_and_link_data_row, vehicle_dict, pollutants, **kwargs):
+
+        return {"vehA": self.calculate_ef(traffic_and_link_data_row) * traffic_and_link_data_row["vehA"]}
+
+    def calculate_ef(self, traffic_and_link_data_row):
+
+        return traffic_and_link_data_row["Length"] * 2
+
+
+class TestProfiling(TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.folder)
+
+    def run_invoker(self, output_folder):
+
+        StrategyInvoker().calculate_and_save_emissions(
+            emissions_output_folder=output_folder,
+            Strategy=RowStrategy,
+            pollutants=["PollutantType.NOx"],
+            link_data=pd.DataFrame({"LinkID": ["link_a"], "Length": [0.1]}),
+            traffic_data=pd.DataFrame({"LinkID": ["link_a"] * 3, "Dir": ["Dir.L"] * 3, "DayType": ["DayType.SUN"] * 3,
+                                       "Hour": [0, 1, 2], "vehA": [1.0, 2.0, 3.0]}),
+            vehicle_data=pd.DataFrame({"VehicleName": ["vehA"], "VehicleCategory": ["VehicleCategory.PC"]})
+        )
+
+    def test_profile_report_contains_methods_of_strategy_and_strategy_invoker(self):
+
+        stats_file = f"{self.folder}/emission_calculation.pstats"
+        with profile(stats_file):
+            self.run_invoker(f"{self.folder}/output")
+
+        write_profile_report(stats_file, f"{self.folder}/report.txt", RowStrategy)
+
+        with open(f"{self.folder}/report.txt") as fp:
+            report = fp.read()
+        breakdown = report[:report.index("Functions with the highest own time")]
+        self.assertIn("testProfiling.calculate_ef", breakdown)
+        self.assertIn("StrategyInvoker.associate_emissions_with_time_and_location_info", breakdown)
+        self.assertNotIn("frame.py", breakdown)  # functions from other packages are not part of the breakdown
+
+    def test_profile_is_not_created_if_not_enabled(self):
+
+        with profile(f"{self.folder}/emission_calculation.pstats", enabled=False):
+            self.run_invoker(f"{self.folder}/output")
+
+        self.assertFalse(os.path.isfile(f"{self.folder}/emission_calculation.pstats"))
+
+    def test_combine_stats_files(self):
+
+        for i in range(2):
+            with profile(f"{self.folder}/shard_{i}.pstats"):
+                self.run_invoker(f"{self.folder}/output_{i}")
+
+        combine_stats_files([f"{self.folder}/shard_0.pstats", f"{self.folder}/shard_1.pstats"],
+                            f"{self.folder}/shard_0.pstats")
+        write_profile_report(f"{self.folder}/shard_0.pstats", f"{self.folder}/report.txt", RowStrategy)
+
+        self.assertFalse(os.path.isfile(f"{self.folder}/shard_1.pstats"))
+        with open(f"{self.folder}/report.txt") as fp:
+            line = next(line for line in fp if line.startswith("testProfiling.calculate_ef "))
+        self.assertEqual("6", line.split()[1])  # 3 rows in each run
+
+
+if __name__ == '__main__':
+    main()
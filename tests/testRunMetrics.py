@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import tempfile
+from time import sleep
+from unittest import TestCase, main
+
+from code.script_helpers.RunMetrics import RunMetrics, write_metrics_file
+
+
+class TestRunMetrics(TestCase):
+
+    def test_measure(self):
+
+        metrics = RunMetrics()
+        with metrics.measure("a", rows=10):
+            sleep(0.01)
+        with metrics.measure("a", rows=5):
+            sleep(0.01)
+
+        stage = metrics.to_dict()["a"]
+        self.assertGreaterEqual(stage["wall_time_s"], 0.02)
+        self.assertEqual(15, stage["rows"])
+        self.assertAlmostEqual(15 / stage["wall_time_s"], stage["rows_per_s"])
+        if stage["peak_rss_mb"] is not None:
+            self.assertGreater(stage["peak_rss_mb"], 0)
+
+    def test_time_of_inner_stages_is_not_counted_for_outer_stage(self):
+
+        metrics = RunMetrics()
+        with metrics.measure("outer"):
+            with metrics.measure("inner"):
+                sleep(0.05)
+
+        self.assertEqual(["outer", "inner"], list(metrics.stages))
+        self.assertGreaterEqual(metrics.stages["inner"]["wall_time_s"], 0.05)
+        self.assertLess(metrics.stages["outer"]["wall_time_s"], 0.05)
+
+    def test_add_metrics(self):
+
+        metrics = RunMetrics()
+        metrics.add("compute", wall_time=1.0, cpu_time=0.5, rows=10, peak_rss_in_mb=100.0)
+        metrics.add_metrics({
+            "compute": {"wall_time_s": 2.0, "cpu_time_s": 1.5, "peak_rss_mb": 50.0, "rows": 20, "rows_per_s": 10.0},
+            "write": {"wall_time_s": 1.0, "cpu_time_s": 1.0, "peak_rss_mb": None, "rows": 0, "rows_per_s": None}
+        })
+
+        self.assertEqual({"wall_time_s": 3.0, "cpu_time_s": 2.0, "peak_rss_mb": 100.0, "rows": 30, "rows_per_s": 10.0},
+                         metrics.to_dict()["compute"])
+        self.assertIsNone(metrics.to_dict()["write"]["rows_per_s"])
+
+    def test_get_text_and_write_metrics_file(self):
+
+        metrics = RunMetrics()
+        metrics.add("loading", wall_time=2.0, cpu_time=1.0, rows=100, peak_rss_in_mb=10.0)
+        with metrics.measure("run_info"):
+            text = metrics.get_text()
+
+        self.assertIn("loading", text)
+        self.assertIn("50.0", text)  # rows per second
+        self.assertIn("run_info (in progress)", text)
+
+        folder = tempfile.mkdtemp()
+        try:
+            write_metrics_file(os.path.join(folder, "run_metrics.json"), {"steps": metrics.to_dict()})
+            with open(os.path.join(folder, "run_metrics.json")) as fp:
+                self.assertEqual(100, json.load(fp)["steps"]["loading"]["rows"])
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List
+from unittest import TestCase, main
+
+import pandas as pd
+import yaml
+
+from code.Model import Model
+from code.StrategyInvoker import StrategyInvoker
+from code.strategy_helpers.ScenarioSweepStrategy import ScenarioSweepStrategy, get_scenarios
+
+
+class FactorStrategy:
+
+    def calculate_emissions(self,
+                            traffic_and_link_data_row: Dict[str, Any],
+                            vehicle_dict: Dict[str, str],
+                            pollutants: List[str],
+                            factor: float,
+                            **kwargs):
+
+        return {
+            pollutant: {veh_name: traffic_and_link_data_row[veh_name] * factor * (i + 1) for veh_name in vehicle_dict}
+            for i, pollutant in enumerate(pollutants)
+        }
+
+
+class FactorBatchStrategy(FactorStrategy):
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  factor: float,
+                                  **kwargs):
+
+        return {
+            pollutant: traffic_and_link_data[list(vehicle_dict)] * factor * (i + 1)
+            for i, pollutant in enumerate(pollutants)
+        }
+
+
+class TestScenarioSweepStrategy(TestCase):
+
+    def setUp(self) -> None:
+
+        self.output_folder = tempfile.mkdtemp()
+        self.kwargs = {
+            "save_interval_in_rows": 2,
+            "pollutants": ["PollutantType.NOx", "PollutantType.CO"],
+            "link_data": pd.DataFrame({"LinkID": ["link_a", "link_b"], "Length": [0.1, 0.5]}),
+            "traffic_data": pd.DataFrame({
+                "LinkID": ["link_a", "link_a", "link_b"],
+                "Dir": ["Dir.L", "Dir.R", "Dir.L"],
+                "DayType": ["DayType.SUN"] * 3,
+                "Hour": [0, 0, 1],
+                "vehA": [1.0, 2.0, 3.0]
+            }),
+            "vehicle_data": pd.DataFrame({"VehicleName": ["vehA"], "VehicleCategory": ["VehicleCategory.PC"]})
+        }
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def test_get_scenarios(self):
+
+        scenarios = get_scenarios({"temperature": [5, 15], "ltrip": [8, 12.5]})
+
+        self.assertEqual(["temperature_5_ltrip_8", "temperature_5_ltrip_12.5",
+                          "temperature_15_ltrip_8", "temperature_15_ltrip_12.5"], list(scenarios))
+        self.assertEqual({"temperature": 15, "ltrip": 8}, scenarios["temperature_15_ltrip_8"])
+
+    def test_get_scenarios_raises_error_for_invalid_grid(self):
+
+        for scenario_grid in [{}, {"temperature": 5}, {"temperature": []}, [5, 15]]:
+            self.assertRaises(RuntimeError, get_scenarios, scenario_grid)
+
+    def test_scenario_outputs_equal_outputs_of_separate_runs(self):
+
+        for strategy_class in [FactorStrategy, FactorBatchStrategy]:
+            folder = f"{self.output_folder}/{strategy_class.__name__}"
+            os.mkdir(folder)
+            StrategyInvoker().calculate_and_save_emissions(
+                f"{folder}/sweep", Strategy=ScenarioSweepStrategy, scenarios={"factor": [2, 3]},
+                strategy=f"tests.testScenarioSweepStrategy.{strategy_class.__name__}", **self.kwargs)
+
+            for factor in [2, 3]:
+                StrategyInvoker().calculate_and_save_emissions(
+                    f"{folder}/factor_{factor}", Strategy=strategy_class, factor=factor, **self.kwargs)
+                for pollutant in self.kwargs["pollutants"]:
+                    pd.testing.assert_frame_equal(
+                        pd.read_csv(f"{folder}/factor_{factor}/{pollutant}_emissions.csv"),
+                        pd.read_csv(f"{folder}/sweep/factor_{factor}_{pollutant}_emissions.csv"))
+
+
+class TestScenarioSweepWithCopertStrategy(TestCase):
+
+    def setUp(self) -> None:
+
+        self.old_dir = os.getcwd()
+        if "tests" not in os.listdir("."):
+            os.chdir("..")
+        self.output_folder = tempfile.mkdtemp()
+
+        with open("example/example_configs/copert_cold_config.yaml") as fp:
+            self.config = yaml.safe_load(fp)
+        self.config["mode"] = "yeti_format"
+        self.config["pollutants"] = ["PollutantType.CO", "PollutantType.NOx"]
+        del self.config["validation_function"]
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+        os.chdir(self.old_dir)
+
+    def run_model(self, name, **config_arguments):
+
+        config = {**self.config, **config_arguments, "output_folder": f"{self.output_folder}/{name}"}
+        config_file = f"{self.output_folder}/{name}.yaml"
+        with open(config_file, "w") as fp:
+            yaml.safe_dump(config, fp)
+        Model().run(config, config_file)
+
+    def test_scenario_outputs_equal_outputs_of_separate_runs(self):
+
+        self.run_model("sweep", scenarios={"temperature": [-5, 25], "ltrip": [8, 12]})
+
+        for temperature in [-5, 25]:
+            for ltrip in [8, 12]:
+                name = f"temperature_{temperature}_ltrip_{ltrip}"
+                self.run_model(name, temperature=temperature, ltrip=ltrip)
+                output_files = [file for file in os.listdir(f"{self.output_folder}/{name}") if "emissions" in file]
+                self.assertEqual(6, len(output_files))
+                for file in output_files:
+                    pd.testing.assert_frame_equal(pd.read_csv(f"{self.output_folder}/{name}/{file}"),
+                                                  pd.read_csv(f"{self.output_folder}/sweep/{name}_{file}"))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -42,6 +42,29 @@ class TestSpeed(TestCase):
         for val in emissions_actual[["pc vehicle_a", "lcv vehicle_b"]].values.flatten():
             self.assertTrue(val >= 0)
 
+    def test_ef_cache_size_from_config(self):
+
+        emission_factor_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/emission_factor_data.csv")
+        vehicle_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/vehicle_data.csv")
+        link_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/link_data_with_speed.csv")
+        traffic_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/traffic_data.csv")
+
+        invoker = StrategyInvoker()
+        invoker.calculate_and_save_emissions(
+            emissions_output_folder="temp",
+            pollutants=["PollutantType.NOx"],
+            Strategy=CopertHotFixedSpeedStrategy,
+            link_data=link_data,
+            traffic_data=traffic_data,
+            vehicle_data=vehicle_data,
+            emission_factor_data=emission_factor_data,
+            ef_cache_size=3,
+            v=50
+        )
+        shutil.rmtree("temp")
+
+        self.assertEqual(3, invoker.strategy.ef_cache.max_size)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+import shutil
+import tempfile
+from typing import Any, Dict, List
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.StrategyInvoker import StrategyInvoker
+
+
+class RowStrategy:
+
+    def calculate_emissions(self,
+                            traffic_and_link_data_row: Dict[str, Any],
+                            vehicle_dict: Dict[str, str],
+                            pollutants: List[str],
+                            **kwargs):
+
+        return {
+            pollutant: {
+                veh_name: traffic_and_link_data_row[veh_name] * traffic_and_link_data_row["Length"] * (i + 1)
+                for veh_name in vehicle_dict
+            }
+            for i, pollutant in enumerate(pollutants)
+        }
+
+
+class BatchStrategy(RowStrategy):
+
+    def __init__(self):
+
+        self.n_batch_calls = 0
+
+    def calculate_emissions_batch(self,
+                                  traffic_and_link_data: pd.DataFrame,
+                                  vehicle_dict: Dict[str, str],
+                                  pollutants: List[str],
+                                  **kwargs):
+
+        self.n_batch_calls += 1
+        vehicles = list(vehicle_dict)
+        return {
+            pollutant: traffic_and_link_data[vehicles].multiply(traffic_and_link_data["Length"], axis=0) * (i + 1)
+            for i, pollutant in enumerate(pollutants)
+        }
+
+
+class NotImplementedBatchStrategy(RowStrategy):
+
+    def calculate_emissions_batch(self, *args, **kwargs):
+
+        raise NotImplementedError()
+
+
+class FailingBatchStrategy(RowStrategy):
+
+    def calculate_emissions_batch(self, *args, **kwargs):
+
+        raise RuntimeError("Something went wrong.")
+
+
+class TestStrategyInvoker(TestCase):
+
+    def setUp(self) -> None:
+
+        self.output_folder = tempfile.mkdtemp()
+        self.link_data = pd.DataFrame({
+            "LinkID": ["link_a", "link_b"],
+            "Length": [0.1, 0.5]
+        })
+        self.traffic_data = pd.DataFrame({
+            "LinkID": ["link_a", "link_a", "link_b", "link_b", "link_b"],
+            "Dir": ["Dir.L", "Dir.R", "Dir.L", "Dir.R", "Dir.L"],
+            "DayType": ["DayType.SUN"] * 5,
+            "Hour": [0, 0, 0, 0, 1],
+            "vehA": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "vehB": [10.0, 20.0, 30.0, 40.0, 50.0]
+        })
+        self.vehicle_data = pd.DataFrame({
+            "VehicleName": ["vehA", "vehB"],
+            "VehicleCategory": ["VehicleCategory.PC", "VehicleCategory.LCV"]
+        })
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.output_folder)
+
+    def run_invoker(self, strategy_class, output_folder, traffic_data=None, **kwargs):
+
+        invoker = StrategyInvoker()
+        invoker.calculate_and_save_emissions(
+            emissions_output_folder=output_folder,
+            save_interval_in_rows=2,
+            Strategy=strategy_class,
+            pollutants=["PollutantType.NOx", "PollutantType.CO"],
+            link_data=self.link_data,
+            traffic_data=traffic_data if traffic_data is not None else self.traffic_data,
+            vehicle_data=self.vehicle_data,
+            **kwargs
+        )
+        return invoker
+
+    def read_output(self, output_folder):
+
+        return {
+            poll: pd.read_csv(f"{output_folder}/{poll}_emissions.csv")
+            for poll in ["PollutantType.NOx", "PollutantType.CO"]
+        }
+
+    def assert_output_equals_row_by_row_output(self, output_folder):
+
+        self.run_invoker(RowStrategy, f"{self.output_folder}/row")
+        expected = self.read_output(f"{self.output_folder}/row")
+        actual = self.read_output(output_folder)
+
+        for poll in expected:
+            pd.testing.assert_frame_equal(expected[poll], actual[poll])
+
+    def test_batch_strategy(self):
+
+        invoker = self.run_invoker(BatchStrategy, f"{self.output_folder}/batch")
+
+        self.assertEqual(3, invoker.strategy.n_batch_calls)
+        self.assert_output_equals_row_by_row_output(f"{self.output_folder}/batch")
+
+    def test_batch_strategy_output_has_expected_columns(self):
+
+        self.run_invoker(BatchStrategy, f"{self.output_folder}/batch")
+
+        output = self.read_output(f"{self.output_folder}/batch")["PollutantType.NOx"]
+        self.assertEqual(["LinkID", "DayType", "Dir", "Hour", "vehA", "vehB"], list(output.columns))
+        self.assertEqual(5, len(output))
+
+    def test_fall_back_to_row_by_row_calculation_if_batch_calculation_is_not_implemented(self):
+
+        self.run_invoker(NotImplementedBatchStrategy, f"{self.output_folder}/not_implemented")
+
+        self.assert_output_equals_row_by_row_output(f"{self.output_folder}/not_implemented")
+
+    def test_fall_back_to_row_by_row_calculation_if_batch_calculation_fails(self):
+
+        self.run_invoker(FailingBatchStrategy, f"{self.output_folder}/failing")
+
+        self.assert_output_equals_row_by_row_output(f"{self.output_folder}/failing")
+
+    def test_traffic_data_in_chunks(self):
+
+        for strategy_class in [RowStrategy, BatchStrategy, NotImplementedBatchStrategy]:
+            folder = f"{self.output_folder}/chunks_{strategy_class.__name__}"
+            chunks = iter([self.traffic_data.iloc[:3], self.traffic_data.iloc[3:4], self.traffic_data.iloc[4:]])
+
+            invoker = self.run_invoker(strategy_class, folder, traffic_data=chunks)
+
+            self.assertEqual(5, invoker.n_processed_rows)
+            self.assert_output_equals_row_by_row_output(folder)
+
+    def test_traffic_data_in_chunks_keeps_order_of_traffic_data_and_uses_links_to_use(self):
+
+        traffic_data = self.traffic_data.iloc[[2, 0, 4, 1, 3]]
+        chunks = iter([traffic_data.iloc[:2], traffic_data.iloc[2:]])
+
+        self.run_invoker(BatchStrategy, f"{self.output_folder}/chunks", traffic_data=chunks, links_to_use=["link_b"])
+
+        output = self.read_output(f"{self.output_folder}/chunks")["PollutantType.NOx"]
+        self.assertEqual(["LinkID", "DayType", "Dir", "Hour", "vehA", "vehB"], list(output.columns))
+        self.assertEqual([3.0, 5.0, 4.0], list(output["vehA"] / 0.5))
+
+
+    def test_metrics_of_phases(self):
+
+        for strategy_class in [RowStrategy, BatchStrategy]:
+            chunks = iter([self.traffic_data.iloc[:3], self.traffic_data.iloc[3:]])
+            invoker = self.run_invoker(strategy_class, f"{self.output_folder}/metrics_{strategy_class.__name__}",
+                                       traffic_data=chunks)
+
+            metrics = invoker.metrics.to_dict()
+            self.assertEqual(["merge", "compute", "write"], list(metrics))
+            for phase in ["merge", "compute", "write"]:
+                self.assertEqual(5, metrics[phase]["rows"])
+                self.assertGreater(metrics[phase]["wall_time_s"], 0)
+
+
+if __name__ == '__main__':
+    main()
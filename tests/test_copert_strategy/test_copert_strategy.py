@@ -3,6 +3,7 @@ from unittest import TestCase, main
 from unittest.mock import patch
 
 from code.copert_strategy.CopertStrategy import CopertStrategy
+from code.strategy_helpers.HotEmissionsContext import HotEmissionsContext
 
 
 class TestCopertStrategy(TestCase):
@@ -118,5 +119,46 @@ class TestCopertStrategy(TestCase):
             {"some": "data"}, {"vehA": "catA"}, ["poll"], test_arg1="abc", test_arg2=3)
 
 
+    @patch("code.copert_strategy.CopertStrategy.CopertColdStrategy.calculate_emissions_batch",
+           return_value={"poll_cold": "cold emissions"})
+    @patch("code.copert_strategy.CopertStrategy.CopertHotStrategy.calculate_emissions_batch",
+           return_value={"poll": "hot emissions"})
+    def test_batch_calculation_of_hot_and_cold_emissions(self, mock_hot_batch_function, mock_cold_batch_function):
+
+        strategy = CopertStrategy()
+        emis_actual = strategy.calculate_emissions_batch(
+            "block", {"vehA": "catA"}, ["pollA"], test_arg1="abc", hot_test_arg2=3, cold_test_arg3=True)
+
+        self.assertEqual({"hot_poll": "hot emissions", "cold_poll_cold": "cold emissions"}, emis_actual)
+        mock_hot_batch_function.assert_called_once_with(
+            "block", {"vehA": "catA"}, ["pollA"], test_arg1="abc", test_arg2=3)
+        mock_cold_batch_function.assert_called_once_with(
+            "block", {"vehA": "catA"}, ["pollA"], emissions_from_hot_strategy={"poll": "hot emissions"},
+            test_arg1="abc", test_arg3=True)
+
+    @patch("code.copert_strategy.CopertStrategy.CopertColdStrategy.calculate_emissions",
+           return_value={"poll": {"veh a": 200}})
+    @patch("code.copert_strategy.CopertStrategy.CopertHotStrategy.calculate_emissions",
+           return_value={"poll": {"veh a": 2}})
+    def test_emissions_context_of_hot_strategy_is_passed_to_cold_strategy(self, mock_hot_function, mock_cold_function):
+
+        strategy = CopertStrategy()
+        strategy.initialize_if_necessary()
+        emissions_context = HotEmissionsContext(hot_efs={"poll": {"veh a": 0.5}})
+        strategy.hot_strategy.emissions_context = emissions_context
+
+        strategy.calculate_emissions({"some": "data"}, {"vehA": "catA"}, ["pollA"], test_arg1="abc")
+
+        mock_cold_function.assert_called_once_with(
+            {"some": "data"}, {"vehA": "catA"}, ["pollA"], test_arg1="abc",
+            emissions_from_hot_strategy={"poll": {"veh a": 2}}, emissions_context_from_hot_strategy=emissions_context)
+
+    def test_batch_calculation_not_implemented_for_cold_strategy_without_batch_function(self):
+
+        strategy = CopertStrategy()
+        self.assertRaises(
+            NotImplementedError, strategy.calculate_emissions_batch, "block", {"vehA": "catA"}, ["pollA"],
+            cold_strategy="tests.test_copert_strategy.MockStrategy.MockStrategy")
+
 if __name__ == '__main__':
     main()
@@ -1,7 +1,8 @@
 from unittest import TestCase, main
+from unittest.mock import patch
 import pandas as pd
 
-from code.data_loading.loader_utils import convert_dir_and_day_type
+from code.data_loading.loader_utils import convert_dir_and_day_type, convert_to_enum
 from code.constants.enumerations import DayType, Dir
 from tests.helper import df_equal
 
@@ -27,5 +28,20 @@ class TestDataLoaderHelpers(TestCase):
         self.assertTrue(df_equal(actual_output, expected_output))
 
 
+    def test_convert_to_enum(self):
+
+        values = pd.Series(["R", Dir.L, "L", None, "R", "not a direction"], index=[5, 4, 3, 2, 1, 0], name="Dir")
+
+        with patch.object(Dir, "from_val", wraps=Dir.from_val) as from_val:
+            actual_output = convert_to_enum(values, Dir)
+
+        self.assertEqual(from_val.call_count, 4)  # once for each unique value that is not missing
+        self.assertIsInstance(actual_output.dtype, pd.CategoricalDtype)
+        self.assertEqual(list(actual_output.index), [5, 4, 3, 2, 1, 0])
+        self.assertEqual(actual_output.name, "Dir")
+        self.assertEqual(actual_output.tolist()[:3] + actual_output.tolist()[4:5], [Dir.R, Dir.L, Dir.L, Dir.R])
+        self.assertTrue(actual_output.iloc[[3, 5]].isna().all())
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
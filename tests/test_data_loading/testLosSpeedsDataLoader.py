@@ -104,5 +104,37 @@ class TestLosSpeedsDataLoader(TestCase):
 
         self.assertEqual("VehicleCategory.HDV", vehicle_category_in_yeti_format_data)
 
+    def test_missing_los_speeds_and_mopeds(self):
+
+        link_data = pd.DataFrame.from_dict({
+            "LinkID": ["linkA", "linkB"],
+            "AreaCat": ["1", "0"],
+            "RoadCat": ["5", "1"],
+            "MaxSpeed_kmh": ["100", "50"]
+        })
+        los_speeds_data = pd.DataFrame.from_dict({
+            "VehCat": ["motorcycle", "motorcycle", "pass. car", "pass. car"],
+            "TrafficSituation": ["URB/MW-City/100/Heavy", "URB/MW-City/100/Freeflow",
+                                 "RUR/Distr/50/St+Go", "URB/MW-City/100/Satur."],
+            "Speed_kmh": [80.0, 100.0, 10.0, 60.0]
+        })
+        loader = LosSpeedsDataLoader(
+            link_data=link_data,
+            los_speeds_data=los_speeds_data
+        )
+        yeti_format_los_speeds_data = loader.load_data()
+
+        expected = pd.DataFrame.from_dict({
+            "LOS1Speed": [100.0, None, None, 100.0],
+            "LinkID": ["linkA", "linkA", "linkB", "linkA"],
+            "VehicleCategory": ["VehicleCategory.MC", "VehicleCategory.PC", "VehicleCategory.PC",
+                                "VehicleCategory.MOPED"],
+            "LOS2Speed": [80.0, None, None, 80.0],
+            "LOS3Speed": [None, 60.0, None, None],
+            "LOS4Speed": [None, None, 10.0, None]
+        })
+        pd.testing.assert_frame_equal(expected, yeti_format_los_speeds_data)
+
+
 if __name__ == "__main__":
     main()
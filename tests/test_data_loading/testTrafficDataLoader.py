@@ -3,7 +3,7 @@ from unittest import TestCase, main
 
 import pandas as pd
 
-from code.data_loading.TrafficDataLoader import TrafficDataLoader
+from code.data_loading.TrafficDataLoader import TrafficDataLoader, expand_traffic_data
 from tests.helper import df_equal
 
 
@@ -27,5 +27,26 @@ class TestTrafficDataLoader(TestCase):
         self.assertTrue(df_equal(traffic_data, traffic_data_expected))
 
 
+    def test_expanded_factored_data_equals_data(self):
+
+        if os.path.isfile("./tests/test_data/berlin_format_data/traffic_data.csv"):
+            init_path = "./tests"
+        else:
+            init_path = ".."
+
+        loader = TrafficDataLoader(
+            fleet_comp_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/fleet_comp_data.csv"),
+            link_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/shape_data.csv"),
+            traffic_count_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/traffic_data.csv")
+        )
+        traffic_data_by_category, vehicle_shares = loader.load_factored_data()
+
+        self.assertEqual(["VehicleName", "FleetCategory", "VehicleShare"], list(vehicle_shares.columns))
+        self.assertIn("VehCount_P", traffic_data_by_category.columns)
+        pd.testing.assert_frame_equal(loader.load_data(), expand_traffic_data(traffic_data_by_category, vehicle_shares))
+        pd.testing.assert_frame_equal(
+            loader.load_data().iloc[2:5],
+            expand_traffic_data(traffic_data_by_category.iloc[2:5], vehicle_shares))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,71 @@
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import pandas as pd
+
+from code.constants.enumerations import Dir
+from code.data_loading.TrafficMatrix import TrafficMatrix
+from code.data_loading.yeti_format_files import read_yeti_format_file, write_yeti_format_file
+
+
+class TestTrafficMatrix(TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.mkdtemp()
+        self.data = pd.DataFrame({
+            "LinkID": ["1", "1", "2", "3", "2"],
+            "Dir": [Dir.L, Dir.R, Dir.L, Dir.R, Dir.L],
+            "Hour": [0, 1, 2, 3, 4],
+            "vehA": np.array([0.1, 2.5, 3.5, 4.5, 5.5], dtype=np.float32),
+            "vehB": np.array([1, 2, 3, 4, 5], dtype=np.float32),
+            "Speed": [50.5, 30.0, np.nan, 10.0, 20.0]
+        })
+        self.dtype = {"LinkID": str, "Dir": "category", "Hour": np.int8, "vehA": np.float32, "vehB": np.float32}
+        write_yeti_format_file(self.data, f"{self.folder}/data.csv", "csv")
+        write_yeti_format_file(self.data, f"{self.folder}/data.memmap", "memmap")
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.folder)
+
+    def test_memmap_file_is_read_like_csv_file(self):
+
+        from_csv = read_yeti_format_file(f"{self.folder}/data.csv", dtype=self.dtype)
+        from_memmap = read_yeti_format_file(f"{self.folder}/data.memmap", dtype=self.dtype)
+
+        pd.testing.assert_frame_equal(from_csv, from_memmap)
+
+    def test_memmap_file_is_read_in_chunks_like_csv_file(self):
+
+        from_csv = list(read_yeti_format_file(f"{self.folder}/data.csv", self.dtype, nrows=4, chunksize=3))
+        from_memmap = list(read_yeti_format_file(f"{self.folder}/data.memmap", self.dtype, nrows=4, chunksize=3))
+
+        self.assertEqual(2, len(from_memmap))
+        for csv_chunk, memmap_chunk in zip(from_csv, from_memmap):
+            pd.testing.assert_frame_equal(csv_chunk, memmap_chunk)
+
+    def test_vehicle_counts_are_memory_mapped(self):
+
+        traffic_matrix = TrafficMatrix(f"{self.folder}/data.memmap")
+
+        self.assertIsInstance(traffic_matrix.get_array("matrix.npy"), np.memmap)
+        self.assertEqual((5, 2), traffic_matrix.get_array("matrix.npy").shape)
+
+    def test_select_rows_and_pickle(self):
+
+        traffic_matrix = TrafficMatrix(f"{self.folder}/data.memmap")
+        traffic_matrix.get_rows()  # opens the memmaps
+        selected = traffic_matrix.select_rows(traffic_matrix.get_link_ids().isin(["2"]).to_numpy())
+
+        unpickled = pickle.loads(pickle.dumps(selected))
+
+        self.assertEqual({}, unpickled.arrays)
+        self.assertEqual([2, 4], list(unpickled.get_rows()["Hour"]))
+        self.assertEqual([5.5], list(unpickled.get_rows(1, 2, self.dtype)["vehA"]))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
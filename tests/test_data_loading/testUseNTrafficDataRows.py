@@ -26,6 +26,10 @@ class TestUseNTrafficDataRows(TestCase):
 
         self.assertEqual(2, len(data["traffic_data"]))
 
+        data = load_copert_hot_yeti_format_data(traffic_data_chunk_size=1, **kwargs)
+
+        self.assertEqual([1, 1], [len(chunk) for chunk in data["traffic_data"]])
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import pandas as pd
+
+from code.constants.enumerations import Dir
+from code.data_loading.TrafficDataLoader import TrafficDataLoader
+from code.data_loading.yeti_format_files import read_yeti_format_file, read_yeti_format_traffic_data_file, \
+    write_yeti_format_file
+
+
+class TestYetiFormatFiles(TestCase):
+
+    def setUp(self) -> None:
+
+        self.folder = tempfile.mkdtemp()
+        self.data = pd.DataFrame({
+            "LinkID": ["1", "2", "3", "4", "5"],
+            "Dir": [Dir.L, Dir.R, Dir.L, Dir.R, Dir.L],
+            "Hour": [0, 1, 2, 3, 4],
+            "vehA": np.array([0.1, 2.5, np.nan, 4.5, 5.5], dtype=np.float32)
+        })
+
+    def tearDown(self) -> None:
+
+        shutil.rmtree(self.folder)
+
+    def test_parquet_file_is_read_like_csv_file(self):
+
+        write_yeti_format_file(self.data, f"{self.folder}/data.csv", "csv")
+        write_yeti_format_file(self.data, f"{self.folder}/data.parquet", "parquet")
+        dtype = {"LinkID": str, "Dir": "category", "Hour": np.int8}
+
+        from_csv = read_yeti_format_file(f"{self.folder}/data.csv", dtype=dtype)
+        from_parquet = read_yeti_format_file(f"{self.folder}/data.parquet", dtype=dtype)
+
+        pd.testing.assert_frame_equal(from_csv, from_parquet)
+        self.assertEqual(["Dir.L", "Dir.R"], list(from_parquet["Dir"].cat.categories))
+
+    def test_parquet_file_is_read_in_chunks(self):
+
+        write_yeti_format_file(self.data, f"{self.folder}/data.parquet", "parquet")
+
+        chunks = list(read_yeti_format_file(f"{self.folder}/data.parquet", nrows=4, chunksize=3))
+
+        self.assertEqual([3, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual([0, 1, 2, 3], list(pd.concat(chunks).index))
+        self.assertEqual(["1", "2", "3", "4"], list(pd.concat(chunks)["LinkID"]))
+
+    def test_feather_file_is_read_like_csv_file(self):
+
+        write_yeti_format_file(self.data, f"{self.folder}/data.csv", "csv")
+        write_yeti_format_file(self.data.iloc[1:], f"{self.folder}/data.feather", "feather")
+        dtype = {"LinkID": str, "Dir": "category", "Hour": np.int8}
+
+        from_csv = read_yeti_format_file(f"{self.folder}/data.csv", dtype=dtype).iloc[1:].reset_index(drop=True)
+        from_feather = read_yeti_format_file(f"{self.folder}/data.feather", dtype=dtype)
+
+        pd.testing.assert_frame_equal(from_csv, from_feather, check_categorical=False)
+
+    def test_feather_file_is_read_in_chunks(self):
+
+        write_yeti_format_file(self.data, f"{self.folder}/data.feather", "feather")
+
+        chunks = list(read_yeti_format_file(f"{self.folder}/data.feather", nrows=4, chunksize=3))
+
+        self.assertEqual([3, 1], [len(chunk) for chunk in chunks])
+        self.assertEqual([0, 1, 2, 3], list(pd.concat(chunks).index))
+        self.assertEqual(["1", "2", "3", "4"], list(pd.concat(chunks)["LinkID"]))
+
+    def test_unknown_file_format_raises_error(self):
+
+        self.assertRaises(RuntimeError, write_yeti_format_file, self.data, f"{self.folder}/data.txt", "txt")
+
+
+    def test_factored_traffic_data_is_expanded_chunk_by_chunk(self):
+
+        init_path = "./tests" if os.path.isdir("./tests/test_data") else ".."
+        loader = TrafficDataLoader(
+            fleet_comp_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/fleet_comp_data.csv"),
+            link_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/shape_data.csv"),
+            traffic_count_data=pd.read_csv(f"{init_path}/test_data/berlin_format_data/traffic_data.csv")
+        )
+        traffic_data_by_category, vehicle_shares = loader.load_factored_data()
+        write_yeti_format_file(loader.load_data(), f"{self.folder}/traffic_data.csv")
+        write_yeti_format_file(traffic_data_by_category, f"{self.folder}/traffic_data_by_category.csv")
+        write_yeti_format_file(vehicle_shares, f"{self.folder}/vehicle_shares.csv")
+        dtype = {"LinkID": str, "Hour": np.int8, **{name: np.float32 for name in vehicle_shares["VehicleName"]}}
+
+        expected = read_yeti_format_file(f"{self.folder}/traffic_data.csv", dtype=dtype)
+        chunks = read_yeti_format_traffic_data_file(f"{self.folder}/traffic_data_by_category.csv",
+                                                    f"{self.folder}/vehicle_shares.csv", dtype=dtype, chunksize=2)
+
+        pd.testing.assert_frame_equal(expected, pd.concat(list(chunks)))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -30,6 +30,7 @@ class TestScript(TestCase):
 
         self.assertTrue(os.path.isdir(f"./output_mode_berlin_format_data/"))
         assert_file_exists_and_not_empty(f"./output_mode_berlin_format_data/run_info.txt")
+        assert_file_exists_and_not_empty(f"./output_mode_berlin_format_data/run_metrics.json")
         assert_file_exists_and_not_empty(f"./output_mode_berlin_format_data/PollutantType.CO_emissions.csv")
         assert_file_exists_and_not_empty(f"./output_mode_berlin_format_data/PollutantType.NOx_emissions.csv")
         assert_file_exists_and_not_empty(f"./output_mode_berlin_format_data/yeti_format_emission_factors.csv")
@@ -7,6 +7,7 @@ import pandas as pd
 from code.copert_cold_strategy.CopertColdStrategy import CopertColdStrategy
 from code.copert_hot_fixed_speed_strategy.CopertHotFixedSpeedStrategy import CopertHotFixedSpeedStrategy
 from code.copert_hot_strategy.CopertHotStrategy import CopertHotStrategy
+from code.strategy_helpers.HotEmissionsContext import HotEmissionsContext
 
 
 class TestCopertColdStrategy(TestCase):
@@ -892,6 +893,151 @@ class TestCopertColdStrategy(TestCase):
             0.46925
         )
 
+    def test_calculate_emissions_batch_same_as_row_by_row(self):
+
+        veh_mapping = pd.DataFrame({
+            "VehName": ["vehA", "vehB", "vehC", "vehD", "vehE", "vehF", "vehG", "vehH", "vehI", "vehJ", "vehK"],
+            "VehCat": ["Passenger Cars"] * 7 + ["Light Commercial Vehicles"] * 3 + ["Heavy Duty Trucks"],
+            "Fuel": ["Petrol", "Petrol", "Petrol", "Diesel", "LPG", "LPG", "CNG", "Petrol", "Petrol", "Diesel", "Diesel"],
+            "VehSegment": ["Mini", "Mini", "Small", "Mini", "Small", "Mini", "Mini", "N1-I", "N1-I", "N1-I", "Rigid"],
+            "EuroStandard": ["Euro 1", "Euro 3", "ECE 15/04", "Euro 2", "ECE 15/04", "Euro 2", "Euro 4", "Euro 1",
+                             "Conventional", "Euro 5", "Euro 6"]
+        })
+        vehicle_dict = {
+            veh_name: {"Passenger Cars": "VehicleCategory.PC", "Light Commercial Vehicles": "VehicleCategory.LCV",
+                       "Heavy Duty Trucks": "VehicleCategory.HDV"}[veh_cat]
+            for veh_name, veh_cat in zip(veh_mapping["VehName"], veh_mapping["VehCat"])
+        }
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA", "linkA", "linkB", "linkB"],
+            "VehicleCategory": ["VehicleCategory.PC", "VehicleCategory.LCV"] * 2,
+            "LOS1Speed": [5, 10, 26, 5],
+            "LOS2Speed": [20, 20, 45, 5],
+            "LOS3Speed": [30, 40, 46, 5],
+            "LOS4Speed": [50, 60, 100, 5]
+        })
+        data = pd.DataFrame({
+            "LinkID": ["linkA", "linkB", "linkA", "linkB", "linkA"],
+            "Length": [1.5, 0.3, 0.0, 2.0, 1.0],
+            "RoadType": ["abc", "abc", "abc", "abc", "MW_City"],
+            "AreaType": ["cde"] * 5,
+            "LOS1Percentage": [0.5, 0.1, 0.25, 0.0, 1.0],
+            "LOS2Percentage": [0.3, 0.2, 0.25, 0.0, 0.0],
+            "LOS3Percentage": [0.1, 0.3, 0.25, 0.0, 0.0],
+            "LOS4Percentage": [0.1, 0.4, 0.25, 1.0, 0.0],
+            **{veh_name: [10.0 + i, 0.0, 3.0, 7.5 * i, 1.0] for i, veh_name in enumerate(vehicle_dict)}
+        }, index=[3, 4, 5, 6, 7])
+        hot_emissions = pd.DataFrame(
+            np.arange(1, 56).reshape(5, 11) * 0.37, index=data.index, columns=list(vehicle_dict))
+        kwargs = {
+            "yeti_format_cold_ef_table": self.cold_ef_table,
+            "yeti_format_los_speeds": los_speeds_data,
+            "yeti_format_vehicle_mapping": veh_mapping,
+            "ltrip": 7,
+            "temperature": 10,
+            "exclude_road_types": ["MW_City"]
+        }
+
+        emissions = CopertColdStrategy().calculate_emissions_batch(
+            data, vehicle_dict, self.pollutants, emissions_from_hot_strategy={self.pollutant: hot_emissions}, **kwargs)
+
+        row_strategy = CopertColdStrategy()
+        for i, row in data.iterrows():
+            hot_emissions_for_row = {veh_name: float(value) for veh_name, value in hot_emissions.loc[i].items()}
+            expected = row_strategy.calculate_emissions(
+                row.to_dict(), vehicle_dict, self.pollutants,
+                emissions_from_hot_strategy={self.pollutant: hot_emissions_for_row}, **kwargs)
+            for name in [f"{self.pollutant}_cold", f"{self.pollutant}_total"]:
+                self.assertEqual(expected[name], emissions[name].loc[i].to_dict())
+
+        self.assertEqual(["vehC", "vehA", "vehB", "vehD", "vehE", "vehF", "vehG", "vehI", "vehH", "vehJ", "vehK"],
+                         list(emissions[f"{self.pollutant}_cold"].columns))
+
+    def test_calculate_emissions_batch_raises_error_if_a_row_fails(self):
+
+        data = pd.DataFrame({
+            "LinkID": ["linkA", "unknown_link"], "Length": [1.0, 1.0], "RoadType": ["abc"] * 2, "AreaType": ["cde"] * 2,
+            "LOS1Percentage": [1.0, 1.0], "LOS2Percentage": [0.0, 0.0], "LOS3Percentage": [0.0, 0.0],
+            "LOS4Percentage": [0.0, 0.0], "vehA": [1.0, 1.0], "vehB": [1.0, 1.0]
+        })
+        hot_emissions = pd.DataFrame({"vehA": [1.0, 1.0], "vehB": [1.0, 1.0]})
+
+        self.assertRaises(
+            KeyError, CopertColdStrategy().calculate_emissions_batch, data, self.vehicle_dict, self.pollutants,
+            emissions_from_hot_strategy={self.pollutant: hot_emissions}, yeti_format_cold_ef_table=self.cold_ef_table,
+            yeti_format_los_speeds=self.los_speeds_data, yeti_format_vehicle_mapping=self.veh_mapping_no_index_set,
+            ltrip=7, temperature=10)
+
+    def test_calculate_emissions_with_emissions_context_from_hot_strategy(self):
+
+        kwargs = {
+            "yeti_format_cold_ef_table": self.cold_ef_table,
+            "yeti_format_vehicle_mapping": self.veh_mapping_no_index_set,
+            "ltrip": 7,
+            "temperature": 10
+        }
+        hot_emissions = {self.pollutant: {"vehA": 0.75 * 1 * 10, "vehB": 0.25 * 1 * 100}}
+        emissions_context = HotEmissionsContext(
+            hot_efs={self.pollutant: {"vehA": 0.75, "vehB": 0.25}},
+            los_speeds={
+                category: los_speeds for (_, category), los_speeds
+                in self.los_speeds_data.set_index(["LinkID", "VehicleCategory"]).to_dict(orient="index").items()
+            })
+
+        expected = CopertColdStrategy().calculate_emissions(
+            self.row_dict, self.vehicle_dict, self.pollutants, emissions_from_hot_strategy=hot_emissions,
+            yeti_format_los_speeds=self.los_speeds_data, **kwargs)
+        # the los speeds for linkA are only in the context
+        actual = CopertColdStrategy().calculate_emissions(
+            self.row_dict, self.vehicle_dict, self.pollutants, emissions_from_hot_strategy=hot_emissions,
+            emissions_context_from_hot_strategy=emissions_context,
+            yeti_format_los_speeds=self.los_speeds_data.assign(LinkID="linkB"), **kwargs)
+
+        self.assertEqual(expected, actual)
+
+    def test_calculate_emissions_batch_with_emissions_context_from_hot_strategy(self):
+
+        data = pd.DataFrame({
+            "LinkID": ["linkA", "linkA", "linkA"], "Length": [1.5, 0.0, 2.0], "RoadType": ["abc", "MW_City", "abc"],
+            "AreaType": ["cde"] * 3, "LOS1Percentage": [0.5, 1.0, 0.0], "LOS2Percentage": [0.3, 0.0, 0.5],
+            "LOS3Percentage": [0.1, 0.0, 0.5], "LOS4Percentage": [0.1, 0.0, 0.0], "vehA": [10.0, 1.0, 0.0],
+            "vehB": [100.0, 2.0, 3.0]
+        }, index=[7, 8, 9])
+        hot_efs = pd.DataFrame({"vehA": [0.1, 0.2, 0.3], "vehB": [0.4, 0.5, 0.6]}, index=data.index)
+        los_speeds = self.los_speeds_data.set_index(["LinkID", "VehicleCategory"]).to_dict(orient="index")
+        kwargs = {
+            "yeti_format_cold_ef_table": self.cold_ef_table,
+            "yeti_format_los_speeds": self.los_speeds_data.assign(LinkID="linkB"),
+            "yeti_format_vehicle_mapping": self.veh_mapping_no_index_set,
+            "ltrip": 7,
+            "temperature": 10,
+            "exclude_road_types": ["MW_City"]
+        }
+
+        emissions = CopertColdStrategy().calculate_emissions_batch(
+            data, self.vehicle_dict, self.pollutants,
+            emissions_from_hot_strategy={self.pollutant: hot_efs.mul(data["Length"], axis=0) * data[["vehA", "vehB"]]},
+            emissions_context_from_hot_strategy=HotEmissionsContext(
+                hot_efs={self.pollutant: hot_efs},
+                los_speeds={category: np.array([list(los_speeds["linkA", category].values())] * 3, dtype=float)
+                            for category in ["VehicleCategory.PC", "VehicleCategory.LCV"]}),
+            **kwargs)
+
+        row_strategy = CopertColdStrategy()
+        for i, row in data.iterrows():
+            hot_efs_for_row = {veh_name: float(value) for veh_name, value in hot_efs.loc[i].items()}
+            expected = row_strategy.calculate_emissions(
+                row.to_dict(), self.vehicle_dict, self.pollutants,
+                emissions_from_hot_strategy={self.pollutant: {
+                    veh_name: ef * row["Length"] * row[veh_name] for veh_name, ef in hot_efs_for_row.items()}},
+                emissions_context_from_hot_strategy=HotEmissionsContext(
+                    hot_efs={self.pollutant: hot_efs_for_row},
+                    los_speeds={category: los_speeds["linkA", category]
+                                for category in ["VehicleCategory.PC", "VehicleCategory.LCV"]}),
+                **kwargs)
+            for name in [f"{self.pollutant}_cold", f"{self.pollutant}_total"]:
+                self.assertEqual(expected[name], emissions[name].loc[i].to_dict())
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -63,6 +63,54 @@ class TestCopertHotFixedSpeedStrategy(TestCase):
             row_dict, vehicle_dict, pollutants, emission_factor_data=emission_factor_data)
         self.assertEqual(emissions_expected_speed_10, emissions_actual["PollutantType.NOx"])
 
+    def test_calculate_emissions_batch(self):
+
+        vehicle_dict = {
+            "vehA": "VehicleCategory.PC",
+            "vehB": "VehicleCategory.LCV"
+        }
+        emission_factor_data = pd.DataFrame({
+            "VehicleName": ["vehA", "vehB"],
+            "Pollutant": ["PollutantType.NOx", "PollutantType.NOx"],
+            "Slope": [0, np.nan],
+            "Load": [0, np.nan],
+            "MaxSpeed": [100, "120"],
+            "MinSpeed": [10, "5"],
+            "Alpha": [2, "2"],
+            "Beta": [0.3, "0.8"],
+            "Gamma": [2, "3"],
+            "Delta": [7, "4"],
+            "Epsilon": [0, "2"],
+            "Zita": [1, "6"],
+            "Hta": [4, "9"],
+            "ReductionPerc": [0, "0.5"]
+        })
+        traffic_and_link_data = pd.DataFrame({
+            "vehA": [10, 3],
+            "vehB": [100, 0],
+            "Length": [1, 0.5],
+            "LinkID": ["linkA", "linkB"],
+            "Speed": [10, 150]
+        })
+        pollutants = ["PollutantType.NOx"]
+
+        emissions_actual = CopertHotFixedSpeedStrategy().calculate_emissions_batch(
+            traffic_and_link_data, vehicle_dict, pollutants, emission_factor_data=emission_factor_data, v=20)
+        self.assertEqual({"vehA": 336.8125, "vehB": 44.090419806243276},
+                         emissions_actual["PollutantType.NOx"].loc[0].to_dict())
+
+        emissions_actual = CopertHotFixedSpeedStrategy().calculate_emissions_batch(
+            traffic_and_link_data, vehicle_dict, pollutants, emission_factor_data=emission_factor_data)
+        self.assertEqual({"vehA": 146.92857142857142, "vehB": 39.29368029739777},
+                         emissions_actual["PollutantType.NOx"].loc[0].to_dict())
+
+        strategy = CopertHotFixedSpeedStrategy()
+        emissions_expected = strategy.calculate_emissions(
+            traffic_and_link_data.loc[1].to_dict(), vehicle_dict, pollutants,
+            emission_factor_data=emission_factor_data)
+        self.assertEqual(emissions_expected["PollutantType.NOx"],
+                         emissions_actual["PollutantType.NOx"].loc[1].to_dict())
+
     @patch("code.copert_hot_fixed_speed_strategy.load_berlin_format_data.load_copert_hot_berlin_format_data",
            return_value={"some": "return", "value": "."})
     def test_load_berlin_format_data(self, mocked_copert_hot_load_function):
@@ -59,5 +59,125 @@ class TestCopertHotStrategy(TestCase):
 
         self.assertEqual(emissions_expected, emissions_actual["PollutantType.NOx"])
 
+    def test_calculate_emissions_batch_matches_calculate_emissions(self):
+
+        vehicle_dict = {
+            "vehA": "VehicleCategory.PC",
+            "vehB": "VehicleCategory.LCV"
+        }
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA", "linkA", "linkB", "linkB"],
+            "VehicleCategory": ["VehicleCategory.PC", "VehicleCategory.LCV"] * 2,
+            "LOS1Speed": [5, 10, 130, 110],
+            "LOS2Speed": [20, 20, 90, 80],
+            "LOS3Speed": [30, 40, 50, 40],
+            "LOS4Speed": [50, 60, 10, 8]
+        })
+        emission_factor_data = pd.DataFrame({
+            "VehicleName": ["vehA", "vehB", "vehA", "vehB"],
+            "Pollutant": ["PollutantType.NOx", "PollutantType.NOx", "PollutantType.CO", "PollutantType.CO"],
+            "Slope": [0, np.nan, 0, 0],
+            "Load": [0, np.nan, 0, 0],
+            "MaxSpeed": [100, "120", 130, 130],
+            "MinSpeed": [10, "5", 10, 10],
+            "Alpha": [2, "2", 0.1, 0.01],
+            "Beta": [0.3, "0.8", 0.2, 1.2],
+            "Gamma": [2, "3", 5, 0.5],
+            "Delta": [7, "4", 0, 1],
+            "Epsilon": [0, "2", 0.5, 0],
+            "Zita": [1, "6", 0.7, 2],
+            "Hta": [4, "9", 1, 1],
+            "ReductionPerc": [0, "0.5", 0.1, 0]
+        })
+        traffic_and_link_data = pd.DataFrame({
+            "LinkID": ["linkA", "linkB", "linkA", "linkB"],
+            "Length": [1, 0.5, 0.25, 2],
+            "vehA": np.array([10, 0, 3.3, 7.1], dtype=np.float32),
+            "vehB": np.array([100, 5, 0.7, 12], dtype=np.float32),
+            "LOS1Percentage": [0.5, 0, 0.25, 1],
+            "LOS2Percentage": [0.3, 0.5, 0.25, 0],
+            "LOS3Percentage": [0.1, 0.5, 0.25, 0],
+            "LOS4Percentage": [1, 0, 0.25, 0],
+            "EF": [np.nan, np.nan, 0.3, np.nan]
+        }, index=[4, 5, 6, 7])
+        pollutants = ["PollutantType.NOx", "PollutantType.CO"]
+
+        batch_strategy = CopertHotStrategy()
+        emissions_actual = batch_strategy.calculate_emissions_batch(
+            traffic_and_link_data, vehicle_dict, pollutants, los_speeds_data=los_speeds_data,
+            emission_factor_data=emission_factor_data)
+
+        strategy = CopertHotStrategy()
+        for row_number, (i, row) in enumerate(traffic_and_link_data.iterrows()):
+            emissions_expected = strategy.calculate_emissions(
+                row.to_dict(), vehicle_dict, pollutants, los_speeds_data=los_speeds_data,
+                emission_factor_data=emission_factor_data)
+            for pollutant in pollutants:
+                self.assertEqual(emissions_expected[pollutant], emissions_actual[pollutant].loc[i].to_dict())
+                self.assertEqual(strategy.emissions_context.hot_efs[pollutant],
+                                 batch_strategy.emissions_context.hot_efs[pollutant].loc[i].to_dict())
+            for vehicle_category in vehicle_dict.values():
+                self.assertEqual(list(strategy.emissions_context.los_speeds[vehicle_category].values()),
+                                 list(batch_strategy.emissions_context.los_speeds[vehicle_category][row_number]))
+
+    def test_calculate_emissions_batch_raises_error_for_missing_los_speeds(self):
+
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA"], "VehicleCategory": ["VehicleCategory.PC"],
+            "LOS1Speed": [5], "LOS2Speed": [20], "LOS3Speed": [30], "LOS4Speed": [50]
+        })
+        emission_factor_data = pd.DataFrame({
+            "VehicleName": ["vehA"], "Pollutant": ["PollutantType.NOx"], "Slope": [0], "Load": [0],
+            "MaxSpeed": [100], "MinSpeed": [10], "Alpha": [2], "Beta": [0.3], "Gamma": [2], "Delta": [7],
+            "Epsilon": [0], "Zita": [1], "Hta": [4], "ReductionPerc": [0]
+        })
+        traffic_and_link_data = pd.DataFrame({
+            "LinkID": ["linkA", "linkB"], "Length": [1, 1], "vehA": [1, 1], "LOS1Percentage": [1, 1],
+            "LOS2Percentage": [0, 0], "LOS3Percentage": [0, 0], "LOS4Percentage": [0, 0]
+        })
+
+        with self.assertRaises(KeyError):
+            CopertHotStrategy().calculate_emissions_batch(
+                traffic_and_link_data, {"vehA": "VehicleCategory.PC"}, ["PollutantType.NOx"],
+                los_speeds_data=los_speeds_data, emission_factor_data=emission_factor_data)
+
+    def test_ef_cache_is_used_for_repeated_speeds(self):
+
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA"], "VehicleCategory": ["VehicleCategory.PC"],
+            "LOS1Speed": [5], "LOS2Speed": [20], "LOS3Speed": [30], "LOS4Speed": [200]
+        })
+        emission_factor_data = pd.DataFrame({
+            "VehicleName": ["vehA"], "Pollutant": ["PollutantType.NOx"], "Slope": [0], "Load": [0],
+            "MaxSpeed": [100], "MinSpeed": [10], "Alpha": [2], "Beta": [0.3], "Gamma": [2], "Delta": [7],
+            "Epsilon": [0], "Zita": [1], "Hta": [4], "ReductionPerc": [0]
+        })
+        row_dict = {
+            "LinkID": "linkA", "Length": 1, "vehA": 10, "LOS1Percentage": 0.5, "LOS2Percentage": 0.3,
+            "LOS3Percentage": 0.1, "LOS4Percentage": 0.1
+        }
+
+        strategy = CopertHotStrategy()
+        emissions = [
+            strategy.calculate_emissions(
+                row_dict, {"vehA": "VehicleCategory.PC"}, ["PollutantType.NOx"],
+                los_speeds_data=los_speeds_data, emission_factor_data=emission_factor_data)["PollutantType.NOx"]
+            for _ in range(3)
+        ]
+
+        self.assertEqual(emissions[0], emissions[2])
+        self.assertEqual(4, strategy.ef_cache.misses)  # speeds 10 (clipped), 20, 30 and 100 (clipped)
+        self.assertEqual(8, strategy.ef_cache.hits)
+        self.assertEqual(4, len(strategy.ef_cache))
+
+        strategy_without_cache = CopertHotStrategy()
+        emissions_without_cache = strategy_without_cache.calculate_emissions(
+            row_dict, {"vehA": "VehicleCategory.PC"}, ["PollutantType.NOx"], ef_cache_size=0,
+            los_speeds_data=los_speeds_data, emission_factor_data=emission_factor_data)["PollutantType.NOx"]
+
+        self.assertEqual(emissions[0], emissions_without_cache)
+        self.assertEqual(0, len(strategy_without_cache.ef_cache))
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -78,6 +78,37 @@ class TestHbefaColdStrategy(TestCase):
 
         self.assertEqual(emissions_expected, emissions_actual)
 
+    def test_calculate_emissions_batch(self):
+
+        cold_starts_data = pd.DataFrame({
+            "Pollutant": ["PollutantType.NOx", "PollutantType.NOx", "PollutantType.CO", "PollutantType.CO"],
+            "VehicleName": ["veh a", "veh b", "veh a", "veh b"],
+            "EmissionsPerStart": [1, 2.5, 3, 0.4]
+        })
+        cold_starts_and_link_data = pd.DataFrame({"LinkID": ["a", "b"], "veh a": [10, 0.3], "veh b": [20, 7]}, index=[4, 5])
+        vehicle_dict = {"veh a": "some category", "veh b": "some other category"}
+        pollutants = ["PollutantType.NOx", "PollutantType.CO"]
+
+        emissions_actual = HbefaColdStrategy().calculate_emissions_batch(
+            cold_starts_and_link_data, vehicle_dict, pollutants, emission_factor_data=cold_starts_data)
+
+        strategy = HbefaColdStrategy()
+        for i, row in cold_starts_and_link_data.iterrows():
+            emissions_expected = strategy.calculate_emissions(
+                row.to_dict(), vehicle_dict, pollutants, emission_factor_data=cold_starts_data)
+            for pollutant in pollutants:
+                self.assertEqual(emissions_expected[pollutant], emissions_actual[pollutant].loc[i].to_dict())
+
+    def test_calculate_emissions_batch_raises_error_for_missing_emission_factors(self):
+
+        cold_starts_data = pd.DataFrame({
+            "Pollutant": ["PollutantType.NOx"], "VehicleName": ["veh a"], "EmissionsPerStart": [1]
+        })
+
+        self.assertRaises(
+            KeyError, HbefaColdStrategy().calculate_emissions_batch, pd.DataFrame({"veh a": [1], "veh b": [2]}),
+            {"veh a": "some category", "veh b": "some other category"}, ["PollutantType.NOx"],
+            emission_factor_data=cold_starts_data)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,72 @@
+import os
+from unittest import TestCase, main
+
+import pandas as pd
+
+from code.hbefa_hot_strategy.HbefaHotStrategy import HbefaHotStrategy
+
+
+class TestHbefaHotStrategy(TestCase):
+
+    def setUp(self) -> None:
+
+        if os.path.isfile("./tests/test_data/yeti_format_data/hbefa_ef_data.csv"):
+            self.init_path = "./tests"
+        else:
+            self.init_path = "."
+
+        link_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/link_data.csv")
+        traffic_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/traffic_data.csv")
+        self.traffic_and_link_data = pd.merge(link_data, traffic_data, on="LinkID")
+        self.emission_factor_data = pd.read_csv(f"{self.init_path}/test_data/yeti_format_data/hbefa_ef_data.csv")
+        self.vehicle_dict = {"pc vehicle_a": "VehicleCategory.PC", "lcv vehicle_b": "VehicleCategory.LCV"}
+
+    def test_calculate_emissions_batch_matches_calculate_emissions(self):
+
+        pollutants = ["PollutantType.NOx", "PollutantType.CO"]
+
+        emissions_actual = HbefaHotStrategy().calculate_emissions_batch(
+            self.traffic_and_link_data, self.vehicle_dict, pollutants, emission_factor_data=self.emission_factor_data)
+
+        strategy = HbefaHotStrategy()
+        for i, row in self.traffic_and_link_data.iterrows():
+            emissions_expected = strategy.calculate_emissions(
+                row.to_dict(), self.vehicle_dict, pollutants, emission_factor_data=self.emission_factor_data)
+            for pollutant in pollutants:
+                self.assertEqual(emissions_expected[pollutant], emissions_actual[pollutant].loc[i].to_dict())
+
+    def test_calculate_emissions_batch_raises_error_for_missing_emission_factors(self):
+
+        with self.assertRaises(KeyError):
+            HbefaHotStrategy().calculate_emissions_batch(
+                self.traffic_and_link_data, self.vehicle_dict, ["PollutantType.NH3"],
+                emission_factor_data=self.emission_factor_data)
+
+    def test_ef_index(self):
+
+        strategy = HbefaHotStrategy()
+        strategy.calculate_emissions(
+            self.traffic_and_link_data.iloc[0].to_dict(), self.vehicle_dict, ["PollutantType.NOx"],
+            emission_factor_data=self.emission_factor_data)
+
+        ef_data = self.emission_factor_data.set_index(["Pollutant", "TrafficSituation", "VehicleName"])["EF"]
+        for (pollutant, traffic_situation, vehicle_name), ef in ef_data.items():
+            traffic_situation_of_link, _, los_type = traffic_situation.rpartition("/")
+            los_index = ["Freeflow", "Heavy", "Satur.", "St+Go"].index(los_type)
+            self.assertEqual(ef, strategy.ef_index.efs[
+                strategy.traffic_situation_ids[traffic_situation_of_link], strategy.vehicle_ids[vehicle_name],
+                strategy.pollutant_ids[pollutant], los_index])
+
+        self.assertEqual({"link_a": strategy.traffic_situation_ids["URB/MW-City/100"]},
+                         strategy.traffic_situation_id_for_link)
+
+    def test_calculate_emissions_raises_error_for_missing_emission_factors(self):
+
+        with self.assertRaises(KeyError):
+            HbefaHotStrategy().calculate_emissions(
+                self.traffic_and_link_data.iloc[0].to_dict(), self.vehicle_dict, ["PollutantType.NH3"],
+                emission_factor_data=self.emission_factor_data)
+
+
+if __name__ == '__main__':
+    main()
@@ -367,5 +367,65 @@ class TestPMNonExhaustStrategy(TestCase):
             strategy.ef_tyre_wear_hdv_ubus_coach(vehicle_name="vehB", load_factor=0)
         )
 
+    def test_calculate_emissions_batch_same_as_row_by_row(self):
+
+        vehicle_dict = {
+            "vehA": "VehicleCategory.PC",
+            "vehB": "VehicleCategory.LCV",
+            "vehC": "VehicleCategory.HDV",
+            "vehD": "VehicleCategory.Moped"
+        }
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA"] * 4 + ["linkB"] * 4,
+            "VehicleCategory": ["VehicleCategory.PC", "VehicleCategory.LCV", "VehicleCategory.HDV",
+                                "VehicleCategory.Moped"] * 2,
+            "LOS1Speed": [5, 10, 7, 20, 40, 60, 89, 90],
+            "LOS2Speed": [20, 20, 15, 30, 90.5, 95, 96, 100],
+            "LOS3Speed": [40, 30, 25, 35, 39.9, 95.5, 120, 41],
+            "LOS4Speed": [50, 40, 40, 45, 130, 60, 80, 70]
+        })
+        data = pd.DataFrame({
+            "LinkID": ["linkA", "linkB", "linkB"],
+            "Length": [12, 0.37, 1.1],
+            "vehA": [5, 3.3, 0.0],
+            "vehB": [7, 1.7, 2.2],
+            "vehC": [0.7, 9.1, 4.0],
+            "vehD": [1.3, 0.2, 6.1],
+            "LOS1Percentage": [0.4, 0.25, 0.0],
+            "LOS2Percentage": [0.1, 0.25, 0.3],
+            "LOS3Percentage": [0.6, 0.25, 0.3],
+            "LOS4Percentage": [1, 0.25, 0.4]
+        }, index=[10, 11, 12])
+        kwargs = {
+            "load_factor": 0.5,
+            "los_speeds_data": los_speeds_data,
+            "vehicle_data": pd.DataFrame({"VehicleName": ["vehA", "vehB", "vehC", "vehD"],
+                                          "NumberOfAxles": [np.nan, np.nan, 3, np.nan]})
+        }
+
+        emissions_actual = PMNonExhaustStrategy().calculate_emissions_batch(data, vehicle_dict, "", **kwargs)
+
+        strategy = PMNonExhaustStrategy()
+        for i, row in data.iterrows():
+            emissions_expected = strategy.calculate_emissions(row.to_dict(), vehicle_dict, "", **kwargs)
+            for pm_type in ["TSP", "PM10", "PM25"]:
+                self.assertEqual(emissions_expected[pm_type], emissions_actual[pm_type].loc[i].to_dict())
+
+    def test_calculate_emissions_batch_raises_error_for_missing_los_speeds(self):
+
+        los_speeds_data = pd.DataFrame({
+            "LinkID": ["linkA"], "VehicleCategory": ["VehicleCategory.PC"],
+            "LOS1Speed": [5], "LOS2Speed": [20], "LOS3Speed": [40], "LOS4Speed": [50]
+        })
+        data = pd.DataFrame({
+            "LinkID": ["linkA", "linkB"], "Length": [1.0, 1.0], "vehA": [1.0, 1.0], "LOS1Percentage": [1.0, 1.0],
+            "LOS2Percentage": [0.0, 0.0], "LOS3Percentage": [0.0, 0.0], "LOS4Percentage": [0.0, 0.0]
+        })
+
+        self.assertRaises(
+            KeyError, PMNonExhaustStrategy().calculate_emissions_batch, data, {"vehA": "VehicleCategory.PC"}, "",
+            load_factor=0.5, los_speeds_data=los_speeds_data,
+            vehicle_data=pd.DataFrame({"VehicleName": ["vehA"], "NumberOfAxles": [np.nan]}))
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()